@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+命令的参数列表（argv）执行：命令为列表时不经过shell直接启动可执行文件，省去一次 /bin/sh 进程，
+参数中的空格、引号不需要转义。
+
+shell参数：
+    None  自动选择：列表按argv执行；字符串在不含shell语法、且首个单词是可执行文件时也按argv执行，
+          否则（管道、重定向、变量、内置命令等）交给shell
+    True  始终交给shell（列表会先拼接成命令行）
+    False 始终按argv执行（字符串按shell规则拆分）
+
+POSIX下按argv执行时传入可执行文件的绝对路径并保持 close_fds=False，
+使 subprocess 走 posix_spawn（vfork）路径创建进程。Python创建的文件描述符默认不可继承，不会泄漏到子进程。
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence, Tuple, Union
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+
+CommandType = Union[str, Sequence[str]]
+
+_IS_WINDOWS = platform.system() == "Windows"
+
+# 出现这些字符时字符串命令需要shell解释（管道、重定向、变量、通配符、命令替换、注释等）
+_SHELL_CHARS = frozenset('|&;<>()$`\\*?[]{}~#\n')
+
+# (PATH, 命令名) -> 可执行文件路径
+_which_cache: Dict[Tuple[str, str], str | None] = {}
+
+
+class Command:
+    """命令解析和进程启动的工具类"""
+
+    @staticmethod
+    def which(name: str) -> str | None:
+        """查找可执行文件（按当前PATH缓存结果）"""
+        key = (os.environ.get('PATH', ''), name)
+        if key not in _which_cache:
+            _which_cache[key] = shutil.which(name)
+        return _which_cache[key]
+
+    @staticmethod
+    def format(cmd: CommandType) -> str:
+        """命令的可读形式（用于日志）"""
+        if isinstance(cmd, str):
+            return cmd
+        if _IS_WINDOWS:
+            return subprocess.list2cmdline(cmd)
+        return shlex.join(cmd)
+
+    @classmethod
+    def resolve(cls, cmd: CommandType, shell: bool | None = None) -> Tuple[CommandType, bool]:
+        """
+        确定命令的执行方式。
+
+        :return: (传给Popen的命令, 是否使用shell)
+        """
+        if isinstance(cmd, str):
+            if shell:
+                return cmd, True
+            if shell is None and (_IS_WINDOWS or _SHELL_CHARS.intersection(cmd)):
+                # Windows的命令行由cmd.exe解释（内置命令、%VAR%），保持原有行为
+                return cmd, True
+            argv = shlex.split(cmd)
+            if shell is None and (not argv or cls.which(argv[0]) is None):
+                # shell内置命令（cd、export等）或找不到的命令交给shell报错
+                return cmd, True
+            return argv, False
+        argv = [str(arg) for arg in cmd]
+        if not argv:
+            raise ValueError("命令不能为空")
+        if shell:
+            return cls.format(argv), True
+        return argv, False
+
+    @classmethod
+    def popen_kwargs(cls, argv: List[str]) -> Dict[str, Any]:
+        """argv执行时的额外Popen参数（asyncio.create_subprocess_exec同样适用）"""
+        if _IS_WINDOWS:
+            return {}
+        executable = argv[0] if os.path.dirname(argv[0]) else cls.which(argv[0])
+        if executable is None:
+            # 交给Popen按原名查找并报告FileNotFoundError
+            return {}
+        return {"executable": executable, "close_fds": False}
+
+    @classmethod
+    def popen(cls, cmd: CommandType, shell: bool | None = None, **kwargs) -> subprocess.Popen:
+        """
+        启动命令。
+
+        :param cmd: 参数列表或命令字符串
+        :param shell: 是否使用shell，None为自动选择
+        :param kwargs: 其余Popen参数（stdout、encoding等）
+        """
+        cmd, use_shell = cls.resolve(cmd, shell)
+        if use_shell:
+            return subprocess.Popen(cmd, shell=True, **kwargs)
+        return subprocess.Popen(cmd, **{**cls.popen_kwargs(cmd), **kwargs})
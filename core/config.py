@@ -1,16 +1,126 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
-import re
+import threading
+import weakref
+from core.template import compile_template, PlaceholderCycleError
 
-class Config:
+# 参数不存在的哨兵对象（可以被缓存）
+_MISSING = object()
+
+
+class _ResolutionCache:
+    """
+    解析缓存：记录解析后的值及该值依赖的原始键，以及原始键到缓存键的反向索引。
+    generation在每次失效时加1，解析期间发生过失效的结果不写入缓存。
+    """
+    __slots__ = ('entries', 'dependents', 'generation')
+
+    def __init__(self):
+        # 缓存键 -> (解析值, 依赖的原始键)
+        self.entries = {}
+        self.dependents = {}
+        self.generation = 0
+
+    def get(self, key: str):
+        """返回 (解析值, 依赖的原始键)，未缓存时返回None"""
+        return self.entries.get(key)
+
+    def store(self, key: str, value, deps: set):
+        self.entries[key] = (value, deps)
+        for dep in deps:
+            self.dependents.setdefault(dep, set()).add(key)
+
+    def invalidate(self, raw_key: str):
+        """失效所有依赖raw_key的缓存项。"""
+        self.generation += 1
+        for cached_key in self.dependents.pop(raw_key, ()):
+            self.entries.pop(cached_key, None)
+
+
+class _Resolver:
+    """
+    占位符解析逻辑，Config 与 ConfigSnapshot 共用。
+    子类需提供 _cache 和 _get_raw_param。
+    """
+
+    _cache: _ResolutionCache
+
+    def _get_raw_param(self, key: str, default=None):
+        raise NotImplementedError
+
+    def _store(self, cache: _ResolutionCache, generation: int, key: str, value, deps: set):
+        """解析开始后缓存未被失效时写入结果（只读快照不会失效）"""
+        if cache.generation == generation:
+            cache.store(key, value, deps)
+
+    def _render(self, value_to_resolve, deps: set, chain: tuple = ()):
+        """使用编译后的模板解析占位符，并把用到的原始键收集到deps中。"""
+        if not isinstance(value_to_resolve, str):
+            return value_to_resolve
+
+        template = compile_template(value_to_resolve)
+        if template.is_literal:
+            return value_to_resolve
+
+        def lookup(placeholder):
+            # 通过缓存解析占位符，这会触发进一步的递归解析
+            placeholder_value, placeholder_deps = self._resolve_entry(placeholder, chain)
+            deps.update(placeholder_deps)
+            return '' if placeholder_value is _MISSING else placeholder_value
+
+        return template.render(lookup)
+
+    def _resolve_placeholders(self, value_to_resolve):
+        """递归解析字符串中的占位符。"""
+        return self._render(value_to_resolve, set())
+
+    def _resolve_entry(self, key: str, chain: tuple = ()):
+        """
+        解析单个键并缓存结果，返回 (解析值, 依赖的原始键)，键不存在时值为 _MISSING。
+        chain为当前正在解析的键链，用于检测循环引用。
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry
+        if key in chain:
+            raise PlaceholderCycleError(chain[chain.index(key):] + (key,))
+
+        # 先记录失效计数再读取原始值：读取之后发生的修改会使本次结果不被缓存
+        generation = self._cache.generation
+        deps = {key}
+        raw_value = self._get_raw_param(key, _MISSING)
+        if raw_value is not _MISSING:
+            raw_value = self._render(raw_value, deps, chain + (key,))
+
+        self._store(self._cache, generation, key, raw_value, deps)
+        return raw_value, deps
+
+    def get_param(self, key: str, default=None):
+        """
+        按优先级获取单个参数的原始值，并"即时"解析它。
+        """
+        value, _ = self._resolve_entry(key)
+        if value is _MISSING:
+            return self._resolve_placeholders(default)
+        return value
+
+
+class Config(_Resolver):
     """
     一个分层的配置类，支持作用域链和"即时"参数解析。
+
+    每个作用域维护一份解析缓存：缓存解析后的值及其依赖的原始键，
+    参数变更时只失效受影响的缓存项（并向子作用域传播）。
+    模板字符串编译一次后缓存，循环引用会抛出 PlaceholderCycleError。
+
+    创建作用域时会基于父级的扁平索引构建本层索引，原始参数查找与深度无关。
+    参数应通过 set_param 修改，以便同步更新索引和缓存。
+
+    snapshot() 返回与当前作用域共享数据的只读快照，之后的写入采用写时复制，
+    快照可以在后台线程中无锁读取。
     """
     
-    # 占位符正则表达式，编译一次以提高性能
-    _PLACEHOLDER_PATTERN = re.compile(r"\{\{([\w_]+)\}\}")
-    
     def __init__(self, params: dict | None = None, parent: Config | None = None):
         """
         :param params: 当前层级的参数。
@@ -18,52 +128,178 @@ class Config:
         """
         self._parent = parent
         self._params = params if params is not None else {}
+        # 子作用域（弱引用，工作流结束后自动释放）
+        self._children = weakref.WeakSet()
+        # get_param 的解析缓存
+        self._cache = _ResolutionCache()
+        # params 合并视图的解析缓存及键顺序（按需构建）
+        self._view = _ResolutionCache()
+        self._view_keys = None
+        # 扁平索引：子作用域可见的原始值（从根到本层第一个非None值，父级优先）
+        self._flat = self._build_flat_index()
+        # 写时复制标记：对应字典正被快照引用，修改前需要先复制
+        self._params_shared = False
+        self._flat_shared = False
+        # 版本号：本层可见参数每变化一次加1
+        self._version = 0
+        # 整棵作用域树共用一把写锁（也保护子作用域集合和缓存写入）
+        self._lock = parent._lock if parent is not None else threading.RLock()
+        if parent is not None:
+            with self._lock:
+                parent._children.add(self)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _store(self, cache: _ResolutionCache, generation: int, key: str, value, deps: set):
+        # 与set_param的失效互斥，检查和写入之间不会插入失效
+        with self._lock:
+            super()._store(cache, generation, key, value, deps)
+
+    def _build_flat_index(self) -> dict:
+        flat = dict(self._parent._flat) if self._parent is not None else {}
+        for key, value in self._params.items():
+            if value is not None and key not in flat:
+                flat[key] = value
+        return flat
+
+    def _refresh_flat_key(self, key: str):
+        """根据父级索引和本地参数重新计算单个键的索引值。"""
+        value = self._parent._flat.get(key) if self._parent is not None else None
+        if value is None:
+            value = self._params.get(key)
+        if value is None and key not in self._flat:
+            return
+        if self._flat_shared:
+            self._flat = dict(self._flat)
+            self._flat_shared = False
+        if value is None:
+            self._flat.pop(key, None)
+        else:
+            self._flat[key] = value
 
     def _get_raw_param(self, key: str, default=None):
         """优先查找父级参数，再查本地参数。"""
-        if self._parent:
-            value = self._parent._get_raw_param(key, None)
+        if self._parent is not None:
+            value = self._parent._flat.get(key)
             if value is not None:
                 return value
         if key in self._params:
             return self._params[key]
         return default
 
-    def _resolve_placeholders(self, value_to_resolve):
-        """递归解析字符串中的占位符。"""
-        if not isinstance(value_to_resolve, str):
-            return value_to_resolve
+    def invalidate(self, key: str, keys_changed: bool = False):
+        """
+        刷新原始键key的索引，失效依赖它的缓存项，并向所有子作用域传播。
+        keys_changed表示键集合发生了变化，需要重建合并视图的键顺序。
+        """
+        with self._lock:
+            self._version += 1
+            self._refresh_flat_key(key)
+            self._cache.invalidate(key)
+            self._view.invalidate(key)
+            if keys_changed:
+                self._view_keys = None
+            children = list(self._children)
+        for child in children:
+            child.invalidate(key, keys_changed)
         
-        # 使用编译好的正则表达式查找占位符
-        placeholders = self._PLACEHOLDER_PATTERN.findall(value_to_resolve)
-        if not placeholders:
-            return value_to_resolve
+    def set_param(self, key: str, value):
+        """设置当前层级的参数，并失效受影响的缓存。"""
+        with self._lock:
+            keys_changed = key not in self._params
+            if self._params_shared:
+                self._params = dict(self._params)
+                self._params_shared = False
+            self._params[key] = value
+            self.invalidate(key, keys_changed)
             
-        # 一次性替换所有占位符
-        resolved_value = value_to_resolve
-        for placeholder in placeholders:
-            # 使用 get_param 来获取占位符的值，这会触发进一步的递归解析
-            placeholder_value = self.get_param(placeholder, '')
-            resolved_value = resolved_value.replace(f"{{{{{placeholder}}}}}", str(placeholder_value))
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        生成当前作用域的只读快照，O(1)，与本作用域共享底层字典。
+        """
+        with self._lock:
+            self._params_shared = True
+            if self._parent is not None:
+                self._parent._flat_shared = True
+                inherited = self._parent._flat
+            else:
+                inherited = {}
+            return ConfigSnapshot(inherited, self._params, self._version)
             
-        return resolved_value
+    def _merged_keys(self) -> dict:
+        """合并视图的键（父级在前，本层新增在后），按需构建。"""
+        if self._view_keys is None:
+            parent_keys = self._parent._merged_keys() if self._parent is not None else {}
+            self._view_keys = dict.fromkeys([*parent_keys, *self._params])
+        return self._view_keys
+
+    def _merged_value(self, key: str):
+        """合并视图中单个键的解析值：本层参数覆盖父级视图。"""
+        return self._merged_entry(key)[0]
+
+    def _merged_entry(self, key: str):
+        """返回合并视图中单个键的 (解析值, 依赖的原始键)"""
+        entry = self._view.get(key)
+        if entry is not None:
+            return entry
+
+        generation = self._view.generation
+        deps = {key}
+        if key in self._params:
+            raw_value = self._params[key]
+        else:
+            raw_value, parent_deps = self._parent._merged_entry(key)
+            deps.update(parent_deps)
+        value = self._render(raw_value, deps)
+        self._store(self._view, generation, key, value, deps)
+        return value, deps
 
     @property
     def params(self) -> dict:
-        """递归获取合并后的所有有效参数，并解析它们。"""
-        parent_params = self._parent.params if self._parent else {}
-        # 先合并，再对合并后的结果进行解析
-        merged_params = {**parent_params, **self._params}
+        """获取合并后的所有有效参数（已解析），只重新解析失效的项。"""
+        return {key: self._merged_value(key) for key in self._merged_keys()}
         
-        # 批量解析所有参数
-        for key, value in merged_params.items():
-            merged_params[key] = self._resolve_placeholders(value)
             
-        return merged_params
+class ConfigSnapshot(_Resolver):
+    """
+    Config 在某一时刻的只读快照。
 
-    def get_param(self, key: str, default=None):
+    查找语义与生成快照时的 Config 相同，之后对 Config 的修改不会影响快照。
+    快照可以跨线程共享，也可以被 pickle 发送到子进程。
+    """
+
+    def __init__(self, inherited: dict, params: dict, version: int = 0):
         """
-        按优先级获取单个参数的原始值，并"即时"解析它。
+        :param inherited: 父级扁平索引（只读）。
+        :param params: 本层参数（只读）。
+        :param version: 生成快照时 Config 的版本号。
         """
-        raw_value = self._get_raw_param(key, default)
-        return self._resolve_placeholders(raw_value) 
\ No newline at end of file
+        self._inherited = inherited
+        self._params = params
+        self.version = version
+        self._cache = _ResolutionCache()
+
+    def _get_raw_param(self, key: str, default=None):
+        value = self._inherited.get(key)
+        if value is not None:
+            return value
+        if key in self._params:
+            return self._params[key]
+        return default
+
+    @property
+    def params(self) -> dict:
+        """快照中所有可见参数的解析值。"""
+        return {key: self.get_param(key) for key in dict.fromkeys([*self._inherited, *self._params])}
+
+    def snapshot(self) -> ConfigSnapshot:
+        return self
+
+    def __getstate__(self):
+        # 解析缓存不随快照传输
+        return {'inherited': self._inherited, 'params': self._params, 'version': self.version}
+
+    def __setstate__(self, state):
+        self.__init__(state['inherited'], state['params'], state['version'])
\ No newline at end of file
@@ -9,6 +9,10 @@ from enum import Enum
 # 工作流日志格式
 LOG_FLOW_START_FORMAT = "[工作流开始]: {name}"
 LOG_FLOW_END_FORMAT = "[工作流结束]: {name}"
+LOG_FLOW_CACHED_FORMAT = "[工作流缓存命中]: {name}"
+LOG_FLOW_UP_TO_DATE_FORMAT = "[工作流跳过]: {name} 输入未变化，复用上次结果"
+LOG_FLOW_RESUMED_FORMAT = "[工作流恢复]: {name} 已在中断前完成，使用检查点结果"
+LOG_FLOW_JOINED_FORMAT = "[工作流合并]: {name} 相同参数的调用正在执行，等待其结果"
 
 class LogTreePreType(Enum):
     START = 'start'
@@ -35,3 +39,26 @@ WORKFLOW_STATUS_MESSAGES = {
     WorkflowStatus.ASYNC: "异步执行中",
     WorkflowStatus.PARTIAL: "部分成功"
 }
+
+# 入口参数：结果缓存磁盘目录，未设置时只使用内存缓存
+PARAM_RESULT_CACHE_DIR = 'result_cache_dir'
+
+# 入口参数：同时运行的子进程数上限（全局并发预算，见 core/subprocess_executor.py）
+PARAM_MAX_SUBPROCESSES = 'max_subprocesses'
+
+# 入口参数：main.py --serve 启动守护进程，--daemon 把请求转发给守护进程执行，--socket 指定套接字路径
+PARAM_SERVE = 'serve'
+PARAM_DAEMON = 'daemon'
+PARAM_SOCKET = 'socket'
+
+# 入口参数：为True时列出所有可用工作流（main.py --list-flows）
+PARAM_LIST_FLOWS = 'list_flows'
+
+# 入口参数：要恢复的运行ID（main.py --resume <run_id>）
+PARAM_RESUME = 'resume'
+
+# 工作流参数：为True时忽略增量执行记录，强制执行
+PARAM_FORCE_RUN = 'force_run'
+
+# 工作流参数：为True时在进程池中执行（也可在类上设置 RUN_IN_PROCESS = True）
+PARAM_RUN_IN_PROCESS = 'run_in_process'
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+工作流执行上下文：每次 run_flow 调用对应一个上下文节点，
+通过 contextvars 在线程和 asyncio 任务之间隔离/传播。
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Type
+import contextvars
+import functools
+import os
+import threading
+
+if TYPE_CHECKING:
+    from core.config import Config
+    from core.manager import WorkflowManager
+    from core.workflow import BaseWorkflow
+
+_CURRENT_CONTEXT: contextvars.ContextVar[Optional[ExecutionContext]] = contextvars.ContextVar(
+    'workflow_execution_context', default=None
+)
+
+
+class WorkflowCycleError(RuntimeError):
+    """工作流已在当前调用链中，再次调用会形成循环依赖。"""
+
+
+class StepCounter:
+    """线程安全的子调用计数：同一步骤（工作流+参数）第几次被调用。"""
+    __slots__ = ('_counts', '_lock')
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def next(self, step: str) -> int:
+        with self._lock:
+            index = self._counts.get(step, 0)
+            self._counts[step] = index + 1
+        return index
+
+
+class ExecutionContext:
+    """
+    单次工作流调用的执行上下文（创建后不可变）。
+    parent指向调用方的上下文，整条链即为实际的调用链。
+    position为该调用在调用树中的位置（启用运行日志时才有），steps为其子调用的序号计数。
+    span_id为本次调用的唯一ID（结构化运行日志中使用）。
+    """
+    __slots__ = ('manager', 'workflow_class', 'config', 'parent', 'depth', 'position', 'steps', 'span_id')
+
+    def __init__(self, manager: WorkflowManager, workflow_class: Type[BaseWorkflow],
+                 config: Config, parent: ExecutionContext | None = None, position: str | None = None):
+        self.manager = manager
+        self.workflow_class = workflow_class
+        self.config = config
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.position = position
+        self.steps = StepCounter() if position is not None else None
+        self.span_id = os.urandom(8).hex()
+
+    def chain(self) -> Iterator[ExecutionContext]:
+        """从当前调用向上遍历调用链。"""
+        node = self
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def contains(self, workflow_class: Type[BaseWorkflow]) -> bool:
+        """调用链中是否已存在该工作流类。"""
+        return any(node.workflow_class is workflow_class for node in self.chain())
+
+    @staticmethod
+    def current(manager: WorkflowManager | None = None) -> ExecutionContext | None:
+        """
+        获取当前线程/任务中的执行上下文。
+        指定manager时，只返回属于该manager的上下文。
+        """
+        context = _CURRENT_CONTEXT.get()
+        if manager is not None and context is not None and context.manager is not manager:
+            return None
+        return context
+
+    @staticmethod
+    def enter(context: ExecutionContext | None) -> contextvars.Token:
+        """进入执行上下文，返回用于 exit 的token。"""
+        return _CURRENT_CONTEXT.set(context)
+
+    @staticmethod
+    def exit(token: contextvars.Token):
+        """恢复进入前的执行上下文。"""
+        _CURRENT_CONTEXT.reset(token)
+
+    @staticmethod
+    def bind(func: Callable) -> Callable:
+        """
+        绑定当前上下文，返回可在其他线程中执行的函数。
+        新线程默认不继承contextvars，启动线程时应使用本方法包装target。
+        """
+        context = contextvars.copy_context()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # 每次调用使用独立副本，允许同一函数在多个线程中并发执行
+            return context.copy().run(func, *args, **kwargs)
+
+        return wrapper
+
+    @staticmethod
+    def bind_async(coro_func: Callable) -> Callable:
+        """
+        绑定当前上下文（所有contextvars），返回可投递到其他事件循环/线程执行的协程函数。
+        """
+        context = contextvars.copy_context()
+
+        @functools.wraps(coro_func)
+        async def wrapper(*args, **kwargs):
+            tokens = [var.set(value) for var, value in context.items()]
+            try:
+                return await coro_func(*args, **kwargs)
+            finally:
+                for token in reversed(tokens):
+                    token.var.reset(token)
+
+        return wrapper
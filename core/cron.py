@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+标准5字段cron表达式：分 时 日 月 周。
+
+支持 *、列表（1,15）、范围（1-5）、步长（*/10、8-18/2）、月份和星期的英文缩写（jan、mon），
+以及 @yearly、@monthly、@weekly、@daily、@hourly。
+日和周都不为 * 时，满足其一即可（与cron一致）；周的0和7都表示周日。
+
+下一次触发时间直接按字段推算，不逐秒检查。带时区的时间按该时区的墙上时间计算：
+夏令时跳过的时刻不触发，重复的时刻只触发第一次。
+"""
+
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import datetime
+
+_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+_MONTH_NAMES = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+_WEEKDAY_NAMES = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+# (名称, 最小值, 最大值, 英文缩写)
+_FIELDS: List[Tuple[str, int, int, Optional[List[str]]]] = [
+    ('分', 0, 59, None),
+    ('时', 0, 23, None),
+    ('日', 1, 31, None),
+    ('月', 1, 12, _MONTH_NAMES),
+    ('周', 0, 7, _WEEKDAY_NAMES),
+]
+
+# 找不到下一次触发时间（如 "0 0 30 2 *"）时的搜索年限
+_SEARCH_YEARS = 8
+
+
+class CronExpression:
+    """解析后的cron表达式"""
+
+    def __init__(self, expression: str):
+        """
+        :raises ValueError: 表达式格式错误
+        """
+        self.expression = expression.strip()
+        fields = _MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式应为5个字段（分 时 日 月 周）: '{expression}'")
+        parsed = [self._parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 7 和 0 都表示周日
+        self.weekdays = sorted({day % 7 for day in weekdays})
+        self._day_any = fields[2] == '*'
+        self._weekday_any = fields[4] == '*'
+        self._day_set = set(self.days)
+        self._weekday_set = set(self.weekdays)
+
+    @staticmethod
+    def _parse_value(text: str, name: str, names: Optional[List[str]]) -> int:
+        if names and text.lower() in names:
+            return names.index(text.lower()) + (1 if names is _MONTH_NAMES else 0)
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"cron字段'{name}'的值无效: '{text}'")
+
+    @classmethod
+    def _parse_field(cls, text: str, name: str, minimum: int, maximum: int, names: Optional[List[str]]) -> List[int]:
+        values = set()
+        for part in text.split(','):
+            base, _, step_text = part.partition('/')
+            step = cls._parse_value(step_text, name, None) if step_text else 1
+            if step <= 0:
+                raise ValueError(f"cron字段'{name}'的步长必须大于0: '{part}'")
+            if base == '*':
+                start, end = minimum, maximum
+            elif '-' in base:
+                start_text, _, end_text = base.partition('-')
+                start = cls._parse_value(start_text, name, names)
+                end = cls._parse_value(end_text, name, names)
+            else:
+                start = cls._parse_value(base, name, names)
+                end = maximum if step_text else start
+            if not minimum <= start <= end <= maximum:
+                raise ValueError(f"cron字段'{name}'超出范围 {minimum}-{maximum}: '{part}'")
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+
+    def _day_matches(self, date: datetime.date) -> bool:
+        day_ok = date.day in self._day_set
+        weekday_ok = (date.weekday() + 1) % 7 in self._weekday_set
+        if self._day_any and self._weekday_any:
+            return True
+        if self._day_any:
+            return weekday_ok
+        if self._weekday_any:
+            return day_ok
+        return day_ok or weekday_ok
+
+    @staticmethod
+    def _next_value(values: List[int], current: int) -> Optional[int]:
+        for value in values:
+            if value >= current:
+                return value
+        return None
+
+    def _next_wall_time(self, after: datetime.datetime) -> datetime.datetime:
+        """after之后（不含）的下一个匹配的墙上时间（naive）"""
+        t = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        end_year = t.year + _SEARCH_YEARS
+        while t.year <= end_year:
+            if t.month not in self.months:
+                month = self._next_value(self.months, t.month)
+                if month is None:
+                    t = datetime.datetime(t.year + 1, self.months[0], 1)
+                else:
+                    t = datetime.datetime(t.year, month, 1)
+                continue
+            if not self._day_matches(t.date()):
+                t = datetime.datetime.combine(t.date() + datetime.timedelta(days=1), datetime.time())
+                continue
+            hour = self._next_value(self.hours, t.hour)
+            if hour is None:
+                t = datetime.datetime.combine(t.date() + datetime.timedelta(days=1), datetime.time())
+                continue
+            if hour != t.hour:
+                t = t.replace(hour=hour, minute=0)
+            minute = self._next_value(self.minutes, t.minute)
+            if minute is None:
+                t = t.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return t.replace(minute=minute)
+        raise ValueError(f"cron表达式 '{self.expression}' 在{_SEARCH_YEARS}年内没有触发时间")
+
+    def next_after(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        after之后（不含）的下一次触发时间。after带时区时返回同一时区的时间，否则按本地墙上时间计算。
+
+        :raises ValueError: 表达式永远不会触发
+        """
+        tz = after.tzinfo
+        wall = after.replace(tzinfo=None)
+        while True:
+            wall = self._next_wall_time(wall)
+            if tz is None:
+                return wall
+            candidate = wall.replace(tzinfo=tz)
+            round_trip = candidate.astimezone(datetime.timezone.utc).astimezone(tz).replace(tzinfo=None)
+            # 跳过夏令时不存在的时刻，以及时钟回拨后已经过去的时刻
+            # 同一tzinfo的时间比较时忽略偏移，按时间戳比较
+            if round_trip == wall and candidate.timestamp() > after.timestamp():
+                return candidate
+
+    def __repr__(self):
+        return f"CronExpression('{self.expression}')"
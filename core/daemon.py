@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""
+常驻守护进程（main.py --serve）：预先导入所有工作流并初始化日志，
+通过Unix域套接字接收与 WorkflowManager.run_workflow 相同的参数字典，
+每个请求在独立线程中执行，日志树实时回传给客户端。协议见 core/daemon_client.py。
+
+请求在客户端的工作目录中执行，相对路径参数（flow_data、repository_path等）与直接运行时一致。
+工作目录是进程级状态：工作目录相同的请求并发执行，不同的请求按到达顺序等待前面的请求结束后切换。
+"""
+
+from __future__ import annotations
+import collections
+import contextlib
+import importlib
+import json
+import os
+import signal
+import socketserver
+import threading
+from core.constants import PARAM_DAEMON, PARAM_SERVE, PARAM_SOCKET, WorkflowStatus
+from core.daemon_client import DEFAULT_SOCKET_PATH, DaemonClient
+from core.logger import WorkflowLogger
+from core.manager import WorkflowManager
+from core.registry import WorkflowRegistry
+
+
+class _WorkingDirectory:
+    """按请求切换进程工作目录"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._cwd = os.getcwd()
+        self._active = 0
+        self._waiters: collections.deque = collections.deque()
+
+    @contextlib.contextmanager
+    def use(self, cwd: str | None):
+        """
+        在cwd中执行with块，cwd为None时使用当前工作目录。
+
+        :raises OSError: 目录不存在或无法访问
+        """
+        with self._condition:
+            cwd = cwd or self._cwd
+            ticket = object()
+            self._waiters.append(ticket)
+            # 先到先得：排在切换目录的请求之后的同目录请求也要等待，避免切换请求一直等不到
+            while self._waiters[0] is not ticket or (self._active and cwd != self._cwd):
+                self._condition.wait()
+            self._waiters.popleft()
+            try:
+                if cwd != self._cwd:
+                    os.chdir(cwd)
+                    self._cwd = cwd
+                self._active += 1
+            finally:
+                self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """处理一个客户端连接"""
+
+    def setup(self):
+        super().setup()
+        # 并行子流程的日志会从多个线程写入同一连接
+        self._write_lock = threading.Lock()
+        self._connected = True
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self._send({"type": "done", "status": WorkflowStatus.ERROR.value, "exit_code": 1, "message": "无效的请求"})
+            return
+        if request.get("type") == "ping":
+            self._send({"type": "pong"})
+            return
+
+        params = {
+            key: value for key, value in (request.get("params") or {}).items()
+            if key not in (PARAM_SERVE, PARAM_DAEMON, PARAM_SOCKET)
+        }
+        status, exit_code = WorkflowStatus.ERROR.value, 1
+        with WorkflowLogger.capture(self._send_log):
+            try:
+                with self.server.working_directory.use(request.get("cwd")):
+                    result = WorkflowManager.run_workflow(params)
+            except Exception as e:
+                # 未捕获的异常（如flow_data文件不存在）同样以结束消息通知客户端，而不是直接断开连接
+                WorkflowLogger.instance().exception(f"守护进程执行请求失败: {e}")
+            else:
+                status = result.get("status") if isinstance(result, dict) else None
+                exit_code = 1 if status == WorkflowStatus.ERROR.value else 0
+        self._send({"type": "done", "status": status, "exit_code": exit_code})
+
+    def _send_log(self, level: str, message: str):
+        self._send({"type": "log", "level": level, "message": message})
+
+    def _send(self, message: dict):
+        """写入一条消息，客户端断开后丢弃后续消息（工作流继续执行）"""
+        data = (json.dumps(message, ensure_ascii=False, default=repr) + '\n').encode('utf-8')
+        with self._write_lock:
+            if not self._connected:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                self._connected = False
+
+
+class WorkflowDaemon:
+    """
+    工作流守护进程。
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        server_class = getattr(socketserver, 'ThreadingUnixStreamServer', None)
+        if server_class is None:
+            raise RuntimeError("当前平台不支持Unix域套接字，无法启动守护进程")
+        # 请求执行期间会切换工作目录，套接字路径固定为绝对路径
+        self.socket_path = os.path.abspath(socket_path)
+        self._server_class = server_class
+        self._server = None
+
+    def preload(self) -> int:
+        """导入注册表中的所有工作流模块，返回成功导入的数量。"""
+        logger = WorkflowLogger.instance()
+        loaded = 0
+        for entry in WorkflowRegistry.instance().flows():
+            try:
+                importlib.import_module(entry.module)
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"预加载工作流 '{entry.flow_name}' 失败: {e}")
+        return loaded
+
+    def _prepare_socket_path(self):
+        if not os.path.exists(self.socket_path):
+            directory = os.path.dirname(self.socket_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            return
+        if DaemonClient(self.socket_path, timeout=1).ping():
+            raise RuntimeError(f"守护进程已在运行: {self.socket_path}")
+        # 上次异常退出遗留的套接字文件
+        os.remove(self.socket_path)
+
+    def serve_forever(self):
+        """启动并阻塞运行，Ctrl+C 或 shutdown() 停止。"""
+        logger = WorkflowLogger.instance()
+        self._prepare_socket_path()
+        loaded = self.preload()
+        self._server = self._server_class(self.socket_path, _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.working_directory = _WorkingDirectory()
+        if threading.current_thread() is threading.main_thread() and hasattr(signal, 'SIGTERM'):
+            # shutdown会等待serve_forever退出，必须在其他线程中调用
+            signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.shutdown, daemon=True).start())
+        logger.info(f"守护进程已启动: {self.socket_path}，已预加载 {loaded} 个工作流")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+            logger.info("守护进程已停止")
+
+    def shutdown(self):
+        """从其他线程停止 serve_forever"""
+        if self._server is not None:
+            self._server.shutdown()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+守护进程客户端：把工作流请求转发给 main.py --serve 启动的守护进程，并实时输出回传的日志。
+本模块不导入工作流和日志框架，客户端进程启动开销很小。
+
+协议：每行一个UTF-8编码的JSON消息。
+    请求: {"type": "run", "params": {...}, "cwd": 客户端工作目录} 或 {"type": "ping"}
+    响应: {"type": "log", "level": ..., "message": ...}（任意条）后跟 {"type": "done", "status": ..., "exit_code": ...}
+"""
+
+from __future__ import annotations
+from typing import Callable, Optional
+import json
+import os
+import socket
+import sys
+from core.constants import WorkflowStatus
+
+# 默认套接字路径
+DEFAULT_SOCKET_PATH = os.path.join('data', 'state', 'workflow.sock')
+
+
+class DaemonClient:
+    """Unix域套接字客户端"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float | None = None):
+        """
+        :param socket_path: 守护进程监听的套接字路径
+        :param timeout: 连接和读取超时（秒），None表示一直等待工作流执行完成
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, request: dict, on_message: Optional[Callable[[dict], None]] = None) -> dict:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("当前平台不支持Unix域套接字，无法连接守护进程")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+            with sock.makefile('r', encoding='utf-8') as stream:
+                for line in stream:
+                    message = json.loads(line)
+                    if message.get("type") in ("done", "pong"):
+                        return message
+                    if on_message is not None:
+                        on_message(message)
+        raise ConnectionError("守护进程在请求完成前关闭了连接")
+
+    def ping(self) -> bool:
+        """守护进程是否在运行"""
+        try:
+            return self._request({"type": "ping"}).get("type") == "pong"
+        except (OSError, ConnectionError, ValueError, RuntimeError):
+            return False
+
+    def run(self, params: dict, on_message: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        请求守护进程执行工作流，阻塞到执行完成。
+
+        :param params: 与 WorkflowManager.run_workflow 相同的参数
+        :param on_message: 每条日志消息的回调
+        :return: 结束消息 {"type": "done", "status": ..., "exit_code": ...}
+        """
+        # 相对路径参数按客户端的工作目录解析
+        return self._request({"type": "run", "params": params, "cwd": os.getcwd()}, on_message)
+
+    @staticmethod
+    def forward(params: dict, socket_path: str | None = None) -> int:
+        """
+        命令行客户端：转发请求并把日志打印到标准输出/错误，返回进程退出码。
+        """
+        def print_message(message: dict):
+            stream = sys.stderr if message.get("level") in ('error', 'exception', 'critical') else sys.stdout
+            print(message.get("message", ""), file=stream, flush=True)
+
+        client = DaemonClient(socket_path or DEFAULT_SOCKET_PATH)
+        try:
+            done = client.run(params, print_message)
+        except (OSError, ConnectionError, RuntimeError) as e:
+            print(f"无法连接守护进程 ({client.socket_path}): {e}", file=sys.stderr)
+            return 2
+        if done.get("exit_code") is not None:
+            return int(done["exit_code"])
+        return 1 if done.get("status") == WorkflowStatus.ERROR.value else 0
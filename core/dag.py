@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+声明式DAG工作流：解析节点定义，按依赖关系并发调度，并计算关键路径。
+
+节点定义格式（JSON）：
+{
+    "fetch_a": {"flow": "git.git_fetch_flow", "params": {"repository_path": "repo_a"}},
+    "reset_a": {
+        "flow": "git.git_reset_flow",
+        "params": {"repository_path": "repo_a", "target": "origin/main"},
+        "depends_on": ["fetch_a"],
+        "inputs": {"fetch_status": "fetch_a.status"}
+    }
+}
+
+inputs 把上游结果映射为下游参数："节点ID" 取整个结果，"节点ID.键" 取结果字典中的字段。
+所有下游节点还会收到 upstream_results 参数：{上游节点ID: 结果}。
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import time
+from core.constants import WorkflowStatus
+from core.context import ExecutionContext
+from core.parallel import resolve_max_workers
+from core.utils import Utils
+
+if TYPE_CHECKING:
+    from core.manager import WorkflowManager
+
+# 传给下游节点的上游结果参数名
+UPSTREAM_RESULTS_PARAM = 'upstream_results'
+
+
+class DagNode:
+    """DAG中的一个节点"""
+    __slots__ = ('node_id', 'flow', 'params', 'depends_on', 'inputs')
+
+    def __init__(self, node_id: str, flow: str, params: dict | None = None,
+                 depends_on: List[str] | None = None, inputs: Dict[str, str] | None = None):
+        self.node_id = node_id
+        self.flow = flow
+        self.params = params or {}
+        self.depends_on = list(depends_on or [])
+        self.inputs = inputs or {}
+
+
+class DagDefinition:
+    """经过校验的DAG定义（节点ID唯一、依赖存在、无环）"""
+
+    def __init__(self, nodes: Dict[str, DagNode]):
+        self.nodes = nodes
+        self.order = self._topological_order()
+
+    @staticmethod
+    def parse(data: dict) -> DagDefinition:
+        """
+        从节点定义字典解析DAG。
+
+        :param data: {节点ID: {"flow": ..., "params": ..., "depends_on": [...], "inputs": {...}}}
+        """
+        if not isinstance(data, dict) or not data:
+            raise ValueError("DAG节点定义必须是非空字典: {节点ID: 节点配置}")
+        nodes = {}
+        for node_id, spec in data.items():
+            if not isinstance(spec, dict) or not spec.get('flow'):
+                raise ValueError(f"DAG节点 '{node_id}' 必须包含'flow'字段")
+            nodes[node_id] = DagNode(
+                node_id,
+                spec['flow'],
+                params=spec.get('params'),
+                depends_on=spec.get('depends_on'),
+                inputs=spec.get('inputs'),
+            )
+        for node in nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in nodes:
+                    raise ValueError(f"DAG节点 '{node.node_id}' 依赖的节点 '{dependency}' 不存在")
+            for source in node.inputs.values():
+                if source.split('.', 1)[0] not in node.depends_on:
+                    raise ValueError(f"DAG节点 '{node.node_id}' 的输入 '{source}' 必须来自 depends_on 中的节点")
+        return DagDefinition(nodes)
+
+    def _topological_order(self) -> List[str]:
+        """Kahn算法拓扑排序，存在环时抛出ValueError"""
+        indegree = {node_id: len(node.depends_on) for node_id, node in self.nodes.items()}
+        dependents = self.dependents()
+        ready = [node_id for node_id, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            node_id = ready.pop()
+            order.append(node_id)
+            for child in dependents[node_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            cyclic = sorted(node_id for node_id, degree in indegree.items() if degree > 0)
+            raise ValueError(f"DAG存在循环依赖，涉及节点: {', '.join(cyclic)}")
+        return order
+
+    def dependents(self) -> Dict[str, List[str]]:
+        result = {node_id: [] for node_id in self.nodes}
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                result[dependency].append(node.node_id)
+        return result
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """按节点耗时计算最长路径（未执行的节点耗时按0计）"""
+        best: Dict[str, Tuple[float, Optional[str]]] = {}
+        for node_id in self.order:
+            node = self.nodes[node_id]
+            start, previous = 0.0, None
+            for dependency in node.depends_on:
+                if best[dependency][0] > start:
+                    start, previous = best[dependency][0], dependency
+            best[node_id] = (start + durations.get(node_id, 0.0), previous)
+        if not best:
+            return [], 0.0
+        end = max(best, key=lambda node_id: best[node_id][0])
+        total = best[end][0]
+        path = []
+        while end is not None:
+            path.append(end)
+            end = best[end][1]
+        return list(reversed(path)), total
+
+
+def _is_failed(result: Any, error: Optional[BaseException]) -> bool:
+    return error is not None or Utils.is_error_result(result)
+
+
+def _extract_input(results: Dict[str, Any], source: str) -> Any:
+    node_id, _, field = source.partition('.')
+    value = results.get(node_id)
+    if field:
+        return value.get(field) if isinstance(value, dict) else None
+    return value
+
+
+class DagScheduler:
+    """
+    依赖驱动的DAG调度器：依赖全部成功的节点立即提交到线程池并发执行，
+    失败节点的所有下游节点会被跳过。
+    """
+
+    def __init__(self, manager: WorkflowManager, max_workers: int | None = None):
+        self.manager = manager
+        self.max_workers = max_workers
+
+    def _node_params(self, node: DagNode, results: Dict[str, Any]) -> dict:
+        params = dict(node.params)
+        for param_name, source in node.inputs.items():
+            params[param_name] = _extract_input(results, source)
+        if node.depends_on:
+            params[UPSTREAM_RESULTS_PARAM] = {dependency: results.get(dependency) for dependency in node.depends_on}
+        return params
+
+    def run(self, definition: DagDefinition) -> dict:
+        # 先解析所有工作流类，名称错误时在执行前失败
+        classes = {node_id: self.manager.find_workflow_class(node.flow) for node_id, node in definition.nodes.items()}
+        dependents = definition.dependents()
+        remaining = {node_id: len(node.depends_on) for node_id, node in definition.nodes.items()}
+        results: Dict[str, Any] = {}
+        durations: Dict[str, float] = {}
+        failed: List[str] = []
+        skipped: List[str] = []
+
+        def run_node(node_id: str, params: dict):
+            start = time.monotonic()
+            outcome = self.manager._run_flow_safely(classes[node_id], params)
+            return outcome, time.monotonic() - start
+
+        def skip_downstream(node_id: str):
+            for child in dependents[node_id]:
+                if child not in skipped:
+                    skipped.append(child)
+                    skip_downstream(child)
+
+        workers = resolve_max_workers(self.max_workers, len(definition.nodes))
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-dag") as executor:
+            running = {}
+
+            def submit_ready(node_ids):
+                for node_id in node_ids:
+                    if node_id in skipped:
+                        continue
+                    params = self._node_params(definition.nodes[node_id], results)
+                    self.manager.log(f"DAG节点就绪: {node_id} ({definition.nodes[node_id].flow})")
+                    future = executor.submit(ExecutionContext.bind(run_node), node_id, params)
+                    running[future] = node_id
+
+            submit_ready([node_id for node_id, count in remaining.items() if count == 0])
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    node_id = running.pop(future)
+                    (result, error), duration = future.result()
+                    results[node_id] = result
+                    durations[node_id] = duration
+                    if _is_failed(result, error):
+                        failed.append(node_id)
+                        skip_downstream(node_id)
+                        self.manager.log(f"DAG节点失败: {node_id}，跳过其下游节点")
+                        continue
+                    ready = []
+                    for child in dependents[node_id]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            ready.append(child)
+                    submit_ready(ready)
+
+        path, path_duration = definition.critical_path(durations)
+        total_duration = time.monotonic() - started
+        self.manager.log(f"DAG关键路径: {' -> '.join(path)} (耗时 {path_duration:.2f}s，总耗时 {total_duration:.2f}s)")
+
+        if failed or skipped:
+            status = WorkflowStatus.PARTIAL if len(failed) + len(skipped) < len(definition.nodes) else WorkflowStatus.ERROR
+        else:
+            status = WorkflowStatus.SUCCESS
+        return {
+            "status": status.value,
+            "results": results,
+            "failed": failed,
+            "skipped": skipped,
+            "critical_path": path,
+            "critical_path_duration": path_duration,
+            "durations": durations,
+            "total_duration": total_duration,
+        }
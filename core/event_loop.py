@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+工作流管理器持有的后台事件循环，以及常用的可等待操作（子进程、定时）。
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Coroutine, Optional
+from core.command import Command, CommandType
+import asyncio
+import concurrent.futures
+import platform
+import threading
+
+# 读取子进程输出的块大小
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+class EventLoopThread:
+    """
+    在独立守护线程中运行的asyncio事件循环，首次使用时启动。
+    同步代码通过 submit 把协程投递到该循环并等待结果。
+    """
+
+    def __init__(self, name: str = "workflow-event-loop"):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """获取事件循环，未启动时自动启动。"""
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name=self._name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        ready.set()
+        self._loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """把协程投递到事件循环，返回线程安全的Future。"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine) -> Any:
+        """投递协程并阻塞等待结果（不能在事件循环线程中调用）。"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("不能在事件循环线程中同步等待协程，请使用 await")
+        return self.submit(coro).result()
+
+    def stop(self):
+        """停止事件循环并等待线程退出。"""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if not self.in_loop_thread():
+                self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+async def run_in_thread(func: Callable, *args) -> Any:
+    """在默认线程池中执行阻塞函数并等待结果。"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+async def sleep(seconds: float):
+    """可等待的定时器。"""
+    await asyncio.sleep(seconds)
+
+
+async def run_subprocess(cmd: CommandType, line_callback: Callable[[str], Any] | None = None,
+                         shell: bool | None = None, stdout: Any = None, keep_output: bool = True) -> dict:
+    """
+    以协程方式执行命令，按行回调输出。协程被取消或出错时终止子进程。
+
+    :param cmd: 命令字符串或参数列表
+    :param line_callback: 每行非空输出的回调
+    :param shell: 是否使用shell，None为自动选择（见 core.command）
+    :param stdout: 输出目标（文件对象或subprocess.DEVNULL），None时读取输出
+    :param keep_output: 是否在结果中保留输出（只需逐行回调时设为False，不占用内存）
+    :return: {"returncode": int, "output": str}（去掉首尾空行；指定stdout时为空）
+    """
+    encoding = 'gbk' if platform.system() == "Windows" else 'utf-8'
+    stdout = asyncio.subprocess.PIPE if stdout is None else stdout
+    cmd, use_shell = Command.resolve(cmd, shell)
+    if use_shell:
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            stdout=stdout,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    else:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=stdout,
+            stderr=asyncio.subprocess.STDOUT,
+            **Command.popen_kwargs(cmd),
+        )
+    lines = []
+
+    def handle_line(raw_line: bytes):
+        line = raw_line.decode(encoding, errors='replace').rstrip()
+        # output保留原始行（如 git status --porcelain 行首的空格），回调只接收非空行
+        if keep_output:
+            lines.append(line)
+        if line_callback and line.strip():
+            line_callback(line.strip())
+
+    try:
+        # 按块读取后自行分行：readline受StreamReader的64KB上限限制，超长的一行会报错
+        pending = bytearray()
+        while process.stdout is not None:
+            chunk = await process.stdout.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            end = chunk.rfind(b'\n')
+            if end < 0:
+                pending += chunk
+                continue
+            pending += chunk[:end]
+            for raw_line in bytes(pending).split(b'\n'):
+                handle_line(raw_line)
+            pending = bytearray(chunk[end + 1:])
+        if pending:
+            handle_line(bytes(pending))
+        returncode = await process.wait()
+    except BaseException:
+        # 取消、回调异常等任何原因提前结束时，终止并回收子进程
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    return {"returncode": returncode, "output": "\n".join(lines).strip("\n")}
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+"""
+文件变化监听，供文件监听触发器使用：
+
+- InotifyWatcher: Linux inotify，内核推送变化，读取时不扫描目录树
+- PollingWatcher: 跨平台的stat轮询，每次读取时对比目录树快照
+
+两者都通过非阻塞的 poll() 返回自上次调用以来变化（新增、修改、删除）的文件路径，
+由调用方在定时调度器的线程中周期性读取。
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, List, Set, Tuple
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import os
+import struct
+
+WATCH_BACKEND_AUTO = 'auto'
+WATCH_BACKEND_INOTIFY = 'inotify'
+WATCH_BACKEND_POLL = 'poll'
+WATCH_BACKENDS = (WATCH_BACKEND_AUTO, WATCH_BACKEND_INOTIFY, WATCH_BACKEND_POLL)
+
+# <linux/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class PathFilter:
+    """
+    glob过滤：模式同时匹配相对监听根目录的路径和文件名，如 "*.py"、"src/*"、".git"。
+    被 ignore_patterns 匹配的目录不再进入。
+    """
+
+    def __init__(self, patterns: Iterable[str] | None = None, ignore_patterns: Iterable[str] | None = None):
+        self.patterns = list(patterns or ['*'])
+        self.ignore_patterns = list(ignore_patterns or [])
+
+    @staticmethod
+    def _match(patterns: List[str], relative_path: str) -> bool:
+        name = os.path.basename(relative_path)
+        return any(fnmatch.fnmatch(relative_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+    def ignored(self, relative_path: str) -> bool:
+        return self._match(self.ignore_patterns, relative_path)
+
+    def accepts(self, relative_path: str) -> bool:
+        return self._match(self.patterns, relative_path) and not self.ignored(relative_path)
+
+
+class FileWatcher:
+    """文件监听基类"""
+    backend = ''
+
+    def __init__(self, paths: Iterable[str], path_filter: PathFilter | None = None, recursive: bool = True):
+        """
+        :param paths: 监听的目录或文件
+        :param path_filter: 路径过滤，默认不过滤
+        :param recursive: 是否监听子目录
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.path_filter = path_filter or PathFilter()
+        self.recursive = recursive
+
+    def _relative(self, root: str, path: str) -> str:
+        if path == root:
+            return os.path.basename(path)
+        return os.path.relpath(path, root).replace(os.sep, '/')
+
+    def _walk(self, root: str, start: str | None = None):
+        """遍历root（或其中的start）下未被忽略的目录，返回 (目录, 文件名列表)"""
+        for directory, dir_names, file_names in os.walk(start or root):
+            dir_names[:] = [
+                name for name in dir_names
+                if not self.path_filter.ignored(self._relative(root, os.path.join(directory, name)))
+            ]
+            if not self.recursive:
+                dir_names[:] = []
+            yield directory, file_names
+
+    def poll(self) -> Set[str]:
+        """返回自上次调用以来变化的文件路径（不阻塞）"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(FileWatcher):
+    """对比 (mtime_ns, size) 快照的轮询监听"""
+    backend = WATCH_BACKEND_POLL
+
+    def __init__(self, paths: Iterable[str], path_filter: PathFilter | None = None, recursive: bool = True):
+        super().__init__(paths, path_filter, recursive)
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for root in self.paths:
+            if os.path.isfile(root):
+                candidates = [(root, root)]
+            else:
+                candidates = (
+                    (root, os.path.join(directory, name))
+                    for directory, file_names in self._walk(root)
+                    for name in file_names
+                )
+            for candidate_root, path in candidates:
+                if not self.path_filter.accepts(self._relative(candidate_root, path)):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Set[str]:
+        snapshot = self._scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        changed = {path for path, state in snapshot.items() if previous.get(path) != state}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Linux inotify监听。每个目录一个watch，递归监听时新建的子目录会自动加入。
+    事件队列溢出时退化为一次全量扫描，报告监听范围内的所有文件。
+    """
+    backend = WATCH_BACKEND_INOTIFY
+    _libc = None
+
+    def __init__(self, paths: Iterable[str], path_filter: PathFilter | None = None, recursive: bool = True):
+        """
+        :raises OSError: 当前平台不支持inotify，或watch数量超过系统上限（fs.inotify.max_user_watches）
+        """
+        super().__init__(paths, path_filter, recursive)
+        libc = self._load_libc()
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            self._raise_errno("inotify_init1")
+        # wd -> (监听根目录, 被监听的路径)
+        self._watches: Dict[int, Tuple[str, str]] = {}
+        # 直接监听的文件（非目录）
+        self._file_roots = {path for path in self.paths if not os.path.isdir(path)}
+        try:
+            for root in self.paths:
+                if root in self._file_roots:
+                    self._add_watch(root, root, only_dir=False)
+                else:
+                    self._add_tree(root, root)
+        except OSError:
+            self.close()
+            raise
+
+    @classmethod
+    def _load_libc(cls):
+        if cls._libc is None:
+            library = ctypes.util.find_library('c')
+            try:
+                libc = ctypes.CDLL(library, use_errno=True)
+                libc.inotify_init1, libc.inotify_add_watch
+            except (OSError, AttributeError) as e:
+                raise OSError(errno.ENOSYS, f"当前平台不支持inotify: {e}")
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            cls._libc = libc
+        return cls._libc
+
+    @staticmethod
+    def _raise_errno(function: str):
+        code = ctypes.get_errno()
+        raise OSError(code, f"{function}: {os.strerror(code)}")
+
+    def _add_watch(self, root: str, path: str, only_dir: bool = True) -> bool:
+        mask = _WATCH_MASK | (_IN_ONLYDIR if only_dir else 0)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):
+                # 添加前已被删除
+                return False
+            self._raise_errno("inotify_add_watch")
+        self._watches[wd] = (root, path)
+        return True
+
+    def _add_tree(self, root: str, directory: str) -> Set[str]:
+        """监听directory及其子目录，返回其中已存在的文件（新建目录时这些文件可能早于watch创建）"""
+        files = set()
+        if directory != root and self.path_filter.ignored(self._relative(root, directory)):
+            return files
+        for current, file_names in self._walk(root, directory):
+            if not self._add_watch(root, current):
+                continue
+            for name in file_names:
+                path = os.path.join(current, name)
+                if self.path_filter.accepts(self._relative(root, path)):
+                    files.add(path)
+        return files
+
+    def _read_events(self) -> List[Tuple[int, int, str]]:
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+
+    def poll(self) -> Set[str]:
+        if self._fd < 0:
+            return set()
+        changed = set()
+        for wd, mask, name in self._read_events():
+            if mask & _IN_Q_OVERFLOW:
+                changed.update(self._rescan())
+                continue
+            if mask & _IN_IGNORED:
+                root, _ = self._watches.pop(wd, (None, None))
+                # 编辑器保存时常以重命名替换文件，原inode的watch随之失效，需要重新监听
+                if root in self._file_roots and self._add_watch(root, root, only_dir=False):
+                    changed.add(root)
+                continue
+            watch = self._watches.get(wd)
+            if watch is None:
+                continue
+            root, watched_path = watch
+            path = os.path.join(watched_path, name) if name else watched_path
+            if mask & _IN_ISDIR:
+                if self.recursive and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    changed.update(self._add_tree(root, path))
+                continue
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF) and path not in self._file_roots:
+                # 目录被删除时，其中的文件已有各自的事件
+                continue
+            if self.path_filter.accepts(self._relative(root, path)):
+                changed.add(path)
+        return changed
+
+    def _rescan(self) -> Set[str]:
+        files = set()
+        for root in self.paths:
+            if root in self._file_roots:
+                files.add(root)
+                continue
+            for directory, file_names in self._walk(root):
+                for name in file_names:
+                    path = os.path.join(directory, name)
+                    if self.path_filter.accepts(self._relative(root, path)):
+                        files.add(path)
+        return files
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+
+def create_watcher(paths: Iterable[str], path_filter: PathFilter | None = None, recursive: bool = True,
+                   backend: str = WATCH_BACKEND_AUTO) -> FileWatcher:
+    """
+    创建文件监听。auto优先使用inotify，不可用（非Linux、watch数量超限等）时退化为轮询。
+
+    :raises ValueError: 未知的backend
+    :raises OSError: 指定inotify但不可用
+    """
+    if backend not in WATCH_BACKENDS:
+        raise ValueError(f"未知的监听方式: {backend}，可选: {', '.join(WATCH_BACKENDS)}")
+    paths = list(paths)
+    if backend == WATCH_BACKEND_POLL:
+        return PollingWatcher(paths, path_filter, recursive)
+    try:
+        return InotifyWatcher(paths, path_filter, recursive)
+    except OSError:
+        if backend == WATCH_BACKEND_INOTIFY:
+            raise
+    return PollingWatcher(paths, path_filter, recursive)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+输入指纹工具：供增量执行（INCREMENTAL工作流）声明输入使用。
+所有方法只读取文件系统元数据，不启动子进程。
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional
+import glob
+import os
+
+
+class Fingerprint:
+    """常用输入指纹的计算方法"""
+
+    @staticmethod
+    def files(*patterns: str) -> Dict[str, List[int]]:
+        """
+        文件指纹：匹配到的每个文件的 [mtime_ns, size]。
+        支持glob（含 ** 递归），目录会递归展开为其中的文件。
+
+        :param patterns: 文件路径或glob模式
+        :return: {路径: [mtime_ns, size]}
+        """
+        result = {}
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+                if os.path.isdir(path):
+                    for root, _, file_names in os.walk(path):
+                        for file_name in file_names:
+                            Fingerprint._add_file(result, os.path.join(root, file_name))
+                else:
+                    Fingerprint._add_file(result, path)
+        return dict(sorted(result.items()))
+
+    @staticmethod
+    def _add_file(result: dict, path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # 不存在的文件也是一种状态
+            result[path] = None
+            return
+        result[path] = [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _git_dir(repo_path: str) -> Optional[str]:
+        git_path = os.path.join(repo_path, '.git')
+        if os.path.isdir(git_path):
+            return git_path
+        if os.path.isfile(git_path):
+            # worktree/submodule: .git 文件内容为 "gitdir: <path>"
+            with open(git_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir:'):
+                return os.path.normpath(os.path.join(repo_path, content[len('gitdir:'):].strip()))
+        return None
+
+    @staticmethod
+    def _read_ref(git_dir: str, ref: str) -> Optional[str]:
+        ref_path = os.path.join(git_dir, *ref.split('/'))
+        if os.path.isfile(ref_path):
+            with open(ref_path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        # worktree中的分支引用保存在公共目录
+        common_path = os.path.join(git_dir, 'commondir')
+        search_dirs = [git_dir]
+        if os.path.isfile(common_path):
+            with open(common_path, 'r', encoding='utf-8') as f:
+                common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+            search_dirs.append(common_dir)
+            common_ref_path = os.path.join(common_dir, *ref.split('/'))
+            if os.path.isfile(common_ref_path):
+                with open(common_ref_path, 'r', encoding='utf-8') as f:
+                    return f.read().strip()
+        for directory in search_dirs:
+            packed_path = os.path.join(directory, 'packed-refs')
+            if not os.path.isfile(packed_path):
+                continue
+            with open(packed_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.strip().split(' ', 1)
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        return None
+
+    @staticmethod
+    def git_ref(repo_path: str, ref: str = 'HEAD') -> Optional[str]:
+        """
+        读取Git引用指向的提交（不启动git进程）。
+
+        :param repo_path: 仓库路径
+        :param ref: HEAD、refs/heads/main、refs/remotes/origin/main 等
+        :return: 提交哈希，无法解析时返回None
+        """
+        git_dir = Fingerprint._git_dir(repo_path)
+        if git_dir is None:
+            return None
+        value = Fingerprint._read_ref(git_dir, ref)
+        # 跟随符号引用，如 "ref: refs/heads/main"
+        for _ in range(5):
+            if value is None or not value.startswith('ref:'):
+                break
+            value = Fingerprint._read_ref(git_dir, value[len('ref:'):].strip())
+        return value
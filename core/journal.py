@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+运行日志（检查点）：记录一次运行中每个成功完成的 run_flow 调用，
+进程中断后可通过 --resume <run_id> 回放已完成的步骤，从第一个未完成的步骤继续执行。
+
+调用位置由调用树路径表示，每一层为 "工作流类:参数哈希#序号"，
+序号为同一父调用中相同工作流+参数的第几次调用，因此并行调用的位置也是确定的。
+"""
+
+from __future__ import annotations
+from typing import Any, Optional, Tuple
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+# 默认运行日志路径
+DEFAULT_JOURNAL_PATH = os.path.join('data', 'state', 'run_journal.db')
+# 保留天数：超过该天数未更新的运行（含未完成的运行）连同检查点一起删除
+DEFAULT_JOURNAL_RETENTION_DAYS = 30
+
+
+def _stable_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _stable_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_stable_value(item) for item in value]
+    if callable(value):
+        target = getattr(value, '__func__', value)
+        name = getattr(target, '__qualname__', None) or type(target).__qualname__
+        return f"<callable {getattr(target, '__module__', None)}.{name}>"
+    if type(value).__repr__ is object.__repr__:
+        # 默认repr包含内存地址
+        return f"<{type(value).__module__}.{type(value).__qualname__}>"
+    return repr(value)
+
+
+def position_params(params: dict) -> dict:
+    """
+    参与调用位置哈希的参数。函数、对象的默认repr带有内存地址，每个进程都不同，
+    可调用对象使用其模块和限定名代替，其他默认repr的对象只保留类型名，使恢复运行时位置一致。
+    """
+    return _stable_value(params)
+
+
+def new_run_id() -> str:
+    """按时间排序、可读的运行ID，如 20240101-120000-1a2b3c"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class RunJournal:
+    """
+    线程安全的检查点存储，数据库文件在首次使用时创建。
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id TEXT PRIMARY KEY,"
+                " params TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " started_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " run_id TEXT NOT NULL,"
+                " position TEXT NOT NULL,"
+                " class_name TEXT NOT NULL,"
+                " result BLOB,"
+                " shared BLOB,"
+                " finished_at REAL NOT NULL,"
+                " PRIMARY KEY (run_id, position))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def start_run(self, run_id: str, params: dict):
+        """登记一次运行及其入口参数（含flow），恢复时据此重新启动。"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR IGNORE INTO runs (run_id, params, status, started_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, json.dumps(params, ensure_ascii=False, default=repr), 'running', now, now),
+            )
+            connection.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", ('running', now, run_id)
+            )
+            connection.commit()
+
+    def finish_run(self, run_id: str, status: str):
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?", (status, time.time(), run_id)
+            )
+            connection.commit()
+
+    def get_run(self, run_id: str) -> Optional[Tuple[dict, str]]:
+        """
+        :return: (入口参数, 状态)，运行不存在时返回None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT params, status FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get_checkpoint(self, run_id: str, position: str) -> Optional[Tuple[Any, Optional[dict]]]:
+        """
+        :return: (结果, 完成时的共享上下文)，不存在或无法反序列化时返回None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT result, shared FROM checkpoints WHERE run_id = ? AND position = ?", (run_id, position)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0]), pickle.loads(row[1]) if row[1] is not None else None
+        except Exception:
+            return None
+
+    def put_checkpoint(self, run_id: str, position: str, class_name: str, result: Any,
+                       shared: dict | None = None) -> bool:
+        """
+        记录一个完成的调用，结果不可pickle时不记录并返回False。
+        共享上下文不可pickle时只记录结果。
+        """
+        try:
+            payload = pickle.dumps(result)
+        except Exception:
+            return False
+        try:
+            shared_payload = pickle.dumps(shared) if shared is not None else None
+        except Exception:
+            shared_payload = None
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, position, class_name, result, shared, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, position, class_name, payload, shared_payload, time.time()),
+            )
+            connection.commit()
+        return True
+
+    def apply_retention(self, retention_days: float = DEFAULT_JOURNAL_RETENTION_DAYS,
+                        now: float | None = None) -> int:
+        """删除超过保留期未更新的运行及其检查点，返回删除的运行数"""
+        now = time.time() if now is None else now
+        with self._lock:
+            connection = self._connect()
+            expired = [row[0] for row in connection.execute(
+                "SELECT run_id FROM runs WHERE updated_at < ?", (now - retention_days * 86400,)
+            )]
+            for run_id in expired:
+                connection.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+                connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            connection.commit()
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,11 +1,51 @@
 # -*- coding: utf-8 -*-
 
+import atexit
+import contextlib
+import contextvars
+import queue
+import sys
+import threading
+
+# 当前线程/任务的附加日志输出（守护进程把日志回传给客户端时使用）
+_LOG_SINK = contextvars.ContextVar('workflow_log_sink', default=None)
+
+# 日志级别序号（与loguru一致），用于在格式化之前过滤
+_LEVEL_NO = {
+    'debug': 10,
+    'info': 20,
+    'warning': 30,
+    'error': 40,
+    'exception': 40,
+    'critical': 50,
+}
+
+# 写入线程的队列上限，写入跟不上时调用方等待，内存占用有上限
+_QUEUE_MAX_SIZE = 10000
+_STOP = object()
+
+# loguru只对字符串格式自动追加异常信息，文件sink使用格式函数，需要显式写出{exception}
+_FORMATS = {
+    'console': "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
+    'file': "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}\n{exception}",
+    'error': "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {extra[thread]} | {message}\n{exception}",
+}
+
+
+def _file_format(record):
+    """同一个文件只注册一个sink，ERROR及以上的日志附带调用线程名"""
+    return _FORMATS['error'] if record["level"].no >= _LEVEL_NO['error'] else _FORMATS['file']
+
+
 class WorkflowLogger:
     """
     单例日志工具类，封装loguru，支持全局调用。
+    调用方只做级别检查并把消息放入有界队列，格式化和控制台/文件I/O在后台写入线程中完成。
     """
     _instance = None
     _inited = False
+    _init_lock = threading.Lock()
+    LEVEL = "INFO"
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -17,42 +57,120 @@ class WorkflowLogger:
         if not cls._instance:
             cls._instance = WorkflowLogger()
         if not cls._inited:
-            cls._instance._init_logger()
+            with cls._init_lock:
+                if not cls._inited:
+                    cls._instance._init_logger()
         return cls._instance
 
     def _init_logger(self):
         from loguru import logger
-        import sys
         import os
-        
+
         os.makedirs('logs', exist_ok=True)
         logger.remove()
-        
-        # 统一的日志格式配置
-        formats = {
-            'console': "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
-            'file': "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-            'error': "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {file}:{line} | {message}"
-        }
-        
+
         # 控制台日志配置
-        logger.add(sys.stdout, format=formats['console'], level="INFO", backtrace=False, diagnose=False)
-        
+        logger.add(sys.stdout, format=_FORMATS['console'], level=self.LEVEL, backtrace=False, diagnose=False)
+
         # 文件日志配置
-        logger.add("logs/workflow.log", rotation="10 MB", encoding="utf-8", level="INFO", format=formats['file'])
-        logger.add("logs/workflow.log", rotation="10 MB", encoding="utf-8", level="ERROR", format=formats['error'])
-        
+        logger.add("logs/workflow.log", rotation="10 MB", encoding="utf-8", level=self.LEVEL, format=_file_format)
+
+        self._logger = logger
+        self._min_level_no = _LEVEL_NO[self.LEVEL.lower()]
+        self._queue = queue.Queue(maxsize=_QUEUE_MAX_SIZE)
+        self._writer = threading.Thread(target=self._write_loop, name="workflow-logger", daemon=True)
+        self._writer.start()
+        atexit.register(self.shutdown)
         WorkflowLogger._inited = True
 
+    def is_enabled(self, level: str) -> bool:
+        """该级别的日志是否会输出（调用方可据此跳过消息拼接）"""
+        return _LEVEL_NO[level] >= self._min_level_no
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, level, msg, exc_info, thread_name):
+        try:
+            logger = self._logger
+            if _LEVEL_NO[level] >= _LEVEL_NO['error']:
+                logger = logger.bind(thread=thread_name)
+            if exc_info is not None:
+                logger.opt(exception=exc_info).error(msg)
+            elif level == 'exception':
+                logger.error(msg)
+            else:
+                getattr(logger, level)(msg)
+        except Exception as e:
+            print(f"写入日志失败: {e}", file=sys.stderr)
+
     def _log(self, level, msg):
         """统一的日志记录方法"""
-        from loguru import logger
-        getattr(logger, level)(msg)
-
-    def __getattr__(self, name):
-        """动态处理日志方法调用"""
-        if name in ['info', 'warning', 'error', 'exception', 'debug', 'critical']:
-            def log_method(msg):
-                self._log(name, msg)
-            return log_method
-        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'") 
\ No newline at end of file
+        if _LEVEL_NO[level] < self._min_level_no:
+            return
+        # 异常信息只在调用线程中可用
+        exc_info = sys.exc_info() if level == 'exception' else None
+        if exc_info is not None and exc_info[0] is None:
+            exc_info = None
+        sink = _LOG_SINK.get()
+        if sink is not None:
+            text = str(msg)
+            if exc_info is not None:
+                import traceback
+                text = f"{text}\n{''.join(traceback.format_exception(*exc_info))}"
+            sink(level, text)
+        item = (level, msg, exc_info, threading.current_thread().name)
+        if self._writer.is_alive():
+            self._queue.put(item)
+        else:
+            # 写入线程已停止（进程退出阶段），直接写出
+            self._write(*item)
+
+    def flush(self):
+        """等待队列中的日志全部写出"""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def shutdown(self):
+        """写出剩余日志并停止写入线程（进程退出时自动调用）"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def capture(sink):
+        """
+        在当前上下文中额外把日志交给sink(level, message)处理，
+        通过 ExecutionContext.bind 启动的线程同样生效。
+        """
+        token = _LOG_SINK.set(sink)
+        try:
+            yield
+        finally:
+            _LOG_SINK.reset(token)
+
+    def debug(self, msg):
+        self._log('debug', msg)
+
+    def info(self, msg):
+        self._log('info', msg)
+
+    def warning(self, msg):
+        self._log('warning', msg)
+
+    def error(self, msg):
+        self._log('error', msg)
+
+    def exception(self, msg):
+        self._log('exception', msg)
+
+    def critical(self, msg):
+        self._log('critical', msg)
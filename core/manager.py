@@ -1,52 +1,134 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
-from typing import Type, Any
+from typing import Type, Any, List
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from collections import Counter
+from types import MappingProxyType
 import importlib
 import json
-from core.config import Config
+from core import event_loop
+from core.config import Config, ConfigSnapshot
+from core.event_loop import EventLoopThread
+from core.context import ExecutionContext, StepCounter, WorkflowCycleError
+from core.journal import RunJournal, new_run_id, position_params
+from core.registry import WorkflowRegistry
+from core.parallel import FlowOutcome, normalize_flow_specs, resolve_max_workers
+from core.result_cache import ResultCache, make_cache_key, stable_params_hash, workflow_class_name
+from core.run_log import RunLog
+from core.single_flight import SingleFlight
+from core.state_store import StateStore
+from core.subprocess_executor import SubprocessExecutor
 from core.workflow import BaseWorkflow
 from core.logger import WorkflowLogger
 from core.utils import Utils
 from core.constants import (
     LOG_FLOW_START_FORMAT,
     LOG_FLOW_END_FORMAT,
+    LOG_FLOW_CACHED_FORMAT,
+    LOG_FLOW_UP_TO_DATE_FORMAT,
+    LOG_FLOW_RESUMED_FORMAT,
+    LOG_FLOW_JOINED_FORMAT,
     LOG_FLOW_START_TREE,
     LOG_FLOW_END_TREE,
     LOG_FLOW_MID_TREE,
     LogTreePreType,
     LOG_TREE_INDENT,
+    PARAM_RUN_IN_PROCESS,
+    PARAM_RESULT_CACHE_DIR,
+    PARAM_MAX_SUBPROCESSES,
+    PARAM_FORCE_RUN,
+    PARAM_RESUME,
+    PARAM_LIST_FLOWS,
+    WorkflowStatus,
 )
 
 
 class WorkflowManager:
-    def __init__(self, cli_params: dict | None = None):
+    def __init__(self, cli_params: dict | None = None, max_process_workers: int | None = None,
+                 result_cache: ResultCache | None = None, state_store: StateStore | None = None,
+                 journal: RunJournal | None = None, run_id: str | None = None, run_log: RunLog | None = None):
+        """
+        :param cli_params: 命令行/入口参数
+        :param max_process_workers: 进程池大小，默认为CPU核数
+        :param result_cache: 结果缓存，默认为仅内存的ResultCache
+        :param state_store: 增量执行状态库，默认为 DEFAULT_STATE_STORE_PATH（首次使用时创建）
+        :param journal: 运行日志，为None时不记录检查点
+        :param run_id: 运行ID，使用已有运行ID时回放其检查点，默认生成新ID
+        :param run_log: 结构化运行日志，为None时不记录
+        """
         cli_params = cli_params or {}
 
-        self._shared_context = {}
-        shared_config = Config(params=self._shared_context, parent=None)
-        self.global_config = Config(params=cli_params, parent=shared_config)
-        self.call_stack = set()
-        self._config_stack = [self.global_config]
-        self.flow_depth = -1  # 深度计数器，从-1开始
+        self._shared_config = Config(params={}, parent=None)
+        self.global_config = Config(params=cli_params, parent=self._shared_config)
+        self._event_loop = None
+        self._event_loop_lock = threading.Lock()
+        self._max_process_workers = max_process_workers
+        self._process_executor = None
+        # 子进程中的管理器不再向进程池分发
+        self._in_worker = False
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+        self.state_store = state_store if state_store is not None else StateStore()
+        self._run_stats = Counter()
+        self._run_stats_lock = threading.Lock()
+        self.journal = journal
+        self.run_log = run_log
+        if run_log is not None:
+            self.run_id = run_log.run_id
+        else:
+            self.run_id = (run_id or new_run_id()) if journal is not None else None
+        self._root_steps = StepCounter()
+        self.single_flight = SingleFlight()
+
+    @property
+    def _current_context(self) -> ExecutionContext | None:
+        """当前线程/任务中属于本管理器的执行上下文。"""
+        return ExecutionContext.current(self)
 
     @property
     def _current_config(self) -> Config:
-        return self._config_stack[-1]
+        context = self._current_context
+        return context.config if context is not None else self.global_config
+
+    @property
+    def flow_depth(self) -> int:
+        """当前调用链深度，未执行任何工作流时为-1。"""
+        context = self._current_context
+        return context.depth if context is not None else -1
+
+    @property
+    def call_stack(self) -> tuple:
+        """当前调用链上的工作流类（由外到内）。"""
+        context = self._current_context
+        if context is None:
+            return ()
+        return tuple(node.workflow_class for node in reversed(list(context.chain())))
+
+    @property
+    def _shared_context(self) -> MappingProxyType:
+        """当前共享上下文的只读视图。"""
+        return MappingProxyType(self._shared_config._params)
 
     def log(self, *args, tree_type=LogTreePreType.MID, **kwargs):
         """
         以当前工作流的树状结构打印日志消息。
         tree_type: LogTreeType.START|MID|END，决定树状符号
         """
-        prefix = self._get_tree_prefix(tree_type=tree_type)
-        WorkflowLogger.instance().info(prefix + " ".join(str(a) for a in args))
+        logger = WorkflowLogger.instance()
+        if not logger.is_enabled('info'):
+            return
+        message = " ".join(str(a) for a in args)
+        if self.run_log is not None:
+            self.run_log.event(self._current_context, 'info', message)
+        logger.info(self._get_tree_prefix(tree_type=tree_type) + message)
 
     def _get_tree_prefix(self, tree_type=LogTreePreType.MID):
         """每层只加一次缩进和树状符号，支持LogTreeType三种类型。"""
-        if self.flow_depth <= 0:
+        flow_depth = self.flow_depth
+        if flow_depth <= 0:
             return ""
-        indent = LOG_TREE_INDENT * (self.flow_depth - 1)
+        indent = LOG_TREE_INDENT * (flow_depth - 1)
         if tree_type == LogTreePreType.START:
             tree = LOG_FLOW_START_TREE
         elif tree_type == LogTreePreType.END:
@@ -56,7 +138,15 @@ class WorkflowManager:
         return f"{indent}{tree}"
 
     def set_shared_value(self, key: str, value):
-        self._shared_context[key] = value
+        # 通过Config写入，以便失效所有作用域中依赖该键的解析缓存
+        self._shared_config.set_param(key, value)
+
+    def pin_shared_context(self) -> ConfigSnapshot:
+        """
+        固定当前版本的共享上下文，返回只读快照（带version）。
+        后台线程/进程应读取快照，而不是直接读取实时的共享上下文。
+        """
+        return self._shared_config.snapshot()
 
     def _handle_workflow_error(self, workflow_class: Type[BaseWorkflow], error: Exception):
         """统一的错误处理方法"""
@@ -69,79 +159,447 @@ class WorkflowManager:
         WorkflowLogger.instance().exception(error)
 
     def _setup_workflow_execution(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
-        """设置工作流执行环境"""
-        if workflow_class in self.call_stack:
-            self.log(f"错误：检测到循环依赖！工作流 '{workflow_class.__name__}' 已在调用栈中。")
-            return None, None
-
-        self.call_stack.add(workflow_class)
-        self.flow_depth += 1  # 运行前深度+1
+        """设置工作流执行环境，返回新的执行上下文及恢复用的token"""
+        parent_context = self._current_context
+        if parent_context is not None and parent_context.contains(workflow_class):
+            raise WorkflowCycleError(f"错误：检测到循环依赖！工作流 '{workflow_class.__name__}' 已在调用栈中。")
 
         default_params = workflow_class.default_params()
         all_flow_params = Utils.merge_dicts(default_params, flow_params or {})
         flow_config = Config(params=all_flow_params, parent=self._current_config)
-        self._config_stack.append(flow_config)
+        position = self._journal_position(workflow_class, flow_config, flow_params, parent_context)
+        flow_context = ExecutionContext(self, workflow_class, flow_config, parent_context, position)
 
-        return flow_config, workflow_class
+        return flow_context, ExecutionContext.enter(flow_context)
 
-    def _cleanup_workflow_execution(self, workflow_class: Type[BaseWorkflow], flow_config: Config):
+    def _cleanup_workflow_execution(self, token):
         """清理工作流执行环境"""
-        if flow_config and self._config_stack and self._config_stack[-1] is flow_config:
-            self._config_stack.pop()
-        if workflow_class in self.call_stack:
-            self.call_stack.remove(workflow_class)
-        self.flow_depth -= 1  # 运行后深度-1
+        if token is not None:
+            ExecutionContext.exit(token)
 
     def run_flow(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None) -> Any:
-        flow_config = None
+        result, _ = self._run_flow_safely(workflow_class, flow_params)
+        return result
+
+    def _start_workflow(self, workflow_class: Type[BaseWorkflow], flow_context: ExecutionContext) -> BaseWorkflow:
+        """打印开始日志，创建并初始化工作流实例"""
+        if self.run_log is not None:
+            self.run_log.span_start(flow_context)
+        self.log(
+            LOG_FLOW_START_FORMAT.format(name=workflow_class.__name__),
+            tree_type=LogTreePreType.START,
+        )
+        workflow_instance = workflow_class(manager=self, config=flow_context.config)
+        workflow_instance.init()
+        return workflow_instance
+
+    def _finish_workflow(self, workflow_class: Type[BaseWorkflow], flow_context: ExecutionContext, result: Any):
+        """打印结束日志"""
+        self.log(
+            LOG_FLOW_END_FORMAT.format(name=workflow_class.__name__),
+            tree_type=LogTreePreType.END,
+        )
+        self._end_span(flow_context, result)
+
+    def _end_span(self, flow_context: ExecutionContext | None, result: Any = None, error: Exception | None = None):
+        """在结构化运行日志中结束该调用（未开始的调用忽略）"""
+        if self.run_log is not None and flow_context is not None:
+            self.run_log.span_end(flow_context, result, error)
+
+    def _resolved_flow_params(self, workflow_class: Type[BaseWorkflow], flow_config: Config,
+                              flow_params: dict | None) -> dict:
+        """工作流声明的参数（默认参数+调用参数）在其作用域中的解析值"""
+        keys = dict.fromkeys([*workflow_class.default_params(), *(flow_params or {})])
+        return {key: flow_config.get_param(key) for key in keys}
+
+    def _journal_position(self, workflow_class: Type[BaseWorkflow], flow_config: Config, flow_params: dict | None,
+                          parent_context: ExecutionContext | None) -> str | None:
+        """本次调用在调用树中的位置，未启用运行日志时返回None"""
+        if self.journal is None:
+            return None
+        resolved_params = self._resolved_flow_params(workflow_class, flow_config, flow_params)
+        step = f"{workflow_class_name(workflow_class)}:{stable_params_hash(position_params(resolved_params))[:16]}"
+        if parent_context is not None and parent_context.position is not None:
+            return f"{parent_context.position}/{step}#{parent_context.steps.next(step)}"
+        return f"/{step}#{self._root_steps.next(step)}"
+
+    def _replay_checkpoint(self, workflow_class: Type[BaseWorkflow], position: str | None):
+        """
+        查找本次运行中该位置的检查点，返回 (是否命中, 结果)。
+        命中时同时恢复该步骤完成时的共享上下文。
+        """
+        if position is None:
+            return False, None
+        checkpoint = self.journal.get_checkpoint(self.run_id, position)
+        if checkpoint is None:
+            return False, None
+        result, shared = checkpoint
+        for key, value in (shared or {}).items():
+            self.set_shared_value(key, value)
+        self.log(LOG_FLOW_RESUMED_FORMAT.format(name=workflow_class.__name__))
+        self._count_stat("checkpoint_replays")
+        return True, result
+
+    def _record_checkpoint(self, workflow_class: Type[BaseWorkflow], position: str | None, result: Any):
+        if position is None or Utils.is_error_result(result):
+            return
+        shared = dict(self._shared_config._params)
+        self.journal.put_checkpoint(self.run_id, position, workflow_class_name(workflow_class), result, shared)
+
+    def _lookup_cached_result(self, workflow_class: Type[BaseWorkflow], flow_context: ExecutionContext,
+                              flow_params: dict | None):
+        """
+        查找结果缓存，返回 (cache_key, 是否命中, 结果)。
+        未选择缓存的工作流返回的cache_key为None。
+        """
+        if not workflow_class.CACHE_RESULT:
+            return None, False, None
+        cache_key = make_cache_key(
+            workflow_class, self._resolved_flow_params(workflow_class, flow_context.config, flow_params)
+        )
+        hit, result = self.result_cache.get(cache_key)
+        if hit:
+            self.log(LOG_FLOW_CACHED_FORMAT.format(name=workflow_class.__name__))
+        return cache_key, hit, result
+
+    def _check_incremental(self, workflow_instance: BaseWorkflow, flow_context: ExecutionContext,
+                           flow_params: dict | None):
+        """
+        增量执行检查，返回 (state, 是否可跳过, 上次结果)。
+        state为 (state_key, 指纹哈希)，未启用增量执行时为None。
+        """
+        workflow_class = type(workflow_instance)
+        if not workflow_class.INCREMENTAL:
+            return None, False, None
+        fingerprints = workflow_instance.input_fingerprints()
+        if fingerprints is None:
+            return None, False, None
+
+        # 强制执行时照常记录本次指纹，force_run本身不参与状态键
+        force_run = flow_context.config.get_param(PARAM_FORCE_RUN, False)
+        resolved_params = self._resolved_flow_params(workflow_class, flow_context.config, flow_params)
+        resolved_params.pop(PARAM_FORCE_RUN, None)
+        state_key = make_cache_key(workflow_class, resolved_params)
+        fingerprint = stable_params_hash({"params": resolved_params, "inputs": fingerprints})
+        stored = None if force_run else self.state_store.get(state_key)
+        if stored is not None and stored[0] == fingerprint:
+            self.log(LOG_FLOW_UP_TO_DATE_FORMAT.format(name=workflow_class.__name__))
+            self._count_stat("incremental_skips")
+            return None, True, stored[1]
+        self._count_stat("incremental_runs")
+        return (state_key, fingerprint), False, None
+
+    def _count_stat(self, name: str, amount: int = 1):
+        with self._run_stats_lock:
+            self._run_stats[name] += amount
+
+    def _after_workflow_success(self, workflow_instance: BaseWorkflow, flow_context: ExecutionContext,
+                                cache_key: str | None, result: Any, state: tuple | None = None):
+        """工作流正常返回后：写入检查点、结果缓存和增量执行记录，并失效其声明的依赖缓存"""
+        workflow_class = type(workflow_instance)
+        self._record_checkpoint(workflow_class, flow_context.position, result)
+        failed = Utils.is_error_result(result)
+        if cache_key is not None and not failed:
+            self.result_cache.put(cache_key, workflow_class_name(workflow_class), result, workflow_class.CACHE_TTL)
+        if state is not None and not failed:
+            state_key, fingerprint = state
+            self.state_store.put(state_key, workflow_class_name(workflow_class), fingerprint, result)
+        if not failed:
+            for invalidated_class in workflow_instance.invalidates_cache():
+                self.result_cache.invalidate_class(workflow_class_name(invalidated_class))
+
+    def _single_flight_key(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None) -> str | None:
+        """单飞合并的键，未选择合并或在自身调用栈中（将报循环依赖）时返回None"""
+        if not workflow_class.SINGLE_FLIGHT:
+            return None
+        parent_context = self._current_context
+        if parent_context is not None and parent_context.contains(workflow_class):
+            return None
+        flow_config = Config(
+            params=Utils.merge_dicts(workflow_class.default_params(), flow_params or {}),
+            parent=self._current_config,
+        )
+        return make_cache_key(workflow_class, self._resolved_flow_params(workflow_class, flow_config, flow_params))
+
+    def _on_single_flight_join(self, workflow_class: Type[BaseWorkflow]):
+        self.log(LOG_FLOW_JOINED_FORMAT.format(name=workflow_class.__name__))
+        self._count_stat("single_flight_joins")
+
+    def _run_flow_safely(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """执行工作流并返回 (result, error)，异常已记录日志，不会向外抛出。"""
+        single_flight_key = self._single_flight_key(workflow_class, flow_params)
+        if single_flight_key is not None:
+            return self.single_flight.run(
+                single_flight_key, self._run_flow_once, workflow_class, flow_params,
+                on_join=lambda: self._on_single_flight_join(workflow_class),
+            )
+        return self._run_flow_once(workflow_class, flow_params)
+
+    def _run_flow_once(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """_run_flow_safely 的实际执行部分（不做单飞合并）"""
+        if self._should_run_in_process(workflow_class, flow_params):
+            return self._run_flow_in_process(workflow_class, flow_params)
+        if Utils.is_async_workflow_class(workflow_class):
+            return self._run_async_flow_blocking(workflow_class, flow_params)
+
+        token = None
+        flow_context = None
 
         try:
             # 设置执行环境
-            flow_config, workflow_class = self._setup_workflow_execution(workflow_class, flow_params)
-            if flow_config is None:
-                return None
-
-            # 工作流开始日志
-            self.log(
-                LOG_FLOW_START_FORMAT.format(name=workflow_class.__name__),
-                tree_type=LogTreePreType.START,
-            )
+            flow_context, token = self._setup_workflow_execution(workflow_class, flow_params)
+
+            replayed, result = self._replay_checkpoint(workflow_class, flow_context.position)
+            if replayed:
+                return result, None
+
+            cache_key, hit, cached_result = self._lookup_cached_result(workflow_class, flow_context, flow_params)
+            if hit:
+                return cached_result, None
             
             # 执行工作流
-            workflow_instance = workflow_class(manager=self, config=flow_config)
-            workflow_instance.init()
-            result = workflow_instance.run()
+            workflow_instance = self._start_workflow(workflow_class, flow_context)
+            state, up_to_date, stored_result = self._check_incremental(workflow_instance, flow_context, flow_params)
+            result = stored_result if up_to_date else workflow_instance.run()
             
-            # 工作流结束日志
-            self.log(
-                LOG_FLOW_END_FORMAT.format(name=workflow_class.__name__),
-                tree_type=LogTreePreType.END,
+            self._finish_workflow(workflow_class, flow_context, result)
+            self._after_workflow_success(workflow_instance, flow_context, cache_key, result, None if up_to_date else state)
+            return result, None
+
+        except WorkflowCycleError as e:
+            self.log(str(e))
+            return None, e
+        except Exception as e:
+            self._handle_workflow_error(workflow_class, e)
+            self._end_span(flow_context, error=e)
+            return None, e
+        finally:
+            self._cleanup_workflow_execution(token)
+
+    @property
+    def event_loop(self) -> EventLoopThread:
+        """管理器持有的事件循环（首次使用时在后台线程启动）。"""
+        if self._event_loop is None:
+            with self._event_loop_lock:
+                if self._event_loop is None:
+                    self._event_loop = EventLoopThread()
+        return self._event_loop
+
+    async def run_flow_async(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None) -> Any:
+        """
+        以协程方式执行工作流。异步工作流直接在当前事件循环中await，
+        同步工作流在线程池中执行，不会阻塞事件循环。
+        """
+        result, _ = await self._run_flow_safely_async(workflow_class, flow_params)
+        return result
+
+    async def _run_flow_safely_async(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """_run_flow_safely 的协程版本"""
+        if not Utils.is_async_workflow_class(workflow_class):
+            return await event_loop.run_in_thread(
+                ExecutionContext.bind(self._run_flow_safely), workflow_class, flow_params
             )
-            return result
+        single_flight_key = self._single_flight_key(workflow_class, flow_params)
+        if single_flight_key is not None:
+            return await self.single_flight.run_async(
+                single_flight_key, self._run_flow_once_async, workflow_class, flow_params,
+                on_join=lambda: self._on_single_flight_join(workflow_class),
+            )
+        return await self._run_flow_once_async(workflow_class, flow_params)
+
+    async def _run_flow_once_async(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """_run_flow_safely_async 的实际执行部分（不做单飞合并）"""
+        token = None
+        flow_context = None
+
+        try:
+            flow_context, token = self._setup_workflow_execution(workflow_class, flow_params)
+
+            replayed, result = self._replay_checkpoint(workflow_class, flow_context.position)
+            if replayed:
+                return result, None
+
+            cache_key, hit, cached_result = self._lookup_cached_result(workflow_class, flow_context, flow_params)
+            if hit:
+                return cached_result, None
+
+            workflow_instance = self._start_workflow(workflow_class, flow_context)
+            state, up_to_date, stored_result = self._check_incremental(workflow_instance, flow_context, flow_params)
+            result = stored_result if up_to_date else await workflow_instance.run()
 
+            self._finish_workflow(workflow_class, flow_context, result)
+            self._after_workflow_success(workflow_instance, flow_context, cache_key, result, None if up_to_date else state)
+            return result, None
+
+        except WorkflowCycleError as e:
+            self.log(str(e))
+            return None, e
         except Exception as e:
             self._handle_workflow_error(workflow_class, e)
-            return None
+            self._end_span(flow_context, error=e)
+            return None, e
         finally:
-            self._cleanup_workflow_execution(workflow_class, flow_config)
+            self._cleanup_workflow_execution(token)
+
+    def _run_async_flow_blocking(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """在同步代码中执行异步工作流：投递到管理器的事件循环并等待结果。"""
+        coro = ExecutionContext.bind_async(self._run_flow_once_async)(workflow_class, flow_params)
+        try:
+            return self.event_loop.run(coro)
+        except RuntimeError as e:
+            self._handle_workflow_error(workflow_class, e)
+            return None, e
+
+    def _should_run_in_process(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None) -> bool:
+        """工作流是否选择在进程池中执行"""
+        if self._in_worker:
+            return False
+        if getattr(workflow_class, 'RUN_IN_PROCESS', False):
+            return True
+        if flow_params and PARAM_RUN_IN_PROCESS in flow_params:
+            return bool(flow_params[PARAM_RUN_IN_PROCESS])
+        return bool(workflow_class.default_params().get(PARAM_RUN_IN_PROCESS, False))
+
+    @property
+    def process_executor(self):
+        """管理器持有的进程池（首次使用时创建）。"""
+        if self._process_executor is None:
+            from core.process_pool import ProcessFlowExecutor
+            with self._event_loop_lock:
+                if self._process_executor is None:
+                    self._process_executor = ProcessFlowExecutor(
+                        log_func=WorkflowLogger.instance().info,
+                        error_func=WorkflowLogger.instance().error,
+                        max_workers=self._max_process_workers,
+                    )
+        return self._process_executor
+
+    def _run_flow_in_process(self, workflow_class: Type[BaseWorkflow], flow_params: dict | None = None):
+        """在进程池中执行工作流，合并子进程的共享值写入，返回 (result, error)。"""
+        parent_context = self._current_context
+        if parent_context is not None and parent_context.contains(workflow_class):
+            error = WorkflowCycleError(f"错误：检测到循环依赖！工作流 '{workflow_class.__name__}' 已在调用栈中。")
+            self.log(str(error))
+            return None, error
+
+        try:
+            position = None
+            if self.journal is not None:
+                flow_config = Config(
+                    params=Utils.merge_dicts(workflow_class.default_params(), flow_params or {}),
+                    parent=self._current_config,
+                )
+                position = self._journal_position(workflow_class, flow_config, flow_params, parent_context)
+                replayed, result = self._replay_checkpoint(workflow_class, position)
+                if replayed:
+                    return result, None
+
+            snapshot = self._current_config.snapshot()
+            result, error, shared_writes = self.process_executor.run(
+                workflow_class, flow_params, snapshot, self.flow_depth + 1
+            )
+        except Exception as e:
+            self._handle_workflow_error(workflow_class, e)
+            return None, e
+
+        for key, value in shared_writes:
+            self.set_shared_value(key, value)
+        if error is None:
+            self._record_checkpoint(workflow_class, position, result)
+        return result, error
+
+    def log_run_summary(self):
+        """打印本次运行的统计信息"""
+        stats = self.result_cache.stats()
+        if stats["hits"] or stats["misses"]:
+            self.log(f"[运行统计] 结果缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，淘汰 {stats['evictions']} 条")
+        if self._run_stats["incremental_skips"] or self._run_stats["incremental_runs"]:
+            self.log(f"[运行统计] 增量执行: 跳过 {self._run_stats['incremental_skips']} 次，执行 {self._run_stats['incremental_runs']} 次")
+        if self._run_stats["checkpoint_replays"]:
+            self.log(f"[运行统计] 检查点恢复: 回放 {self._run_stats['checkpoint_replays']} 个已完成步骤")
+        if self._run_stats["single_flight_joins"]:
+            self.log(f"[运行统计] 单飞合并: {self._run_stats['single_flight_joins']} 次调用复用了进行中的相同调用")
+
+    def close(self):
+        """释放管理器持有的资源（事件循环线程、进程池）。"""
+        if self._event_loop is not None:
+            self._event_loop.stop()
+            self._event_loop = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown()
+            self._process_executor = None
+        self.state_store.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.run_log is not None:
+            self.run_log.close()
+
+    def run_flows_parallel(self, flows: list, max_workers: int | None = None) -> List[FlowOutcome]:
+        """
+        在有界线程池中并行执行多个子工作流。
+
+        :param flows: [(WorkflowClass, params), ...]，也可以直接传WorkflowClass
+        :param max_workers: 最大并发数，默认 DEFAULT_MAX_WORKERS
+        :return: 与flows顺序一致的 FlowOutcome 列表，单个失败不影响其他任务
+        """
+        specs = normalize_flow_specs(flows)
+        if not specs:
+            return []
+
+        workers = resolve_max_workers(max_workers, len(specs))
+        self.log(f"并行执行 {len(specs)} 个工作流，最大并发数: {workers}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow") as executor:
+            futures = [
+                executor.submit(ExecutionContext.bind(self._run_flow_safely), workflow_class, params)
+                for workflow_class, params in specs
+            ]
+            outcomes = [
+                FlowOutcome(workflow_class, params, *future.result())
+                for (workflow_class, params), future in zip(specs, futures)
+            ]
+
+        failed_count = sum(1 for outcome in outcomes if not outcome.ok)
+        self.log(f"并行执行完成: 成功 {len(outcomes) - failed_count} 个，失败 {failed_count} 个")
+        return outcomes
+
+    def map_flow(self, workflow_class: Type[BaseWorkflow], params_list: list, max_workers: int | None = None) -> List[FlowOutcome]:
+        """用不同参数并行执行同一个工作流，返回顺序与params_list一致。"""
+        return self.run_flows_parallel([(workflow_class, params) for params in params_list], max_workers)
 
 #region 工作流静态方法
     @staticmethod
     def find_workflow_class(flow_name: str):
         """
         支持目录.文件（如 demo.async_test_flow）格式，精确查找对应workflow类。
+        优先使用注册表索引定位模块和类名，不在索引中时按命名约定导入。
         """
         if '.' not in flow_name:
             raise ValueError("flow_name 必须为 '目录.文件' 格式，如 demo.main_test_flow")
-        module_path = f"workflows.{flow_name.replace('-', '_')}"
+        entry = WorkflowRegistry.instance().get(flow_name)
+        if entry is not None:
+            module_path, class_name = entry.module, entry.class_name
+        else:
+            module_path = f"workflows.{flow_name.replace('-', '_')}"
+            class_name = Utils.flow_name_to_class_name(flow_name.split('.')[-1])
         workflow_module = importlib.import_module(module_path)
-        class_name = Utils.flow_name_to_class_name(flow_name.split('.')[-1])
         if hasattr(workflow_module, class_name):
             obj = getattr(workflow_module, class_name)
             if Utils.is_valid_workflow_class(obj):
                 return obj
         raise AttributeError(f"在 '{flow_name}.py' 中未找到类名为 '{class_name}' 的 BaseWorkflow 子类。")
 
+    @staticmethod
+    def list_flows():
+        """打印所有可用的工作流（基于注册表，不导入模块）。"""
+        logger = WorkflowLogger.instance()
+        flows = WorkflowRegistry.instance().flows()
+        logger.info(f"可用工作流 ({len(flows)} 个):")
+        for entry in flows:
+            description = f" - {entry.description}" if entry.description else ""
+            logger.info(f"  {entry.flow_name} ({entry.class_name}){description}")
+            if entry.default_params:
+                logger.info(f"      默认参数: {json.dumps(entry.default_params, ensure_ascii=False)}")
+
     @staticmethod
     def handle_workflow_error(error: Exception, context: str = "工作流执行"):
         """
@@ -166,12 +624,13 @@ class WorkflowManager:
         """
         with open(json_path, 'r', encoding='utf-8') as f:
             params = json.load(f)
-        WorkflowManager.run_workflow_from_dict(params)
+        return WorkflowManager.run_workflow_from_dict(params)
 
     @staticmethod
-    def run_workflow_from_dict(params: dict):
+    def run_workflow_from_dict(params: dict, run_id: str | None = None):
         """
-        直接用dict参数执行工作流。
+        直接用dict参数执行工作流，返回主工作流的结果。
+        每次运行都会记录检查点，run_id为已有运行ID时回放其已完成的步骤。
         """
         flow_name = params.get('flow')
         if not flow_name:
@@ -182,19 +641,70 @@ class WorkflowManager:
         
         try:
             main_workflow_class = WorkflowManager.find_workflow_class(flow_name)
-            manager = WorkflowManager(cli_params=cli_params)
-            manager.run_flow(workflow_class=main_workflow_class)
+            result_cache_dir = cli_params.get(PARAM_RESULT_CACHE_DIR)
+            if cli_params.get(PARAM_MAX_SUBPROCESSES) is not None:
+                SubprocessExecutor.instance().set_limit(None, int(cli_params[PARAM_MAX_SUBPROCESSES]))
+            journal = RunJournal()
+            run_log = RunLog(run_id or new_run_id())
+            manager = WorkflowManager(
+                cli_params=cli_params,
+                result_cache=ResultCache(disk_dir=result_cache_dir),
+                journal=journal,
+                run_log=run_log,
+            )
+            try:
+                journal.start_run(manager.run_id, params)
+                run_log.start_run(flow_name)
+                manager.log(f"[运行ID]: {manager.run_id}")
+                result, error = manager._run_flow_safely(main_workflow_class)
+                succeeded = error is None and not Utils.is_error_result(result)
+                status = (WorkflowStatus.SUCCESS if succeeded else WorkflowStatus.ERROR).value
+                journal.finish_run(manager.run_id, status)
+                journal.apply_retention()
+                run_log.finish_run(status)
+                run_log.index.apply_retention()
+                if not succeeded:
+                    manager.log(f"运行未完成，可通过 --{PARAM_RESUME} {manager.run_id} 从中断处继续执行")
+                manager.log_run_summary()
+                return result
+            finally:
+                manager.close()
         except Exception as e:
             WorkflowManager.handle_workflow_error(e, f"执行工作流 '{flow_name}'")
 
+    @staticmethod
+    def resume_workflow(run_id: str, override_params: dict | None = None):
+        """
+        恢复一次中断的运行：使用其入口参数重新执行，已完成的步骤直接回放检查点结果。
+
+        :param run_id: 要恢复的运行ID
+        :param override_params: 覆盖原入口参数的参数
+        """
+        journal = RunJournal()
+        try:
+            run = journal.get_run(run_id)
+        finally:
+            journal.close()
+        if run is None:
+            WorkflowLogger.instance().error(f"未找到运行记录: {run_id}")
+            return
+        params, _ = run
+        return WorkflowManager.run_workflow_from_dict(Utils.merge_dicts(params, override_params), run_id=run_id)
+
     @staticmethod
     def run_workflow(params: dict):
         """
-        工作流主入口。支持传入dict或通过flow_data字段指定json文件。
+        工作流主入口。支持传入dict、通过flow_data字段指定json文件，或通过resume字段恢复中断的运行，
+        list_flows为True时只列出可用的工作流。返回主工作流的结果。
         """
+        if params.get(PARAM_LIST_FLOWS):
+            WorkflowManager.list_flows()
+            return
+        resume_run_id = params.get(PARAM_RESUME)
+        if resume_run_id:
+            return WorkflowManager.resume_workflow(resume_run_id, Utils.exclude_dict(params, [PARAM_RESUME]))
         flow_data = params.get('flow_data')
         if flow_data:
-            WorkflowManager.run_workflow_from_json(flow_data)
-        else:
-            WorkflowManager.run_workflow_from_dict(params)
+            return WorkflowManager.run_workflow_from_json(flow_data)
+        return WorkflowManager.run_workflow_from_dict(params)
 #endregion
\ No newline at end of file
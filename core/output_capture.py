@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+命令输出文件：子进程的stdout/stderr直接写入按运行分目录的日志文件（不经过Python逐行读取），
+结束后只读取文件头尾生成摘要写入工作流日志。
+"""
+
+from __future__ import annotations
+from typing import List, NamedTuple
+import datetime
+import itertools
+import os
+
+# 默认输出目录，按运行ID分子目录
+DEFAULT_OUTPUT_DIR = os.path.join('logs', 'output')
+
+# 读取文件头尾时的最大字节数（超长的行会被截断）
+_EDGE_BYTES = 64 * 1024
+_COUNT_CHUNK = 1024 * 1024
+
+_sequence = itertools.count(1)
+
+
+class OutputSummary(NamedTuple):
+    """输出摘要：头部行、省略的行数、尾部行（不超过头尾行数之和时全部在head中）"""
+    head: List[str]
+    omitted: int
+    tail: List[str]
+    line_count: int
+    byte_count: int
+
+
+class CommandOutputFile:
+    """一次命令执行的输出文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def create(cls, output_dir: str | None = None, run_id: str | None = None, name: str = 'cmd') -> CommandOutputFile:
+        """
+        在 output_dir/run_id/ 下创建新的输出文件路径（不创建文件）。
+
+        :param output_dir: 输出目录，默认为 DEFAULT_OUTPUT_DIR
+        :param run_id: 运行ID，None时使用当天日期
+        :param name: 文件名中的标识（如工作流名）
+        """
+        directory = os.path.join(output_dir or DEFAULT_OUTPUT_DIR, run_id or datetime.date.today().strftime('%Y%m%d'))
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime('%H%M%S')
+        file_name = f"{timestamp}_{os.getpid()}_{next(_sequence):04d}_{name}.log"
+        return cls(os.path.join(directory, file_name))
+
+    @property
+    def byte_count(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _count_lines(self) -> int:
+        count = 0
+        last = b'\n'
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_COUNT_CHUNK), b''):
+                count += chunk.count(b'\n')
+                last = chunk[-1:]
+        # 最后一行没有换行符
+        return count + (0 if last == b'\n' else 1)
+
+    @staticmethod
+    def _decode_lines(data: bytes, encoding: str) -> List[str]:
+        lines = data.decode(encoding, errors='replace').splitlines()
+        return [line.rstrip() for line in lines if line.strip()]
+
+    def summarize(self, lines: int = 10, encoding: str = 'utf-8') -> OutputSummary:
+        """读取文件头尾各lines个非空行，其余只计数"""
+        byte_count = self.byte_count
+        if byte_count == 0:
+            return OutputSummary([], 0, [], 0, 0)
+        line_count = self._count_lines()
+        with open(self.path, 'rb') as f:
+            if byte_count <= _EDGE_BYTES:
+                all_lines = self._decode_lines(f.read(), encoding)
+                if len(all_lines) <= lines * 2:
+                    return OutputSummary(all_lines, 0, [], line_count, byte_count)
+                return OutputSummary(all_lines[:lines], len(all_lines) - lines * 2, all_lines[-lines:], line_count, byte_count)
+            head_data = f.read(_EDGE_BYTES)
+            f.seek(byte_count - _EDGE_BYTES)
+            tail_data = f.read()
+        # 去掉可能被截断的首尾不完整行
+        head = self._decode_lines(head_data.rsplit(b'\n', 1)[0], encoding)[:lines]
+        tail = self._decode_lines(tail_data.split(b'\n', 1)[-1], encoding)[-lines:]
+        return OutputSummary(head, max(line_count - len(head) - len(tail), 0), tail, line_count, byte_count)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+并行执行子工作流的结果类型与参数规范化
+"""
+
+from __future__ import annotations
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+# 并行执行的默认最大并发数
+DEFAULT_MAX_WORKERS = 8
+
+
+class FlowOutcome(NamedTuple):
+    """单个子工作流的执行结果，error为None表示执行成功。"""
+    workflow_class: Type
+    params: Optional[dict]
+    result: Any
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+FlowSpec = Union[Type, Tuple[Type, Optional[dict]]]
+
+
+def normalize_flow_specs(flows: Iterable[FlowSpec]) -> List[Tuple[Type, Optional[dict]]]:
+    """
+    将 [WorkflowClass, (WorkflowClass, params), ...] 统一为 [(WorkflowClass, params), ...]
+    """
+    specs = []
+    for item in flows:
+        if isinstance(item, tuple):
+            workflow_class, params = item
+        else:
+            workflow_class, params = item, None
+        specs.append((workflow_class, params))
+    return specs
+
+
+def resolve_max_workers(max_workers: int | None, task_count: int) -> int:
+    """计算实际线程数：不超过任务数，至少为1。"""
+    if max_workers is None or max_workers <= 0:
+        max_workers = DEFAULT_MAX_WORKERS
+    return max(1, min(max_workers, task_count))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+进程池执行器：把CPU密集型工作流放到子进程中执行。
+
+父进程把当前作用域的 ConfigSnapshot 发送给子进程，子进程用它重建配置作用域链并执行工作流，
+执行结果和 set_shared_value 写入随返回值带回父进程合并，日志通过队列实时回传到父进程的树状日志。
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+import concurrent.futures
+import itertools
+import multiprocessing
+import threading
+import traceback
+from core.constants import LogTreePreType
+
+if TYPE_CHECKING:
+    from core.config import ConfigSnapshot
+    from core.workflow import BaseWorkflow
+
+# 日志队列中表示某次调用结束的消息级别
+_DONE_LEVEL = '__done__'
+
+# 子进程中的日志队列（由进程池initializer设置）
+_worker_log_queue = None
+
+
+def _init_worker(log_queue):
+    global _worker_log_queue
+    _worker_log_queue = log_queue
+
+
+def _build_worker_manager(invocation_id: int, snapshot: ConfigSnapshot, depth_offset: int):
+    """在子进程中构建只转发日志、记录共享值写入的管理器。"""
+    from core.config import Config
+    from core.manager import WorkflowManager
+
+    class _WorkerManager(WorkflowManager):
+        def __init__(self):
+            super().__init__()
+            self._in_worker = True
+            self.shared_writes: List[Tuple[str, Any]] = []
+            # 重建作用域链：共享值(可写) -> 父作用域可见值 -> 调用方本层参数
+            inherited_config = Config(params=dict(snapshot._inherited), parent=self._shared_config)
+            self.global_config = Config(params=dict(snapshot._params), parent=inherited_config)
+
+        @property
+        def flow_depth(self) -> int:
+            return WorkflowManager.flow_depth.fget(self) + depth_offset
+
+        def log(self, *args, tree_type=LogTreePreType.MID, **kwargs):
+            prefix = self._get_tree_prefix(tree_type=tree_type)
+            _worker_log_queue.put((invocation_id, 'info', prefix + " ".join(str(a) for a in args)))
+
+        def set_shared_value(self, key: str, value):
+            super().set_shared_value(key, value)
+            self.shared_writes.append((key, value))
+
+        def _handle_workflow_error(self, workflow_class, error):
+            self.log(f"执行工作流 '{workflow_class.__name__}' 时发生未知错误: {error}")
+            _worker_log_queue.put((invocation_id, 'error', traceback.format_exc()))
+
+    return _WorkerManager()
+
+
+def _run_in_worker(invocation_id: int, workflow_class: Type[BaseWorkflow], flow_params: Optional[dict],
+                   snapshot: ConfigSnapshot, depth_offset: int):
+    """子进程入口：执行工作流，返回 (result, error, shared_writes)。"""
+    manager = _build_worker_manager(invocation_id, snapshot, depth_offset)
+    try:
+        result, error = manager._run_flow_safely(workflow_class, flow_params)
+        return result, error, manager.shared_writes
+    finally:
+        manager.close()
+        _worker_log_queue.put((invocation_id, _DONE_LEVEL, None))
+
+
+class ProcessFlowExecutor:
+    """
+    父进程侧的进程池执行器，负责提交任务和回放子进程日志。
+    使用spawn方式创建子进程，工作流类及其参数、返回值必须可以被pickle。
+    """
+
+    def __init__(self, log_func, error_func, max_workers: int | None = None):
+        """
+        :param log_func: 写入一行info日志的函数
+        :param error_func: 写入一行error日志的函数
+        :param max_workers: 进程数，默认为CPU核数
+        """
+        self._log_func = log_func
+        self._error_func = error_func
+        self._mp_context = multiprocessing.get_context('spawn')
+        self._log_queue = self._mp_context.Queue()
+        self._pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=self._mp_context,
+            initializer=_init_worker,
+            initargs=(self._log_queue,),
+        )
+        self._ids = itertools.count(1)
+        self._done_events: Dict[int, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._listener = threading.Thread(target=self._drain_logs, name="workflow-process-logs", daemon=True)
+        self._listener.start()
+
+    def _drain_logs(self):
+        while True:
+            message = self._log_queue.get()
+            if message is None:
+                return
+            invocation_id, level, text = message
+            if level == _DONE_LEVEL:
+                with self._lock:
+                    event = self._done_events.pop(invocation_id, None)
+                if event is not None:
+                    event.set()
+            elif level == 'error':
+                self._error_func(text)
+            else:
+                self._log_func(text)
+
+    def run(self, workflow_class: Type[BaseWorkflow], flow_params: Optional[dict],
+            snapshot: ConfigSnapshot, depth_offset: int):
+        """
+        在子进程中执行工作流并等待完成。
+        工作流自身的异常已在子进程中记录并通过error返回；进程池层面的失败会直接抛出。
+
+        :return: (result, error, shared_writes)
+        """
+        invocation_id = next(self._ids)
+        done = threading.Event()
+        with self._lock:
+            self._done_events[invocation_id] = done
+        future = self._pool.submit(_run_in_worker, invocation_id, workflow_class, flow_params, snapshot, depth_offset)
+        try:
+            outcome = future.result()
+        except Exception:
+            # 序列化失败或子进程崩溃，不一定会收到结束消息
+            with self._lock:
+                self._done_events.pop(invocation_id, None)
+            raise
+        # 等待该调用的日志全部回放后再返回，保证父进程日志顺序
+        done.wait()
+        return outcome
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+        self._log_queue.put(None)
+        self._listener.join()
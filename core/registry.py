@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""
+工作流注册表：通过AST扫描 workflows/ 目录（不导入模块），建立
+流程名 -> 模块/类名/默认参数 的索引，缓存到磁盘并按文件mtime增量失效。
+
+流程名与 find_workflow_class 的约定一致："目录.文件"，类名由文件名转换而来，
+如 git.git_status_flow -> workflows.git.git_status_flow.GitStatusFlow。
+"""
+
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional
+import ast
+import json
+import os
+import threading
+import time
+from core.utils import Utils
+
+# 项目根目录（workflows/ 与 core/ 所在目录）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WORKFLOWS_DIR = os.path.join(PROJECT_ROOT, 'workflows')
+DEFAULT_REGISTRY_CACHE_PATH = os.path.join('data', 'state', 'workflow_registry.json')
+# 参与基类解析的核心模块
+BASE_MODULE_FILES = (os.path.join(PROJECT_ROOT, 'core', 'workflow.py'),)
+# 所有工作流的根基类
+ROOT_WORKFLOW_CLASS = 'core.workflow.BaseWorkflow'
+ASYNC_WORKFLOW_CLASS = 'core.workflow.AsyncBaseWorkflow'
+
+# 缓存格式版本，解析逻辑变化时递增
+_CACHE_VERSION = 1
+# 查找不到流程时重新扫描的最小间隔（秒），避免大量无效名称反复扫描目录
+MISS_REFRESH_INTERVAL = 1.0
+
+
+class RegistryEntry(NamedTuple):
+    """注册表中的一个工作流"""
+    flow_name: str
+    module: str
+    class_name: str
+    path: str
+    description: str
+    # 合并父类后的默认参数，含无法静态求值的DEFAULT_PARAMS时为None
+    default_params: Optional[dict]
+    is_async: bool
+
+
+def _literal(node: ast.AST):
+    """静态求值并确认可JSON序列化，失败时抛出ValueError"""
+    value = ast.literal_eval(node)
+    json.dumps(value)
+    return value
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        prefix = _dotted_name(node.value)
+        return f"{prefix}.{node.attr}" if prefix else None
+    return None
+
+
+def parse_module(path: str, module: str) -> Dict[str, dict]:
+    """
+    解析模块中的类定义。
+
+    :return: {类名: {"bases": [全限定基类名], "params": 本类DEFAULT_PARAMS, "dynamic": 是否无法静态求值, "doc": 说明}}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    imports = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        if node.level:
+            # 相对导入：from .base import X
+            package = module.rsplit('.', node.level)[0]
+            source = f"{package}.{node.module}" if node.module else package
+        else:
+            source = node.module
+        for alias in node.names:
+            imports[alias.asname or alias.name] = f"{source}.{alias.name}"
+
+    local_classes = {node.name for node in tree.body if isinstance(node, ast.ClassDef)}
+    classes = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = []
+        for base in node.bases:
+            name = _dotted_name(base)
+            if name is None:
+                continue
+            head, _, rest = name.partition('.')
+            if head in local_classes and not rest:
+                bases.append(f"{module}.{name}")
+            elif head in imports:
+                bases.append(f"{imports[head]}.{rest}" if rest else imports[head])
+            else:
+                bases.append(name)
+
+        params, dynamic = {}, False
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == 'DEFAULT_PARAMS' for target in statement.targets
+            ):
+                try:
+                    params, dynamic = _literal(statement.value), False
+                except (ValueError, TypeError, SyntaxError):
+                    params, dynamic = {}, True
+
+        doc = ast.get_docstring(node) or ''
+        classes[node.name] = {
+            "bases": bases,
+            "params": params,
+            "dynamic": dynamic,
+            "doc": doc.strip().splitlines()[0] if doc.strip() else '',
+        }
+    return classes
+
+
+class WorkflowRegistry:
+    """
+    工作流索引。首次使用时加载磁盘缓存，只重新解析mtime/大小变化的文件。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workflows_dir: str = DEFAULT_WORKFLOWS_DIR,
+                 cache_path: str | None = DEFAULT_REGISTRY_CACHE_PATH):
+        """
+        :param workflows_dir: 工作流目录
+        :param cache_path: 磁盘缓存路径，None表示不落盘
+        """
+        self.workflows_dir = workflows_dir
+        self.cache_path = cache_path
+        self._lock = threading.RLock()
+        # 相对路径 -> {"mtime_ns", "size", "module", "classes"}
+        self._files: Dict[str, dict] = {}
+        self._entries: Optional[Dict[str, RegistryEntry]] = None
+        # 流程名 -> 定义该工作流及其基类的源文件 [(缓存键, 绝对路径)]
+        self._entry_sources: Dict[str, List[tuple]] = {}
+        self._last_refresh = 0.0
+
+    @classmethod
+    def instance(cls) -> WorkflowRegistry:
+        """进程内共享的注册表"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = WorkflowRegistry()
+        return cls._instance
+
+    def _source_files(self) -> Dict[str, str]:
+        """{缓存键: 绝对路径}，包含workflows目录下的所有模块和核心基类模块"""
+        files = {}
+        root = os.path.dirname(self.workflows_dir)
+        for directory, dir_names, file_names in os.walk(self.workflows_dir):
+            dir_names[:] = sorted(name for name in dir_names if not name.startswith(('.', '__')))
+            for file_name in sorted(file_names):
+                if file_name.endswith('.py') and not file_name.startswith('__'):
+                    path = os.path.join(directory, file_name)
+                    files[os.path.relpath(path, root)] = path
+        for path in BASE_MODULE_FILES:
+            files[os.path.relpath(path, PROJECT_ROOT)] = path
+        return files
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == _CACHE_VERSION and data.get("workflows_dir") == self.workflows_dir:
+            self._files = data.get("files", {})
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": _CACHE_VERSION, "workflows_dir": self.workflows_dir, "files": self._files},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def refresh(self) -> bool:
+        """
+        重新检查所有源文件，解析有变化的文件。
+
+        :return: 索引是否发生变化
+        """
+        with self._lock:
+            if self._entries is None and not self._files:
+                self._load_cache()
+            changed = False
+            files = {}
+            paths = self._source_files()
+            for key, path in paths.items():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached = self._files.get(key)
+                if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+                    files[key] = cached
+                    continue
+                module = os.path.splitext(key)[0].replace(os.sep, '.')
+                try:
+                    classes = parse_module(path, module)
+                except (SyntaxError, UnicodeDecodeError, OSError):
+                    classes = {}
+                files[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "module": module, "classes": classes}
+                changed = True
+            changed = changed or files.keys() != self._files.keys()
+            self._files = files
+            if changed:
+                self._save_cache()
+            if changed or self._entries is None:
+                self._entries, self._entry_sources = self._build_entries(paths)
+            self._last_refresh = time.monotonic()
+            return changed
+
+    def _build_entries(self, paths: Dict[str, str]) -> tuple:
+        """
+        :param paths: {缓存键: 绝对路径}
+        :return: (流程名 -> RegistryEntry, 流程名 -> 继承链上的源文件)
+        """
+        classes = {}
+        class_files = {}
+        for key, info in self._files.items():
+            for class_name, class_info in info["classes"].items():
+                classes[f"{info['module']}.{class_name}"] = class_info
+                class_files[f"{info['module']}.{class_name}"] = key
+
+        def lineage(qualified_name: str, seen: tuple = ()) -> Optional[List[str]]:
+            """返回到根基类的继承链（由近到远），无法到达根基类时返回None"""
+            if qualified_name == ROOT_WORKFLOW_CLASS:
+                return [qualified_name]
+            class_info = classes.get(qualified_name)
+            if class_info is None or qualified_name in seen:
+                return None
+            for base in class_info["bases"]:
+                chain = lineage(base, seen + (qualified_name,))
+                if chain is not None:
+                    return [qualified_name] + chain
+            return None
+
+        entries = {}
+        sources = {}
+        prefix = os.path.basename(self.workflows_dir) + '.'
+        for key, info in self._files.items():
+            module = info["module"]
+            if not module.startswith(prefix):
+                continue
+            class_name = Utils.flow_name_to_class_name(module.rsplit('.', 1)[-1])
+            qualified_name = f"{module}.{class_name}"
+            chain = lineage(qualified_name)
+            if chain is None:
+                continue
+            # 与 BaseWorkflow.default_params 一致：由远到近合并
+            default_params = {}
+            for name in reversed(chain):
+                class_info = classes[name]
+                if class_info["dynamic"]:
+                    default_params = None
+                    break
+                default_params.update(class_info["params"])
+            flow_name = module[len(prefix):]
+            entries[flow_name] = RegistryEntry(
+                flow_name=flow_name,
+                module=module,
+                class_name=class_name,
+                path=os.path.join(os.path.dirname(self.workflows_dir), key),
+                description=classes[qualified_name]["doc"],
+                default_params=default_params,
+                is_async=ASYNC_WORKFLOW_CLASS in chain,
+            )
+            source_keys = dict.fromkeys(class_files[name] for name in chain if name in class_files)
+            sources[flow_name] = [(source_key, paths[source_key]) for source_key in source_keys if source_key in paths]
+        return dict(sorted(entries.items())), sources
+
+    def _ensure_loaded(self):
+        if self._entries is None:
+            self.refresh()
+
+    def _is_stale(self, flow_name: str) -> bool:
+        """工作流或其基类所在的文件在上次扫描后是否被修改或删除"""
+        for key, path in self._entry_sources.get(flow_name, ()):
+            cached = self._files.get(key)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return True
+            if cached is None or cached["mtime_ns"] != stat.st_mtime_ns or cached["size"] != stat.st_size:
+                return True
+        return False
+
+    def get(self, flow_name: str) -> Optional[RegistryEntry]:
+        """
+        按流程名查找（'-' 视为 '_'）。命中时检查其源文件（含基类）是否变化，变化则重新扫描；
+        找不到时至多每 MISS_REFRESH_INTERVAL 秒重新扫描一次。
+        """
+        self._ensure_loaded()
+        flow_name = flow_name.replace('-', '_')
+        entry = self._entries.get(flow_name)
+        if entry is not None:
+            if self._is_stale(flow_name):
+                self.refresh()
+                entry = self._entries.get(flow_name)
+        elif time.monotonic() - self._last_refresh >= MISS_REFRESH_INTERVAL:
+            self.refresh()
+            entry = self._entries.get(flow_name)
+        return entry
+
+    def has_flow(self, flow_name: str) -> bool:
+        """校验流程名是否存在，不导入任何模块"""
+        return self.get(flow_name) is not None
+
+    def flows(self) -> List[RegistryEntry]:
+        """所有工作流（按流程名排序），每次调用都检查源文件变化"""
+        self.refresh()
+        return list(self._entries.values())
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+run_flow 结果缓存：按 工作流类 + 解析后参数的稳定哈希 缓存结果。
+
+内存层为带TTL的LRU，可选磁盘层（pickle文件）在多次运行之间复用结果。
+工作流通过类属性选择加入：
+    CACHE_RESULT = True        # 缓存本工作流的结果
+    CACHE_TTL = 10             # 结果有效期（秒），None表示不过期
+    INVALIDATES_CACHE = (...)  # 本工作流成功执行后，失效这些工作流类的缓存
+    invalidates_cache()        # 按本次参数覆盖 INVALIDATES_CACHE（如只读操作返回空元组）
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+# 内存层默认最大条目数
+DEFAULT_CACHE_MAX_ENTRIES = 256
+
+
+def workflow_class_name(workflow_class: Type) -> str:
+    """工作流类的全限定名，作为缓存和索引中的类标识。"""
+    return f"{workflow_class.__module__}.{workflow_class.__qualname__}"
+
+
+def stable_params_hash(params: dict) -> str:
+    """参数的稳定哈希：键排序后的JSON，无法序列化的值使用repr。"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def make_cache_key(workflow_class: Type, resolved_params: dict) -> str:
+    return f"{workflow_class_name(workflow_class)}:{stable_params_hash(resolved_params)}"
+
+
+class ResultCache:
+    """
+    线程安全的两级结果缓存。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES, disk_dir: str | None = None):
+        """
+        :param max_entries: 内存层最大条目数，超出后按LRU淘汰
+        :param disk_dir: 磁盘层目录，None表示只使用内存层
+        """
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        # key -> (class_name, expires_at, value)
+        self._entries: OrderedDict[str, Tuple[str, Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def _class_digest(class_name: str) -> str:
+        return hashlib.sha256(class_name.encode('utf-8')).hexdigest()[:16]
+
+    def _disk_path(self, key: str) -> str:
+        # 文件名以类名摘要开头，按类失效时无需读取文件内容
+        class_name = key.rsplit(':', 1)[0]
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f"{self._class_digest(class_name)}_{digest}.pkl")
+
+    def _load_from_disk(self, key: str):
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, entry = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+        if stored_key != key:
+            return None
+        return entry
+
+    def _save_to_disk(self, key: str, entry):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, entry), f)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PickleError, TypeError, AttributeError):
+            # 结果不可pickle时只保留在内存层
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_from_disk(self, key: str):
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        查找缓存。
+
+        :return: (是否命中, 结果副本)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self.disk_dir:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._entries[key] = entry
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            # 从磁盘层载入的条目同样占用内存层名额
+            self._evict_overflow()
+            self.hits += 1
+        try:
+            return True, copy.deepcopy(entry[2])
+        except Exception:
+            return True, entry[2]
+
+    def put(self, key: str, class_name: str, value: Any, ttl: float | None = None):
+        """写入缓存，ttl为None表示不过期。"""
+        try:
+            # 保存副本，调用方随后修改返回值不影响缓存
+            value = copy.deepcopy(value)
+        except Exception:
+            pass
+        entry = (class_name, time.time() + ttl if ttl is not None else None, value)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict_overflow()
+        if self.disk_dir:
+            self._save_to_disk(key, entry)
+
+    def _evict_overflow(self):
+        """按LRU淘汰超出max_entries的内存条目（磁盘层保留），调用方需持有锁"""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        self._entries.pop(key, None)
+        if self.disk_dir:
+            self._remove_from_disk(key)
+
+    def invalidate_class(self, class_name: str) -> int:
+        """失效某个工作流类的所有缓存，返回失效的条目数。"""
+        removed = 0
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] == class_name]:
+                self._drop(key)
+                removed += 1
+            if self.disk_dir:
+                prefix = f"{self._class_digest(class_name)}_"
+                for file_name in os.listdir(self.disk_dir):
+                    if file_name.startswith(prefix) and file_name.endswith('.pkl'):
+                        try:
+                            os.remove(os.path.join(self.disk_dir, file_name))
+                            removed += 1
+                        except OSError:
+                            pass
+        return removed
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+"""
+结构化运行日志：每个事件一行JSON，写入 logs/runs/ 下按运行分的文件，
+同时在SQLite索引中记录每次运行和每个工作流调用（span）的状态及其在文件中的偏移，
+按运行、工作流类或状态查询时只需查索引并定位读取，不必扫描日志文件。
+
+记录格式：
+    {"ts": 时间戳, "run": 运行ID, "span": 调用ID, "parent": 上层调用ID, "flow": 工作流类全名,
+     "depth": 调用深度, "level": 级别, "event": "start"|"log"|"end", "msg": 消息,
+     "status": 结束状态（end）, "duration": 耗时秒数（end）}
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from core.constants import WorkflowStatus
+from core.result_cache import workflow_class_name
+from core.utils import Utils
+
+if TYPE_CHECKING:
+    from core.context import ExecutionContext
+
+# 默认目录：JSONL文件和索引库
+DEFAULT_RUN_LOG_DIR = os.path.join('logs', 'runs')
+# 保留天数，超过的运行连同日志文件一起删除
+DEFAULT_RETENTION_DAYS = 30
+# 结束超过该天数的运行日志压缩为gzip
+DEFAULT_COMPRESS_AFTER_DAYS = 1
+
+_INDEX_FILE_NAME = 'index.db'
+_SPAN_RUNNING = 'running'
+
+
+class SpanRecord(NamedTuple):
+    """索引中的一次工作流调用"""
+    run_id: str
+    span_id: str
+    parent_span: Optional[str]
+    flow: str
+    depth: int
+    status: str
+    started_at: float
+    finished_at: Optional[float]
+    file: str
+    offset: int
+
+
+class RunLogIndex:
+    """
+    线程安全的运行日志索引，数据库文件在首次使用时创建。
+    """
+
+    def __init__(self, directory: str = DEFAULT_RUN_LOG_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, _INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " file TEXT PRIMARY KEY,"
+                " run_id TEXT NOT NULL,"
+                " flow TEXT,"
+                " status TEXT NOT NULL,"
+                " started_at REAL NOT NULL,"
+                " finished_at REAL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS spans ("
+                " span_id TEXT PRIMARY KEY,"
+                " run_id TEXT NOT NULL,"
+                " parent_span TEXT,"
+                " flow TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " depth INTEGER NOT NULL,"
+                " status TEXT NOT NULL,"
+                " started_at REAL NOT NULL,"
+                " finished_at REAL,"
+                " file TEXT NOT NULL,"
+                " offset INTEGER NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS spans_run ON spans (run_id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS spans_flow ON spans (flow, started_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS spans_name ON spans (name, started_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS spans_status ON spans (status, started_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _execute(self, sql: str, parameters: tuple = ()):
+        with self._lock:
+            connection = self._connect()
+            connection.execute(sql, parameters)
+            connection.commit()
+
+    def add_run(self, file: str, run_id: str, flow: str | None, started_at: float):
+        self._execute(
+            "INSERT OR REPLACE INTO runs (file, run_id, flow, status, started_at) VALUES (?, ?, ?, ?, ?)",
+            (file, run_id, flow, _SPAN_RUNNING, started_at),
+        )
+
+    def finish_run(self, file: str, status: str, finished_at: float):
+        self._execute("UPDATE runs SET status = ?, finished_at = ? WHERE file = ?", (status, finished_at, file))
+
+    def add_span(self, record: SpanRecord):
+        self._execute(
+            "INSERT OR REPLACE INTO spans (run_id, span_id, parent_span, flow, depth, status, started_at,"
+            " finished_at, file, offset, name) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*record, record.flow.rsplit('.', 1)[-1]),
+        )
+
+    def finish_span(self, span_id: str, status: str, finished_at: float):
+        self._execute(
+            "UPDATE spans SET status = ?, finished_at = ? WHERE span_id = ?", (status, finished_at, span_id)
+        )
+
+    def query_spans(self, run_id: str | None = None, flow: str | None = None, status: str | None = None,
+                    since: float | None = None, until: float | None = None, limit: int = 100) -> List[SpanRecord]:
+        """
+        按条件查询工作流调用，按开始时间倒序。
+
+        :param flow: 工作流类全名或类名
+        :param since/until: 开始时间范围（时间戳）
+        """
+        conditions, parameters = [], []
+        if run_id is not None:
+            conditions.append("run_id = ?")
+            parameters.append(run_id)
+        if flow is not None:
+            conditions.append("(flow = ? OR name = ?)")
+            parameters.extend([flow, flow])
+        if status is not None:
+            conditions.append("status = ?")
+            parameters.append(status)
+        if since is not None:
+            conditions.append("started_at >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("started_at < ?")
+            parameters.append(until)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT run_id, span_id, parent_span, flow, depth, status, started_at, finished_at, file, offset"
+                f" FROM spans{where} ORDER BY started_at DESC LIMIT ?",
+                (*parameters, limit),
+            ).fetchall()
+        return [SpanRecord(*row) for row in rows]
+
+    def read_span(self, span: SpanRecord) -> Iterator[dict]:
+        """从span的开始记录处读取该span自身的记录（不含子调用），到其结束记录为止"""
+        path = os.path.join(self.directory, span.file)
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            f.seek(span.offset)
+            for line in f:
+                record = json.loads(line)
+                if record.get("span") != span.span_id:
+                    continue
+                yield record
+                if record.get("event") == "end":
+                    return
+
+    def apply_retention(self, retention_days: float = DEFAULT_RETENTION_DAYS,
+                        compress_after_days: float | None = DEFAULT_COMPRESS_AFTER_DAYS, now: float | None = None):
+        """删除超过保留期的运行及其日志文件，压缩已结束一段时间的运行日志"""
+        now = time.time() if now is None else now
+        with self._lock:
+            connection = self._connect()
+            expired = [row[0] for row in connection.execute(
+                "SELECT file FROM runs WHERE started_at < ?", (now - retention_days * 86400,)
+            )]
+            for file in expired:
+                try:
+                    os.remove(os.path.join(self.directory, file))
+                except OSError:
+                    pass
+                connection.execute("DELETE FROM spans WHERE file = ?", (file,))
+                connection.execute("DELETE FROM runs WHERE file = ?", (file,))
+            connection.commit()
+            if compress_after_days is None:
+                return
+            finished = [row[0] for row in connection.execute(
+                "SELECT file FROM runs WHERE finished_at < ? AND file NOT LIKE '%.gz'",
+                (now - compress_after_days * 86400,),
+            )]
+        for file in finished:
+            self._compress(file)
+
+    def _compress(self, file: str):
+        source = os.path.join(self.directory, file)
+        compressed = f"{file}.gz"
+        try:
+            with open(source, 'rb') as f_in, gzip.open(os.path.join(self.directory, compressed), 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        except OSError:
+            return
+        # gzip文件可以按解压后的偏移定位，span的offset不变
+        with self._lock:
+            connection = self._connect()
+            connection.execute("UPDATE runs SET file = ? WHERE file = ?", (compressed, file))
+            connection.execute("UPDATE spans SET file = ? WHERE file = ?", (compressed, file))
+            connection.commit()
+        os.remove(source)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class RunLog:
+    """
+    一次运行（进程内的一个WorkflowManager）的结构化日志写入器，线程安全。
+    同一运行ID恢复执行时写入新的文件，索引中按文件区分。
+    """
+
+    def __init__(self, run_id: str, directory: str = DEFAULT_RUN_LOG_DIR, index: RunLogIndex | None = None):
+        self.run_id = run_id
+        self.directory = directory
+        self.index = index if index is not None else RunLogIndex(directory)
+        self.file = f"{run_id}_{int(time.time() * 1000)}.jsonl"
+        self._lock = threading.Lock()
+        self._stream = None
+        # span_id -> 开始时间
+        self._open_spans: Dict[str, float] = {}
+
+    def _write(self, record: dict) -> int:
+        """写入一条记录，返回其在文件中的偏移"""
+        data = (json.dumps(record, ensure_ascii=False, default=repr) + '\n').encode('utf-8')
+        with self._lock:
+            if self._stream is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._stream = open(os.path.join(self.directory, self.file), 'ab')
+            offset = self._stream.tell()
+            self._stream.write(data)
+        return offset
+
+    def _flush(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.flush()
+
+    def _record(self, context: ExecutionContext | None, event: str, level: str, message: Any = None, **extra) -> dict:
+        record = {"ts": time.time(), "run": self.run_id}
+        if context is not None:
+            record.update(
+                span=context.span_id,
+                parent=context.parent.span_id if context.parent is not None else None,
+                flow=workflow_class_name(context.workflow_class),
+                depth=context.depth,
+            )
+        record.update(level=level, event=event)
+        if message is not None:
+            record["msg"] = message
+        record.update(extra)
+        return record
+
+    def start_run(self, flow: str | None = None):
+        self.index.add_run(self.file, self.run_id, flow, time.time())
+
+    def finish_run(self, status: str):
+        self._flush()
+        self.index.finish_run(self.file, status, time.time())
+
+    def event(self, context: ExecutionContext | None, level: str, message: str):
+        self._write(self._record(context, "log", level, message))
+
+    def span_start(self, context: ExecutionContext):
+        record = self._record(context, "start", "info")
+        offset = self._write(record)
+        self._open_spans[context.span_id] = record["ts"]
+        self.index.add_span(SpanRecord(
+            self.run_id, context.span_id, record["parent"], record["flow"], context.depth,
+            _SPAN_RUNNING, record["ts"], None, self.file, offset,
+        ))
+
+    def span_end(self, context: ExecutionContext, result: Any = None, error: BaseException | None = None):
+        """结束一个span，未开始的span（如命中缓存）忽略"""
+        started_at = self._open_spans.pop(context.span_id, None)
+        if started_at is None:
+            return
+        status = span_status(result, error)
+        record = self._record(
+            context, "end", "error" if status == WorkflowStatus.ERROR.value else "info",
+            str(error) if error is not None else None, status=status,
+        )
+        record["duration"] = round(record["ts"] - started_at, 6)
+        self._write(record)
+        self._flush()
+        self.index.finish_span(context.span_id, status, record["ts"])
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        self.index.close()
+
+
+def span_status(result: Any, error: BaseException | None = None) -> str:
+    """工作流调用的结束状态：异常或错误结果为error，其余取结果中的status，默认为success"""
+    if error is not None or Utils.is_error_result(result):
+        return WorkflowStatus.ERROR.value
+    if isinstance(result, dict) and isinstance(result.get("status"), str):
+        return result["status"]
+    return WorkflowStatus.SUCCESS.value
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+"""
+中心定时调度器：一个线程 + 按截止时间排序的最小堆（单调时钟），承载所有触发器的定时任务。
+线程精确休眠到下一个截止时间，没有任务时无限期等待，空闲时不占用CPU。
+
+周期任务的下一次截止时间由上一次截止时间累加得到，不随回调耗时漂移；
+落后超过一个周期时跳过错过的周期，不会补发。
+"""
+
+from __future__ import annotations
+from typing import Callable, List, Optional
+from core.cron import CronExpression
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+
+class Schedule:
+    """调度方式基类"""
+
+    def first_deadline(self, now: float) -> Optional[float]:
+        """首次截止时间（time.monotonic），None表示不再执行"""
+        raise NotImplementedError
+
+    def next_deadline(self, previous: float, now: float) -> Optional[float]:
+        """上一次截止时间为previous时的下一次截止时间，None表示不再执行"""
+        raise NotImplementedError
+
+
+class IntervalSchedule(Schedule):
+    """固定周期"""
+
+    def __init__(self, interval: float, start_delay: float | None = None):
+        """
+        :param interval: 周期（秒）
+        :param start_delay: 首次执行前的延迟，默认为一个周期
+        """
+        if interval <= 0:
+            raise ValueError("interval 必须大于0")
+        self.interval = interval
+        self.start_delay = interval if start_delay is None else start_delay
+
+    def first_deadline(self, now: float) -> Optional[float]:
+        return now + self.start_delay
+
+    def next_deadline(self, previous: float, now: float) -> Optional[float]:
+        deadline = previous + self.interval
+        if deadline <= now:
+            # 跳过错过的周期，保持与原有节拍对齐
+            deadline += ((now - deadline) // self.interval + 1) * self.interval
+        return deadline
+
+
+class PollSchedule(IntervalSchedule):
+    """按固定间隔轮询自定义条件（与IntervalSchedule相同，仅用于区分语义）"""
+
+
+class AtSchedule(Schedule):
+    """
+    在指定的墙上时间执行一次。回调未能完成本次执行（如目标工作流运行数量已达上限）时不调用complete()，
+    之后每retry_interval秒重试，直到complete()被调用。
+    """
+
+    def __init__(self, when: datetime.datetime, retry_interval: float = 1.0):
+        self.when = when
+        self.retry_interval = retry_interval
+        self.completed = False
+
+    def complete(self):
+        """本次执行已完成，任务结束"""
+        self.completed = True
+
+    def first_deadline(self, now: float) -> Optional[float]:
+        delay = (self.when - datetime.datetime.now(self.when.tzinfo)).total_seconds()
+        return now + max(delay, 0.0)
+
+    def next_deadline(self, previous: float, now: float) -> Optional[float]:
+        if self.completed:
+            return None
+        return now + self.retry_interval
+
+
+class CronSchedule(Schedule):
+    """
+    按cron表达式执行。截止时间由下一次触发时间直接推算，单次休眠不超过max_sleep，
+    墙上时间跳变（校时、休眠唤醒）后最迟max_sleep秒内重新对齐。
+    回调中通过take_due()取出到期（含错过）的触发时间，未到期时回调不做任何事。
+    """
+
+    def __init__(self, expression: CronExpression, tz: datetime.tzinfo | None = None, max_sleep: float = 60):
+        """
+        :param expression: cron表达式
+        :param tz: 时区，None表示本地时间
+        :param max_sleep: 单次最长休眠（秒）
+        """
+        self.expression = expression
+        self.tz = tz
+        self.max_sleep = max_sleep
+        self.fire_time: Optional[datetime.datetime] = None
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now(self.tz)
+
+    # 同一时区的时间相减、比较时忽略夏令时偏移，统一按时间戳计算
+    def _deadline(self, now: float) -> float:
+        delay = self.fire_time.timestamp() - self.now().timestamp()
+        return now + min(max(delay, 0.0), self.max_sleep)
+
+    def first_deadline(self, now: float) -> Optional[float]:
+        self.fire_time = self.expression.next_after(self.now())
+        return self._deadline(now)
+
+    def next_deadline(self, previous: float, now: float) -> Optional[float]:
+        return self._deadline(now)
+
+    def take_due(self, limit: int = 1000) -> List[datetime.datetime]:
+        """
+        取出已到期的触发时间（按时间顺序，超过limit时只保留最近的limit个），并推进到下一次触发时间。
+        """
+        now = self.now().timestamp()
+        due = []
+        while self.fire_time.timestamp() <= now:
+            due.append(self.fire_time)
+            if len(due) > limit:
+                del due[0]
+            self.fire_time = self.expression.next_after(self.fire_time)
+        return due
+
+
+class ScheduledJob:
+    """调度器中的一个任务"""
+
+    def __init__(self, scheduler: TimerScheduler, schedule: Schedule, callback: Callable[[], None], name: str,
+                 on_done: Optional[Callable[[], None]] = None):
+        self.scheduler = scheduler
+        self.schedule = schedule
+        self.callback = callback
+        self.name = name
+        self.on_done = on_done
+        self.deadline: Optional[float] = None
+        self.cancelled = False
+        # 任务结束（一次性任务已执行或被取消）时设置
+        self.done = threading.Event()
+
+    def cancel(self):
+        """取消任务，可在回调中调用"""
+        self.scheduler.cancel(self)
+
+
+class TimerScheduler:
+    """
+    线程安全的定时调度器。回调在调度线程中串行执行，应只做轻量操作（如提交到线程池）。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._job_count = 0
+
+    @classmethod
+    def instance(cls) -> TimerScheduler:
+        """进程内共享的调度器"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = TimerScheduler()
+        return cls._instance
+
+    def schedule(self, schedule: Schedule, callback: Callable[[], None], name: str = '',
+                 on_done: Optional[Callable[[], None]] = None) -> ScheduledJob:
+        """
+        注册任务。
+
+        :param schedule: 调度方式
+        :param callback: 截止时间到达时调用的函数
+        :param name: 任务名称（用于日志）
+        :param on_done: 任务结束时调用的函数（持有调度器锁，应只做轻量操作）
+        """
+        job = ScheduledJob(self, schedule, callback, name, on_done)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("调度器已停止")
+            job.deadline = schedule.first_deadline(time.monotonic())
+            if job.deadline is None:
+                self._job_count += 1
+                self._finish(job)
+                return job
+            self._job_count += 1
+            heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="workflow-scheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return job
+
+    def cancel(self, job: ScheduledJob):
+        with self._condition:
+            if job.cancelled or job.done.is_set():
+                return
+            # 堆中的条目在弹出时跳过
+            job.cancelled = True
+            self._finish(job)
+            self._condition.notify()
+
+    def _finish(self, job: ScheduledJob):
+        self._job_count -= 1
+        job.done.set()
+        self._condition.notify_all()
+        if job.on_done is not None:
+            try:
+                job.on_done()
+            except Exception as e:
+                from core.logger import WorkflowLogger
+                WorkflowLogger.instance().exception(f"定时任务 '{job.name}' 结束回调出错: {e}")
+
+    @property
+    def job_count(self) -> int:
+        """未结束的任务数"""
+        return self._job_count
+
+    def join(self, timeout: float | None = None) -> bool:
+        """等待所有任务结束"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._job_count == 0, timeout)
+
+    def _loop(self):
+        from core.logger import WorkflowLogger
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+                deadline, _, job = heapq.heappop(self._heap)
+
+            try:
+                job.callback()
+            except Exception as e:
+                WorkflowLogger.instance().exception(f"定时任务 '{job.name}' 执行出错: {e}")
+
+            with self._condition:
+                if job.cancelled:
+                    continue
+                if self._stopped:
+                    self._finish(job)
+                    return
+                job.deadline = job.schedule.next_deadline(deadline, time.monotonic())
+                if job.deadline is None:
+                    self._finish(job)
+                else:
+                    heapq.heappush(self._heap, (job.deadline, next(self._sequence), job))
+
+    def shutdown(self):
+        """停止调度线程，未执行的任务全部结束"""
+        with self._condition:
+            self._stopped = True
+            for _, _, job in self._heap:
+                if not job.cancelled and not job.done.is_set():
+                    job.cancelled = True
+                    self._finish(job)
+            self._heap.clear()
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+run_flow 单飞合并：相同键（工作流类 + 解析后参数）的调用正在执行时，
+后到的调用者等待并共享其结果，不再重复执行。工作流通过类属性选择加入：
+    SINGLE_FLIGHT = True
+
+只合并同时进行中的调用，调用结束后不保留结果（需要复用结果时使用 CACHE_RESULT）。
+"""
+
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+import asyncio
+import copy
+import threading
+
+
+class SingleFlight:
+    """
+    线程安全的进行中调用表。同步调用者使用 run()，协程中使用 run_async()。
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _acquire(self, key: str) -> Tuple[bool, Future]:
+        """返回 (是否为首个调用者, 该调用的Future)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._calls[key] = future
+            return True, future
+
+    def _finish(self, key: str, future: Future, value: Any = None, error: BaseException | None = None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    @staticmethod
+    def _share(value: Any) -> Any:
+        try:
+            return copy.deepcopy(value)
+        except Exception:
+            # 无法拷贝的结果直接共享
+            return value
+
+    def run(self, key: str, func: Callable[..., Any], *args, on_join: Callable[[], None] | None = None) -> Any:
+        """
+        执行func(*args)，相同key的调用正在进行时等待其结果（深拷贝，调用者之间互不影响）。
+
+        :param on_join: 合并到进行中的调用时、等待之前调用
+        """
+        leader, future = self._acquire(key)
+        if not leader:
+            if on_join is not None:
+                on_join()
+            return self._share(future.result())
+        try:
+            value = func(*args)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
+
+    async def run_async(self, key: str, func: Callable[..., Any], *args,
+                        on_join: Callable[[], None] | None = None) -> Any:
+        """run() 的协程版本，func返回协程；等待时不阻塞事件循环"""
+        leader, future = self._acquire(key)
+        if not leader:
+            if on_join is not None:
+                on_join()
+            return self._share(await asyncio.wrap_future(future))
+        try:
+            value = await func(*args)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, value)
+        return value
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+增量执行的本地状态存储（SQLite）：记录每个 工作流+参数 最近一次成功执行时的输入指纹和结果。
+"""
+
+from __future__ import annotations
+from typing import Any, Optional, Tuple
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# 默认状态库路径
+DEFAULT_STATE_STORE_PATH = os.path.join('data', 'state', 'workflow_state.db')
+
+
+class StateStore:
+    """
+    线程安全的指纹/结果存储，数据库文件在首次使用时创建。
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS flow_state ("
+                " state_key TEXT PRIMARY KEY,"
+                " class_name TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " result BLOB,"
+                " updated_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, state_key: str) -> Optional[Tuple[str, Any]]:
+        """
+        :return: (指纹哈希, 结果)，不存在或结果无法反序列化时返回None
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fingerprint, result FROM flow_state WHERE state_key = ?", (state_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], pickle.loads(row[1])
+        except Exception:
+            return None
+
+    def put(self, state_key: str, class_name: str, fingerprint: str, result: Any) -> bool:
+        """记录一次成功执行，结果不可pickle时不记录并返回False。"""
+        try:
+            payload = pickle.dumps(result)
+        except Exception:
+            return False
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO flow_state (state_key, class_name, fingerprint, result, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (state_key, class_name, fingerprint, payload, time.time()),
+            )
+            connection.commit()
+        return True
+
+    def forget_class(self, class_name: str):
+        """删除某个工作流类的所有记录，下次执行时强制重跑。"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM flow_state WHERE class_name = ?", (class_name,))
+            connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
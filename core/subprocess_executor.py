@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""
+共享的子进程执行器：所有命令在同一个后台事件循环中以 asyncio 子进程执行，
+不再为每条命令占用一个线程；全局和按键（如仓库、工作流类）的并发预算限制同时运行的子进程数。
+
+    handle = SubprocessExecutor.instance().submit(["git", "fetch"], key="repo_a")
+    result = handle.result()          # 同步代码中等待
+    result = await handle             # 协程中等待（任意事件循环）
+    SubprocessExecutor.wait_all(handles)
+
+提交时的上下文（ExecutionContext等contextvars）随任务进入事件循环，输出回调中的日志保持调用树位置。
+Python 3.12之前asyncio在每个子进程运行期间使用一个waitpid线程，这些线程的数量同样受并发预算限制。
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Set
+import asyncio
+import collections
+import concurrent.futures
+import os
+import threading
+from core import event_loop
+from core.command import CommandType
+from core.context import ExecutionContext
+from core.event_loop import EventLoopThread
+from core.logger import WorkflowLogger
+
+# 默认全局并发预算：同时运行的子进程数
+DEFAULT_MAX_CONCURRENCY = max(8, (os.cpu_count() or 1) * 2)
+
+
+class _Budget:
+    """
+    并发预算（只在执行器的事件循环线程中使用）。与asyncio.Semaphore不同，上限可以在运行中调整；
+    limit <= 0 表示不限制。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: collections.deque = collections.deque()
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _has_capacity(self) -> bool:
+        return self.limit <= 0 or self.active < self.limit
+
+    async def acquire(self):
+        if self._has_capacity() and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 已分配到名额后被取消，归还名额
+                self.release()
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def set_limit(self, limit: int):
+        self.limit = limit
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+
+class CommandHandle:
+    """
+    一次提交的句柄：可在协程中await，在同步代码中result()等待，或cancel()取消（运行中的子进程会被终止）。
+    """
+
+    def __init__(self, future: concurrent.futures.Future, key: str | None, loop_thread: EventLoopThread):
+        self._future = future
+        self.key = key
+        self._loop_thread = loop_thread
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def cancelled(self) -> bool:
+        return self._future.cancelled()
+
+    def cancel(self) -> bool:
+        return self._future.cancel()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """等待并返回结果；不能在执行器的事件循环线程中调用"""
+        if self._loop_thread.in_loop_thread():
+            raise RuntimeError("不能在子进程执行器的事件循环中同步等待，请使用 await")
+        return self._future.result(timeout)
+
+    def exception(self, timeout: float | None = None) -> BaseException | None:
+        return self._future.exception(timeout)
+
+    def add_done_callback(self, callback: Callable[[CommandHandle], Any]):
+        """完成（含取消）后调用callback(handle)，在执行器的事件循环线程中执行，应快速返回"""
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+
+class SubprocessExecutor:
+    """
+    线程安全的子进程执行器，进程内共享一个实例（instance()）。
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self._loop_thread = EventLoopThread(name="workflow-subprocess")
+        self._global = _Budget(max_concurrency)
+        # 按键的预算，未设置上限的键不受限制（只受全局预算限制）
+        self._key_limits: Dict[str, int] = {}
+        self._keys: Dict[str, _Budget] = {}
+        self._handles: Set[CommandHandle] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> SubprocessExecutor:
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = SubprocessExecutor()
+        return cls._instance
+
+    @property
+    def _loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop_thread.loop
+
+    def set_limit(self, key: str | None, limit: int):
+        """
+        设置并发预算。
+
+        :param key: None为全局预算，否则为该键的预算
+        :param limit: 同时运行的子进程数上限，<= 0 表示不限制
+        """
+        with self._lock:
+            if key is not None:
+                self._key_limits[key] = limit
+        self._loop.call_soon_threadsafe(self._apply_limit, key, limit)
+
+    def _apply_limit(self, key: str | None, limit: int):
+        if key is None:
+            self._global.set_limit(limit)
+        elif key in self._keys:
+            self._keys[key].set_limit(limit)
+
+    def stats(self) -> dict:
+        """当前运行中/等待中的子进程数（近似值）"""
+        return {
+            "active": self._global.active,
+            "pending": self._global.pending,
+            "keys": {key: {"active": budget.active, "pending": budget.pending} for key, budget in list(self._keys.items())},
+        }
+
+    def _key_budget(self, key: str) -> _Budget:
+        budget = self._keys.get(key)
+        if budget is None:
+            with self._lock:
+                limit = self._key_limits.get(key, 0)
+            budget = self._keys[key] = _Budget(limit)
+        return budget
+
+    async def run(self, cmd: CommandType, key: str | None = None, shell: bool | None = None,
+                  line_callback: Callable[[str], Any] | None = None, stdout: Any = None,
+                  keep_output: bool = True) -> dict:
+        """
+        在预算内执行一条命令（协程，只能在执行器的事件循环中await，其他地方使用submit）。
+
+        :param key: 预算键，None时只受全局预算限制
+        :param line_callback: 每行非空输出的回调（在事件循环线程中调用）
+        :param stdout: 输出目标（文件对象或subprocess.DEVNULL），None时读取输出
+        :param keep_output: 是否在结果中保留输出
+        :return: {"returncode": int, "output": str}
+        """
+        # 先占用键的名额再占用全局名额，等待同一键的命令不占用全局名额
+        key_budget = self._key_budget(key) if key is not None else None
+        if key_budget is not None:
+            await key_budget.acquire()
+        try:
+            await self._global.acquire()
+            try:
+                return await event_loop.run_subprocess(cmd, line_callback, shell, stdout, keep_output)
+            finally:
+                self._global.release()
+        finally:
+            if key_budget is not None:
+                key_budget.release()
+                if not key_budget.active and not key_budget.pending:
+                    self._keys.pop(key, None)
+
+    def spawn(self, coro_func: Callable[..., Coroutine], *args, key: str | None = None,
+              on_done: Callable[[], Any] | None = None) -> CommandHandle:
+        """
+        在执行器的事件循环中执行协程 coro_func(*args)（其中通过 run() 执行命令），返回句柄。
+
+        :param key: 句柄的键，用于 cancel_all(key)
+        :param on_done: 结束（含失败、取消）后在线程池中调用，可以阻塞
+        """
+        async def task():
+            try:
+                return await coro_func(*args)
+            finally:
+                if on_done is not None:
+                    callback = ExecutionContext.bind(self._call_on_done)
+                    asyncio.get_running_loop().run_in_executor(None, callback, on_done)
+
+        # run_coroutine_threadsafe 在调用线程中复制当前上下文，任务在该上下文中执行
+        future = asyncio.run_coroutine_threadsafe(task(), self._loop)
+        handle = CommandHandle(future, key, self._loop_thread)
+        with self._lock:
+            self._handles.add(handle)
+        future.add_done_callback(lambda _: self._forget(handle))
+        return handle
+
+    def submit(self, cmd: CommandType, key: str | None = None, shell: bool | None = None,
+               line_callback: Callable[[str], Any] | None = None, stdout: Any = None,
+               on_done: Callable[[], Any] | None = None) -> CommandHandle:
+        """提交一条命令，参数同 run()，句柄的结果为 {"returncode": int, "output": str}"""
+        return self.spawn(self.run, cmd, key, shell, line_callback, stdout, key=key, on_done=on_done)
+
+    def _forget(self, handle: CommandHandle):
+        with self._lock:
+            self._handles.discard(handle)
+
+    @staticmethod
+    def _call_on_done(on_done: Callable[[], Any]):
+        try:
+            on_done()
+        except Exception as e:
+            WorkflowLogger.instance().exception(f"命令完成回调执行出错: {e}")
+
+    def cancel_all(self, key: str | None = None) -> int:
+        """取消所有（或指定键的）未完成命令，返回取消的数量"""
+        with self._lock:
+            handles = [handle for handle in self._handles if key is None or handle.key == key]
+        return sum(1 for handle in handles if handle.cancel())
+
+    @staticmethod
+    def wait_all(handles: Iterable[CommandHandle], timeout: float | None = None) -> List[Any]:
+        """
+        等待所有句柄完成，按输入顺序返回结果；失败或被取消的命令对应位置为异常对象。
+        超时后未完成的命令对应位置为 TimeoutError。
+        """
+        handles = list(handles)
+        futures = [handle._future for handle in handles]
+        concurrent.futures.wait(futures, timeout)
+        results: List[Any] = []
+        for future in futures:
+            if not future.done():
+                results.append(TimeoutError("命令未在超时时间内完成"))
+            elif future.cancelled():
+                results.append(concurrent.futures.CancelledError())
+            elif future.exception() is not None:
+                results.append(future.exception())
+            else:
+                results.append(future.result())
+        return results
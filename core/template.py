@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+{{placeholder}} 模板编译与渲染
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable, Tuple
+import re
+
+# 占位符正则表达式
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([\w_]+)\}\}")
+
+# 已编译模板的缓存上限
+TEMPLATE_CACHE_SIZE = 4096
+
+
+class PlaceholderCycleError(ValueError):
+    """占位符之间存在循环引用，如 a -> {{b}}, b -> {{a}}。"""
+
+    def __init__(self, chain: Tuple[str, ...]):
+        self.chain = tuple(chain)
+        super().__init__("检测到占位符循环引用: " + " -> ".join(self.chain))
+
+
+class CompiledTemplate:
+    """
+    编译后的模板：由字面量和引用交替组成的片段列表。
+    segments中偶数位为字面量，奇数位为引用的参数名。
+    """
+    __slots__ = ('source', 'segments', 'references')
+
+    def __init__(self, source: str, segments: Tuple[str, ...]):
+        self.source = source
+        self.segments = segments
+        # 去重后保持出现顺序的引用名
+        self.references = tuple(dict.fromkeys(segments[1::2]))
+
+    @property
+    def is_literal(self) -> bool:
+        return not self.references
+
+    def render(self, lookup: Callable[[str], object]) -> str:
+        """一次拼接完成渲染，lookup负责返回引用名对应的值。"""
+        if not self.references:
+            return self.source
+        segments = self.segments
+        parts = list(segments)
+        for i in range(1, len(segments), 2):
+            parts[i] = str(lookup(segments[i]))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    将模板字符串编译为片段列表，同一字符串只编译一次。
+
+    :param source: 模板字符串
+    :return: CompiledTemplate
+    """
+    # re.split 在有捕获组时会交替返回 字面量/捕获内容
+    return CompiledTemplate(source, tuple(PLACEHOLDER_PATTERN.split(source)))
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+"""
+触发器的目标工作流分发：
+
+- in_process: 启动时加载一次 trigger_flow_data，每次触发在本进程的有界线程池中执行目标工作流，
+  与命令行启动一样作为独立的顶层运行（新的参数作用域、共享上下文和结果缓存），不继承触发器的参数
+- subprocess: 每次触发启动 uv run main.py --flow_data ...，目标工作流与触发器进程隔离
+
+运行数量和触发次数通过 TriggerCounter 原子计数，可被多个线程（定时器、Webhook请求线程、完成回调）同时访问。
+运行数量达到上限时，submit() 按背压策略处理新的触发：
+- reject: 直接拒绝
+- queue: 排队（有上限），有目标工作流结束时按顺序启动
+- coalesce: 合并为一个待执行的触发（参数以最后一次为准）
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, Deque, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
+import threading
+from core.constants import WorkflowStatus
+from core.context import ExecutionContext
+from core.parallel import DEFAULT_MAX_WORKERS
+from core.utils import Utils
+
+if TYPE_CHECKING:
+    from core.workflow import BaseWorkflow
+
+DISPATCH_IN_PROCESS = 'in_process'
+DISPATCH_SUBPROCESS = 'subprocess'
+DISPATCH_MODES = (DISPATCH_IN_PROCESS, DISPATCH_SUBPROCESS)
+
+BACKPRESSURE_REJECT = 'reject'
+BACKPRESSURE_QUEUE = 'queue'
+BACKPRESSURE_COALESCE = 'coalesce'
+BACKPRESSURE_POLICIES = (BACKPRESSURE_REJECT, BACKPRESSURE_QUEUE, BACKPRESSURE_COALESCE)
+
+# submit() 的处理结果
+SUBMIT_STARTED = 'started'
+SUBMIT_QUEUED = 'queued'
+SUBMIT_COALESCED = 'coalesced'
+SUBMIT_REJECTED = 'rejected'
+SUBMIT_EXHAUSTED = 'exhausted'
+
+
+class TriggerCounter:
+    """
+    线程安全的触发计数。-1 表示不限制。
+    started 在触发时预占，保证并发触发时不会超过 max_total。
+    """
+
+    def __init__(self, max_running: int = -1, max_total: int = -1):
+        self.max_running = max_running
+        self.max_total = max_total
+        self._running = 0
+        self._started = 0
+        self._finished = 0
+        self._condition = threading.Condition()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def started(self) -> int:
+        return self._started
+
+    @property
+    def finished(self) -> int:
+        return self._finished
+
+    @property
+    def exhausted(self) -> bool:
+        """已达到最大触发次数（含正在运行的）"""
+        return self.max_total != -1 and self._started >= self.max_total
+
+    @property
+    def saturated(self) -> bool:
+        """运行数量已达上限"""
+        return self.max_running != -1 and self._running >= self.max_running
+
+    def try_acquire(self) -> bool:
+        """预占一次触发，运行数量或触发次数已达上限时返回False"""
+        with self._condition:
+            if self.exhausted or self.saturated:
+                return False
+            self._running += 1
+            self._started += 1
+            return True
+
+    def cancel(self):
+        """撤销一次未能启动的触发"""
+        with self._condition:
+            self._running -= 1
+            self._started -= 1
+            self._condition.notify_all()
+
+    def release(self):
+        """一次触发执行完毕"""
+        with self._condition:
+            self._running -= 1
+            self._finished += 1
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """等待所有正在运行的目标工作流结束"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._running == 0, timeout)
+
+    def wait_slot(self, timeout: float | None = None) -> bool:
+        """等待出现空闲的运行名额"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self.saturated, timeout)
+
+
+class TriggerDispatcher:
+    """
+    触发器持有的分发器，负责启动目标工作流并维护计数。
+    """
+
+    def __init__(self, workflow: BaseWorkflow, trigger_flow_data: str, mode: str = DISPATCH_IN_PROCESS,
+                 max_running: int = -1, max_total: int = -1, use_daemon: bool = False,
+                 backpressure: str = BACKPRESSURE_REJECT, max_pending: int = 100,
+                 on_exhausted: Optional[Callable[[], None]] = None):
+        """
+        应在触发器的run()中创建：目标工作流在创建时的执行上下文中运行（日志挂在触发器下）。
+
+        :param workflow: 所属的触发器工作流（用于日志和执行子流程）
+        :param trigger_flow_data: 目标工作流的JSON参数文件
+        :param mode: DISPATCH_IN_PROCESS 或 DISPATCH_SUBPROCESS
+        :param max_running: 同时运行的目标工作流上限，-1不限制
+        :param max_total: 最大触发次数，-1不限制
+        :param use_daemon: subprocess模式下通过 main.py --daemon 交给守护进程执行
+        :param backpressure: 运行数量达到上限时 submit() 的处理策略
+        :param max_pending: queue策略下的最大排队数量
+        :param on_exhausted: 达到最大触发次数时调用（在触发所在的线程中）
+        """
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"未知的分发模式: {mode}，可选: {', '.join(DISPATCH_MODES)}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"未知的背压策略: {backpressure}，可选: {', '.join(BACKPRESSURE_POLICIES)}")
+        self.workflow = workflow
+        self.trigger_flow_data = trigger_flow_data
+        self.mode = mode
+        self.use_daemon = use_daemon
+        self.backpressure = backpressure
+        self.max_pending = max_pending
+        self.on_exhausted = on_exhausted
+        self.counter = TriggerCounter(max_running, max_total)
+        self._target_class = None
+        self._target_flow: str = ''
+        self._target_params: dict = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Deque[Optional[dict]] = deque()
+        self._pending_lock = threading.Lock()
+        # 绑定创建时的执行上下文，从调度线程、HTTP请求线程触发时日志同样挂在触发器下
+        self._run_target_in_context = ExecutionContext.bind(self._run_target)
+        self._start_subprocess_in_context = ExecutionContext.bind(self._start_subprocess)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def load(self) -> bool:
+        """in_process模式下加载目标工作流，失败时记录日志并返回False"""
+        if self.mode != DISPATCH_IN_PROCESS:
+            return True
+        manager = self.workflow.manager
+        try:
+            with open(self.trigger_flow_data, 'r', encoding='utf-8') as f:
+                flow_data = json.load(f)
+            self._target_flow = flow_data.get('flow') or ''
+            self._target_class = manager.find_workflow_class(self._target_flow)
+        except Exception as e:
+            self.workflow.log(f"加载目标工作流失败 ({self.trigger_flow_data}): {e}")
+            return False
+        self._target_params = Utils.exclude_dict(flow_data, ['flow'])
+        max_running = self.counter.max_running
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_running if max_running > 0 else DEFAULT_MAX_WORKERS,
+            thread_name_prefix="workflow-trigger",
+        )
+        return True
+
+    def fire(self, extra_params: dict | None = None) -> Optional[Future]:
+        """
+        启动一次目标工作流。运行数量或触发次数已达上限时返回None。
+
+        :param extra_params: 覆盖目标工作流参数（如Webhook请求体），仅in_process模式支持
+        :return: in_process模式返回目标工作流结果的Future，subprocess模式返回已完成的Future
+        """
+        if not self.counter.try_acquire():
+            return None
+        try:
+            if self.mode == DISPATCH_IN_PROCESS:
+                params = Utils.merge_dicts(self._target_params, extra_params)
+                future = self._executor.submit(self._run_target_in_context, params)
+            else:
+                future = Future()
+                future.set_result(self._start_subprocess_in_context())
+        except Exception:
+            self.counter.cancel()
+            raise
+        if self.counter.exhausted and self.on_exhausted is not None:
+            self.on_exhausted()
+        return future
+
+    def submit(self, extra_params: dict | None = None) -> str:
+        """
+        按背压策略提交一次触发，立即返回处理结果（SUBMIT_*），不等待目标工作流执行。
+        """
+        with self._pending_lock:
+            # 已有排队的触发时不插队
+            if not self._pending and self.fire(extra_params) is not None:
+                return SUBMIT_STARTED
+            if self.counter.exhausted:
+                return SUBMIT_EXHAUSTED
+            max_total = self.counter.max_total
+            if max_total != -1 and self.counter.started + len(self._pending) >= max_total and (
+                    self.backpressure != BACKPRESSURE_COALESCE or not self._pending):
+                # 剩余的触发次数已被排队中的触发占满
+                return SUBMIT_EXHAUSTED
+            if self.backpressure == BACKPRESSURE_QUEUE and len(self._pending) < self.max_pending:
+                self._pending.append(extra_params)
+                result = SUBMIT_QUEUED
+            elif self.backpressure == BACKPRESSURE_COALESCE:
+                self._pending.clear()
+                self._pending.append(extra_params)
+                result = SUBMIT_COALESCED
+            else:
+                return SUBMIT_REJECTED
+        # 提交期间可能已有目标工作流结束
+        self._drain()
+        return result
+
+    def _drain(self):
+        """启动排队中的触发，直到运行数量再次达到上限"""
+        with self._pending_lock:
+            while self._pending:
+                if self.fire(self._pending[0]) is None:
+                    if self.counter.exhausted:
+                        self._pending.clear()
+                    break
+                self._pending.popleft()
+
+    def _release(self):
+        self.counter.release()
+        if self._pending:
+            self._drain()
+
+    def _run_target(self, params: dict) -> Any:
+        from core.manager import WorkflowManager
+        try:
+            # 与 main.py --flow_data 相同的顶层运行，触发器定义的同名参数不会覆盖目标工作流的参数
+            return WorkflowManager.run_workflow_from_dict(Utils.merge_dicts({'flow': self._target_flow}, params))
+        finally:
+            self._release()
+
+    def _start_subprocess(self):
+        from workflows.system.bat_flow import BatFlow
+        daemon_flag = "--daemon " if self.use_daemon else ""
+        result = self.workflow.run_flow(BatFlow, params={
+            "wait": False,
+            "cmd": f"uv run main.py {daemon_flag}--flow_data {self.trigger_flow_data}",
+            "finished_func": self._release,
+        })
+        if not isinstance(result, dict) or result.get("status") != WorkflowStatus.ASYNC.value:
+            # 子进程没有启动，finished_func不会被调用，撤销预占的名额（异常由fire()撤销）
+            self.counter.cancel()
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """停止分发（丢弃排队中的触发），wait为True时等待所有目标工作流结束"""
+        with self._pending_lock:
+            self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if wait:
+            self.counter.wait_idle()
@@ -53,10 +53,32 @@ class Utils:
         :param obj: 要检查的对象
         :return: 是否为有效的工作流类
         """
-        from core.workflow import BaseWorkflow
+        from core.workflow import BaseWorkflow, AsyncBaseWorkflow
         return (hasattr(obj, '__class__') and 
                 issubclass(obj, BaseWorkflow) and 
-                obj is not BaseWorkflow)
+                obj not in (BaseWorkflow, AsyncBaseWorkflow))
+
+    @staticmethod
+    def is_async_workflow_class(obj: Any) -> bool:
+        """
+        检查对象是否为异步工作流类（run为协程）
+        
+        :param obj: 工作流类
+        :return: 是否为异步工作流类
+        """
+        from core.workflow import AsyncBaseWorkflow
+        return isinstance(obj, type) and issubclass(obj, AsyncBaseWorkflow)
+    
+    @staticmethod
+    def is_error_result(result: Any) -> bool:
+        """
+        检查工作流返回值是否表示执行失败（status为error的结果字典）
+        
+        :param result: 工作流返回值
+        :return: 是否失败
+        """
+        from core.constants import WorkflowStatus
+        return isinstance(result, dict) and result.get("status") == WorkflowStatus.ERROR.value
     
     @staticmethod
     def flow_name_to_class_name(flow_name: str) -> str:
@@ -93,9 +115,15 @@ class Utils:
     @staticmethod
     def parse_cmd_args():
         """
-        解析命令行所有 --key value 参数为 dict。
+        解析命令行所有 --key value（或 -key value）参数为 dict。
         """
         import argparse
         parser = argparse.ArgumentParser(description="工作流执行引擎")
-        _, unknown = parser.parse_known_args()
-        return Utils.parse_key_value_pairs(unknown, '-') 
\ No newline at end of file
+        parser.add_argument('--list-flows', dest='list_flows', action='store_true', help="列出所有可用工作流")
+        parser.add_argument('--serve', action='store_true', help="启动常驻守护进程")
+        parser.add_argument('--daemon', action='store_true', help="把请求转发给守护进程执行")
+        known, unknown = parser.parse_known_args()
+        params = Utils.parse_key_value_pairs(unknown, '-')
+        params = {key.lstrip('-'): value for key, value in params.items()}
+        params.update({key: True for key, value in vars(known).items() if value})
+        return params
\ No newline at end of file
@@ -4,6 +4,10 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Type, Any
 import time
+from core import event_loop
+from core.command import Command, CommandType
+from core.subprocess_executor import SubprocessExecutor
+from core.constants import WorkflowStatus
 
 if TYPE_CHECKING:
     from core.manager import WorkflowManager
@@ -14,6 +18,16 @@ class BaseWorkflow(ABC):
     所有可执行单元（工作流）的抽象基类。
     """
     DEFAULT_PARAMS = {}
+    # 为True时在进程池中执行，适用于CPU密集型工作流（参数与返回值需可pickle）
+    RUN_IN_PROCESS = False
+    # 结果缓存（见 core/result_cache.py）：是否缓存结果、有效期（秒）、成功后需要失效的工作流类
+    CACHE_RESULT = False
+    CACHE_TTL = None
+    INVALIDATES_CACHE = ()
+    # 增量执行：为True且input_fingerprints()返回非None时，输入未变化则跳过执行并复用上次结果
+    INCREMENTAL = False
+    # 单飞合并（见 core/single_flight.py）：相同参数的调用正在执行时，后到的调用等待并共享其结果
+    SINGLE_FLIGHT = False
 
     def __init__(self, manager: WorkflowManager, config: Config):
         """
@@ -28,14 +42,28 @@ class BaseWorkflow(ABC):
     @classmethod
     def default_params(cls) -> dict:
         """
-        返回当前类及其所有父类的默认参数合并结果。
+        返回当前类及其所有父类的默认参数合并结果（返回副本，可以修改）。
         子类可重写本方法并返回自己的默认参数，父类参数会自动合并。
+        合并结果按类缓存，运行时修改DEFAULT_PARAMS后需调用 clear_default_params_cache()。
         """
-        params = {}
-        for base in reversed(cls.__mro__):
-            if hasattr(base, 'DEFAULT_PARAMS'):
-                params.update(getattr(base, 'DEFAULT_PARAMS'))
-        return params
+        merged = cls.__dict__.get('_merged_default_params')
+        if merged is None:
+            merged = {}
+            for base in reversed(cls.__mro__):
+                if hasattr(base, 'DEFAULT_PARAMS'):
+                    merged.update(getattr(base, 'DEFAULT_PARAMS'))
+            cls._merged_default_params = merged
+        return dict(merged)
+
+    @classmethod
+    def clear_default_params_cache(cls):
+        """清除本类及所有子类的默认参数合并缓存。"""
+        pending = [cls]
+        while pending:
+            klass = pending.pop()
+            if '_merged_default_params' in klass.__dict__:
+                del klass._merged_default_params
+            pending.extend(klass.__subclasses__())
 
     def log(self, *args, **kwargs):
         self.manager.log(*args, **kwargs)
@@ -44,6 +72,14 @@ class BaseWorkflow(ABC):
         """方便地调用管理器来执行一个子流程。"""
         return self.manager.run_flow(workflow_class, flow_params=params)
 
+    def run_flows_parallel(self, flows: list, max_workers: int | None = None) -> list:
+        """并行执行多个子流程，返回与输入顺序一致的 FlowOutcome 列表。"""
+        return self.manager.run_flows_parallel(flows, max_workers=max_workers)
+
+    def map_flow(self, workflow_class: Type[BaseWorkflow], params_list: list, max_workers: int | None = None) -> list:
+        """用不同参数并行执行同一个子流程。"""
+        return self.manager.map_flow(workflow_class, params_list, max_workers=max_workers)
+
     def set_shared_value(self, key: str, value):
         """方便地调用管理器来设置一个全局共享值。"""
         self.manager.set_shared_value(key, value)
@@ -52,10 +88,29 @@ class BaseWorkflow(ABC):
         """从当前工作流的配置作用域中获取参数。"""
         return self.config.get_param(key, default)
 
+    def snapshot_config(self):
+        """获取当前配置作用域的只读快照，供后台线程安全读取。"""
+        return self.config.snapshot()
+
     def init(self):
         """初始化工作流。"""
         pass
 
+    def input_fingerprints(self) -> dict | None:
+        """
+        增量执行的输入指纹，在init之后、run之前调用。
+        返回可JSON序列化的dict（可使用 core.fingerprint.Fingerprint 计算文件、Git引用等指纹），
+        返回None表示本次不做增量判断。
+        """
+        return None
+
+    def invalidates_cache(self) -> tuple:
+        """
+        成功执行后需要失效缓存的工作流类，默认为 INVALIDATES_CACHE。
+        只有部分操作会修改状态的工作流可以按参数返回。
+        """
+        return type(self).INVALIDATES_CACHE
+
     @abstractmethod
     def run(self) -> Any:
         """
@@ -63,6 +118,45 @@ class BaseWorkflow(ABC):
         """
         pass
 
+class AsyncBaseWorkflow(BaseWorkflow):
+    """
+    异步工作流基类：run为协程，在管理器持有的事件循环中执行。
+    同步工作流可以直接 run_flow 调用异步工作流；异步工作流中应使用
+    await self.run_flow_async(...) 调用任意子流程（同步子流程会在线程池中执行）。
+    """
+
+    async def run_flow_async(self, workflow_class: Type[BaseWorkflow], params: dict | None = None) -> Any:
+        """以协程方式执行子流程。"""
+        return await self.manager.run_flow_async(workflow_class, flow_params=params)
+
+    async def sleep(self, seconds: float):
+        """可等待的定时器，不占用线程。"""
+        await event_loop.sleep(seconds)
+
+    async def run_cmd(self, cmd: CommandType, log_output: bool = True, shell: bool | None = None,
+                      key: str | None = None) -> dict:
+        """
+        以协程方式执行命令（字符串或参数列表），返回与BatFlow一致的结果字典。
+        命令在共享的子进程执行器中运行，受全局并发预算和key的并发预算限制。
+        """
+        self.log(f"$ {Command.format(cmd)}")
+        try:
+            output = await SubprocessExecutor.instance().submit(cmd, key, shell, self.log if log_output else None)
+        except Exception as e:
+            self.log(f"命令执行出错: {e}")
+            return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行异常: {str(e)}"}
+        returncode = output["returncode"]
+        if returncode == 0:
+            return {"status": WorkflowStatus.SUCCESS.value, "message": "命令执行成功", "returncode": returncode, "output": output["output"]}
+        return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行失败，返回码: {returncode}", "returncode": returncode, "output": output["output"]}
+
+    @abstractmethod
+    async def run(self) -> Any:
+        """
+        异步工作流的执行入口。
+        """
+        pass
+
 class TriggerWorkflow(BaseWorkflow):
     """
     触发器型工作流：run时while监听，满足条件时自动触发目标workflow。
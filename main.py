@@ -1,8 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import sys
 from core.utils import Utils
-from core.manager import WorkflowManager
+from core.constants import PARAM_DAEMON, PARAM_SERVE, PARAM_SOCKET
 
 if __name__ == "__main__":
     params = Utils.parse_cmd_args()
-    WorkflowManager.run_workflow(params)
\ No newline at end of file
+    socket_path = params.pop(PARAM_SOCKET, None)
+    if params.pop(PARAM_DAEMON, False):
+        # 客户端模式只导入轻量模块，由守护进程执行工作流
+        from core.daemon_client import DaemonClient
+        sys.exit(DaemonClient.forward(params, socket_path))
+
+    from core.manager import WorkflowManager
+    if params.pop(PARAM_SERVE, False):
+        from core.daemon import WorkflowDaemon
+        from core.daemon_client import DEFAULT_SOCKET_PATH
+        WorkflowDaemon(socket_path or DEFAULT_SOCKET_PATH).serve_forever()
+    else:
+        WorkflowManager.run_workflow(params)
\ No newline at end of file
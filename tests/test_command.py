@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+
+import pytest
+
+from core import command
+from core.command import Command
+
+
+@pytest.fixture(autouse=True)
+def posix_path(monkeypatch):
+    """固定为POSIX行为，PATH中只有git和echo"""
+    monkeypatch.setattr(command, "_IS_WINDOWS", False)
+    executables = {"git": "/usr/bin/git", "echo": "/bin/echo"}
+    monkeypatch.setattr(Command, "which", staticmethod(executables.get))
+
+
+@pytest.mark.parametrize("cmd, expected", [
+    ("git status", (["git", "status"], False)),
+    ("git commit -m 'hello world'", (["git", "commit", "-m", "hello world"], False)),
+    ("echo a | grep a", ("echo a | grep a", True)),
+    ("echo $HOME", ("echo $HOME", True)),
+    ("git log > out.txt", ("git log > out.txt", True)),
+    ("cd /tmp", ("cd /tmp", True)),
+    ("", ("", True)),
+], ids=["argv", "quoted", "pipe", "variable", "redirect", "builtin", "empty"])
+def test_string_auto_resolution(cmd, expected):
+    assert Command.resolve(cmd) == expected
+
+
+def test_string_with_explicit_shell():
+    assert Command.resolve("git status", shell=True) == ("git status", True)
+    # 强制argv时即使找不到命令也不交给shell
+    assert Command.resolve("missing 'a b'", shell=False) == (["missing", "a b"], False)
+
+
+def test_list_resolution():
+    assert Command.resolve(["git", "log", "a b"]) == (["git", "log", "a b"], False)
+    assert Command.resolve(["git", "log", "-n", 3]) == (["git", "log", "-n", "3"], False)
+    assert Command.resolve(["git", "log", "a b"], shell=True) == ("git log 'a b'", True)
+    with pytest.raises(ValueError):
+        Command.resolve([])
+
+
+def test_popen_kwargs_use_resolved_executable():
+    assert Command.popen_kwargs(["git", "status"]) == {"executable": "/usr/bin/git", "close_fds": False}
+    assert Command.popen_kwargs(["./build.sh"]) == {"executable": "./build.sh", "close_fds": False}
+    assert Command.popen_kwargs(["missing"]) == {}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shell")
+def test_popen_runs_argv_and_shell(monkeypatch):
+    monkeypatch.setattr(Command, "which", staticmethod(lambda name: sys.executable if name == "python" else None))
+    process = Command.popen(["python", "-c", "import sys; print(sys.argv[1])", "a b"],
+                            stdout=subprocess.PIPE, text=True)
+    assert process.communicate(timeout=30)[0] == "a b\n"
+    process = Command.popen(f"{sys.executable} -c 'print(1)' && {sys.executable} -c 'print(2)'",
+                            stdout=subprocess.PIPE, text=True)
+    assert process.communicate(timeout=30)[0] == "1\n2\n"
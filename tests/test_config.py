@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from core.config import Config
+from core.template import PlaceholderCycleError
+
+
+def test_child_sees_parent_change_through_placeholder():
+    root = Config({"v": "old"})
+    child = Config({"t": "{{v}}-x"}, parent=root)
+    assert child.get_param("t") == "old-x"
+    root.set_param("v", "new")
+    assert child.get_param("t") == "new-x"
+    assert child.params["t"] == "new-x"
+
+
+def test_invalidation_only_drops_dependent_entries():
+    root = Config({"a": "1", "b": "2", "ta": "{{a}}", "tb": "{{b}}"})
+    assert root.get_param("ta") == "1"
+    assert root.get_param("tb") == "2"
+    root.set_param("a", "3")
+    assert root.get_param("ta") == "3"
+    assert root._cache.get("tb") is not None
+
+
+def test_parent_value_takes_priority_until_cleared():
+    root = Config({"v": "root"})
+    child = Config({"v": "child", "t": "{{v}}"}, parent=root)
+    # 父级优先，与未缓存时的查找顺序一致
+    assert child.get_param("t") == "root"
+    root.set_param("v", None)
+    assert child.get_param("t") == "child"
+
+
+def test_set_param_during_resolution_is_not_cached():
+    root = Config({"v": "old"})
+    child = Config({"t": "{{v}}-x"}, parent=root)
+    read_raw = child._get_raw_param
+    fired = []
+
+    def racing_read(key, default=None):
+        value = read_raw(key, default)
+        if key == "v" and not fired:
+            # 模拟在读取原始值与写入缓存之间发生的并发修改
+            fired.append(True)
+            root.set_param("v", "new")
+        return value
+
+    child._get_raw_param = racing_read
+    assert child.get_param("t") == "old-x"
+    assert child.get_param("t") == "new-x"
+
+
+def test_placeholder_cycle_reports_chain():
+    config = Config({"a": "{{b}}", "b": "{{c}}", "c": "{{a}}"})
+    with pytest.raises(PlaceholderCycleError) as excinfo:
+        config.get_param("a")
+    assert excinfo.value.chain == ("a", "b", "c", "a")
+
+
+def test_placeholder_cycle_chain_starts_at_repeated_key():
+    config = Config({"entry": "x-{{a}}", "a": "{{b}}", "b": "{{a}}"})
+    with pytest.raises(PlaceholderCycleError) as excinfo:
+        config.get_param("entry")
+    assert excinfo.value.chain == ("a", "b", "a")
+
+
+def test_placeholder_cycle_across_scopes():
+    root = Config({"a": "{{b}}"})
+    child = Config({"b": "{{a}}"}, parent=root)
+    with pytest.raises(PlaceholderCycleError) as excinfo:
+        child.get_param("a")
+    assert excinfo.value.chain == ("a", "b", "a")
+
+
+def test_self_reference_is_a_cycle():
+    config = Config({"a": "{{a}}"})
+    with pytest.raises(PlaceholderCycleError):
+        config.get_param("a")
+
+
+def test_scope_registration_waits_for_tree_lock():
+    # 子作用域在树锁内注册，set_param遍历子作用域时集合不会被并发修改
+    root = Config({"v": 0})
+    created = threading.Event()
+    thread = threading.Thread(target=lambda: (Config(parent=root), created.set()))
+    with root._lock:
+        thread.start()
+        assert not created.wait(0.2)
+    assert created.wait(5)
+    thread.join()
+
+
+def test_set_param_while_other_threads_create_scopes():
+    root = Config({"v": 0})
+    errors = []
+
+    def create_scopes():
+        try:
+            for _ in range(50):
+                for scope in [Config({"t": "{{v}}"}, parent=root) for _ in range(10)]:
+                    scope.get_param("t")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=create_scopes) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    # 每个线程的工作量固定，set_param线程抢不到锁时也不会让测试无限延长
+    value = 0
+    while any(thread.is_alive() for thread in threads):
+        value += 1
+        root.set_param("v", value)
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert Config({"t": "{{v}}"}, parent=root).get_param("t") == str(value)
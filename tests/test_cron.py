@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import pytest
+
+from core.cron import CronExpression
+from core.scheduler import CronSchedule
+
+zoneinfo = pytest.importorskip("zoneinfo")
+
+NEW_YORK = zoneinfo.ZoneInfo("America/New_York")
+
+
+def _fire_times(expression, after, count):
+    cron = CronExpression(expression)
+    times = []
+    for _ in range(count):
+        after = cron.next_after(after)
+        times.append(after)
+    return times
+
+
+def test_day_of_month_or_day_of_week():
+    # 2026-01-01是周四；日和周都不为*时满足其一即可
+    times = _fire_times("0 0 13 * fri", datetime.datetime(2026, 1, 1), 4)
+    assert [t.day for t in times] == [2, 9, 13, 16]
+
+
+def test_day_of_month_or_week_alone():
+    assert CronExpression("0 0 13 * *").next_after(datetime.datetime(2026, 1, 1)) == datetime.datetime(2026, 1, 13)
+    assert CronExpression("0 0 * * 5").next_after(datetime.datetime(2026, 1, 1)) == datetime.datetime(2026, 1, 2)
+    # 周的7和0都表示周日
+    assert CronExpression("0 0 * * 7").next_after(datetime.datetime(2026, 1, 1)) == datetime.datetime(2026, 1, 4)
+
+
+def test_next_after_is_exclusive():
+    cron = CronExpression("*/15 * * * *")
+    assert cron.next_after(datetime.datetime(2026, 1, 1, 10, 15)) == datetime.datetime(2026, 1, 1, 10, 30)
+    assert cron.next_after(datetime.datetime(2026, 1, 1, 10, 15, 30)) == datetime.datetime(2026, 1, 1, 10, 30)
+
+
+def test_dst_gap_is_skipped():
+    # 2026-03-08 02:00 EST跳到03:00 EDT，02:30不存在
+    times = _fire_times("30 2 * * *", datetime.datetime(2026, 3, 7, 3, 0, tzinfo=NEW_YORK), 1)
+    assert times[0].replace(tzinfo=None) == datetime.datetime(2026, 3, 9, 2, 30)
+
+
+def test_repeated_time_fires_once():
+    # 2026-11-01 02:00 EDT回拨到01:00 EST，01:30出现两次
+    first, second = _fire_times("30 1 * * *", datetime.datetime(2026, 11, 1, tzinfo=NEW_YORK), 2)
+    assert first.replace(tzinfo=None) == datetime.datetime(2026, 11, 1, 1, 30)
+    assert first.utcoffset() == datetime.timedelta(hours=-4)
+    assert second.replace(tzinfo=None) == datetime.datetime(2026, 11, 2, 1, 30)
+
+
+def test_fire_times_increase_across_fall_back():
+    times = _fire_times("*/15 * * * *", datetime.datetime(2026, 11, 1, 1, 30, tzinfo=NEW_YORK), 3)
+    assert [t.strftime("%H:%M") for t in times] == ["01:45", "02:00", "02:15"]
+    timestamps = [t.timestamp() for t in times]
+    assert timestamps == sorted(timestamps)
+
+
+def test_expression_that_never_fires():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 30 2 *").next_after(datetime.datetime(2026, 1, 1))
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "0 0 * * foo"])
+def test_invalid_expression(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+class _FixedClockSchedule(CronSchedule):
+    def __init__(self, expression, now):
+        super().__init__(CronExpression(expression), datetime.timezone.utc)
+        self._now = now
+
+    def now(self):
+        return self._now
+
+
+def test_take_due_keeps_latest_missed_times():
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    schedule = _FixedClockSchedule("*/10 * * * *", start)
+    schedule.first_deadline(0.0)
+    # 错过了6次触发（00:10 ... 01:00）
+    schedule._now = start + datetime.timedelta(hours=1, minutes=5)
+    due = schedule.take_due(limit=2)
+    assert [t.strftime("%H:%M") for t in due] == ["00:50", "01:00"]
+    assert schedule.fire_time.strftime("%H:%M") == "01:10"
+    assert schedule.take_due() == []
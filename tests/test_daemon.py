@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+
+import pytest
+
+from core.daemon import WorkflowDaemon, _WorkingDirectory
+from core.daemon_client import DaemonClient
+from core.manager import WorkflowManager
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(WorkflowDaemon, "preload", lambda self: 0)
+    server = WorkflowDaemon(str(tmp_path / "workflow.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = DaemonClient(server.socket_path, timeout=10)
+    for _ in range(100):
+        if client.ping():
+            break
+        threading.Event().wait(0.05)
+    yield server
+    server.shutdown()
+    thread.join(10)
+
+
+def test_failed_request_ends_with_error_frame(daemon, capsys):
+    messages = []
+    done = DaemonClient(daemon.socket_path, timeout=10).run({"flow_data": "missing.json"}, messages.append)
+    assert done["status"] == "error"
+    assert done["exit_code"] == 1
+    assert any("missing.json" in message["message"] for message in messages)
+
+    assert DaemonClient.forward({"flow_data": "missing.json"}, daemon.socket_path) == 1
+    assert "无法连接守护进程" not in capsys.readouterr().err
+
+
+def test_request_runs_in_client_directory(daemon, tmp_path, monkeypatch):
+    seen = []
+    monkeypatch.setattr(WorkflowManager, "run_workflow", staticmethod(lambda params: seen.append(os.getcwd())))
+    client_dir = tmp_path / "client"
+    client_dir.mkdir()
+    monkeypatch.chdir(client_dir)
+    assert DaemonClient(daemon.socket_path, timeout=10).run({"flow": "demo.x"})["exit_code"] == 0
+    assert seen == [str(client_dir)]
+
+
+def test_directory_switch_waits_for_active_requests(tmp_path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    working_directory = _WorkingDirectory()
+    seen = []
+
+    def run_in_second():
+        with working_directory.use(str(second)):
+            seen.append(os.getcwd())
+
+    cwd = os.getcwd()
+    try:
+        with working_directory.use(str(first)):
+            thread = threading.Thread(target=run_in_second)
+            thread.start()
+            thread.join(0.2)
+            # 切换目录的请求等待当前目录的请求结束
+            assert thread.is_alive()
+            assert os.getcwd() == str(first)
+        thread.join(5)
+        assert seen == [str(second)]
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from core.dag import DagDefinition
+from core.manager import WorkflowManager
+from core.workflow import BaseWorkflow
+from workflows.system.dag_flow import DagFlow
+
+
+@pytest.mark.parametrize("nodes", [
+    {"a": {"flow": "x", "depends_on": ["a"]}},
+    {"a": {"flow": "x", "depends_on": ["c"]}, "b": {"flow": "x", "depends_on": ["a"]},
+     "c": {"flow": "x", "depends_on": ["b"]}, "d": {"flow": "x"}},
+], ids=["self_loop", "three_cycle"])
+def test_cycle_is_rejected(nodes):
+    with pytest.raises(ValueError, match="循环依赖"):
+        DagDefinition.parse(nodes)
+
+
+@pytest.mark.parametrize("nodes", [
+    {},
+    {"a": {"params": {}}},
+    {"a": {"flow": "x", "depends_on": ["missing"]}},
+    {"a": {"flow": "x"}, "b": {"flow": "x", "inputs": {"value": "a.status"}}},
+], ids=["empty", "no_flow", "missing_dependency", "input_not_dependency"])
+def test_invalid_definition(nodes):
+    with pytest.raises(ValueError):
+        DagDefinition.parse(nodes)
+
+
+def test_order_follows_dependencies():
+    definition = DagDefinition.parse({
+        "report": {"flow": "x", "depends_on": ["reset_a", "reset_b"]},
+        "reset_a": {"flow": "x", "depends_on": ["fetch_a"]},
+        "reset_b": {"flow": "x", "depends_on": ["fetch_b"]},
+        "fetch_a": {"flow": "x"},
+        "fetch_b": {"flow": "x"},
+    })
+    position = {node_id: index for index, node_id in enumerate(definition.order)}
+    assert sorted(position) == ["fetch_a", "fetch_b", "report", "reset_a", "reset_b"]
+    for node in definition.nodes.values():
+        for dependency in node.depends_on:
+            assert position[dependency] < position[node.node_id]
+
+
+def test_critical_path():
+    definition = DagDefinition.parse({
+        "a": {"flow": "x"},
+        "b": {"flow": "x"},
+        "c": {"flow": "x", "depends_on": ["a", "b"]},
+    })
+    assert definition.critical_path({"a": 1.0, "b": 3.0, "c": 2.0}) == (["b", "c"], 5.0)
+
+
+class StepFlow(BaseWorkflow):
+    """记录开始和结束顺序，fail为True时返回错误结果"""
+    DEFAULT_PARAMS = {"name": None, "fail": False, "value": None, "upstream_results": None}
+    events = []
+    lock = threading.Lock()
+
+    def run(self):
+        name = self.get_param("name")
+        with StepFlow.lock:
+            StepFlow.events.append(("start", name))
+        time.sleep(0.05)
+        with StepFlow.lock:
+            StepFlow.events.append(("end", name))
+        if self.get_param("fail"):
+            return {"status": "error", "message": name}
+        return {"status": "success", "name": name, "value": self.get_param("value"),
+                "upstream": sorted(self.get_param("upstream_results") or {})}
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(WorkflowManager, "find_workflow_class", staticmethod(lambda name: {"test.step": StepFlow}[name]))
+    StepFlow.events = []
+    manager = WorkflowManager()
+    yield manager
+    manager.close()
+
+
+def _node(name, depends_on=None, **params):
+    return {"flow": "test.step", "params": dict(params, name=name), "depends_on": depends_on or []}
+
+
+def test_nodes_start_after_their_dependencies(manager):
+    nodes = {
+        "fetch_a": _node("fetch_a"),
+        "fetch_b": _node("fetch_b"),
+        "reset_a": _node("reset_a", ["fetch_a"]),
+        "report": _node("report", ["reset_a", "fetch_b"]),
+    }
+    nodes["reset_a"]["inputs"] = {"value": "fetch_a.name"}
+    result = manager.run_flow(DagFlow, {"nodes": nodes})
+    assert result["status"] == "success"
+    events = StepFlow.events
+    for node_id, node in nodes.items():
+        for dependency in node["depends_on"]:
+            assert events.index(("end", dependency)) < events.index(("start", node_id))
+    # 没有依赖关系的节点并发执行
+    assert events.index(("start", "fetch_b")) < events.index(("end", "fetch_a"))
+    assert result["results"]["reset_a"]["value"] == "fetch_a"
+    assert result["results"]["report"]["upstream"] == ["fetch_b", "reset_a"]
+    assert result["critical_path"] == ["fetch_a", "reset_a", "report"]
+
+
+def test_failure_skips_downstream(manager):
+    result = manager.run_flow(DagFlow, {"nodes": {
+        "a": _node("a", fail=True),
+        "b": _node("b", ["a"]),
+        "c": _node("c", ["b"]),
+        "d": _node("d"),
+    }})
+    assert result["status"] == "partial"
+    assert result["failed"] == ["a"]
+    assert sorted(result["skipped"]) == ["b", "c"]
+    assert sorted(name for kind, name in StepFlow.events if kind == "start") == ["a", "d"]
+
+
+def test_cyclic_dag_flow_fails_before_running(manager):
+    result = manager.run_flow(DagFlow, {"nodes": {"a": _node("a", ["b"]), "b": _node("b", ["a"])}})
+    assert result["status"] == "error"
+    assert StepFlow.events == []
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+
+import pytest
+
+from core import event_loop
+
+
+def test_line_longer_than_stream_limit():
+    code = "print('a' * 200000); print('tail')"
+    result = asyncio.run(event_loop.run_subprocess([sys.executable, "-c", code]))
+    assert result["returncode"] == 0
+    assert result["output"].split("\n") == ["a" * 200000, "tail"]
+
+
+def test_lines_split_across_reads():
+    code = "import sys\nfor i in range(20000): sys.stdout.write(f'line {i}\\n')"
+    seen = []
+    result = asyncio.run(event_loop.run_subprocess([sys.executable, "-c", code], seen.append, keep_output=False))
+    assert seen == [f"line {i}" for i in range(20000)]
+    assert result == {"returncode": 0, "output": ""}
+
+
+def test_failed_callback_kills_process(monkeypatch):
+    processes = []
+    create = asyncio.create_subprocess_exec
+
+    async def capture(*args, **kwargs):
+        process = await create(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", capture)
+
+    def callback(line):
+        raise RuntimeError(line)
+
+    code = "import time; print('started', flush=True); time.sleep(30)"
+    with pytest.raises(RuntimeError, match="started"):
+        asyncio.run(event_loop.run_subprocess([sys.executable, "-c", code], callback))
+    assert processes[0].returncode is not None
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from core.file_watcher import (
+    WATCH_BACKEND_INOTIFY,
+    WATCH_BACKEND_POLL,
+    PathFilter,
+    create_watcher,
+)
+
+
+@pytest.fixture(params=[WATCH_BACKEND_POLL, WATCH_BACKEND_INOTIFY])
+def make_watcher(request):
+    watchers = []
+
+    def make(paths, path_filter=None, recursive=True):
+        try:
+            watcher = create_watcher([str(path) for path in paths], path_filter, recursive, backend=request.param)
+        except OSError as e:
+            pytest.skip(f"inotify不可用: {e}")
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.close()
+
+
+def _touch(path):
+    """推进mtime，避免依赖文件系统的时间精度"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_detects_create_modify_delete(tmp_path, make_watcher):
+    existing = tmp_path / "a.txt"
+    existing.write_text("a")
+    removed = tmp_path / "b.txt"
+    removed.write_text("b")
+    watcher = make_watcher([tmp_path])
+    assert watcher.poll() == set()
+
+    created = tmp_path / "c.txt"
+    created.write_text("c")
+    _touch(existing)
+    removed.unlink()
+    assert watcher.poll() == {str(created), str(existing), str(removed)}
+    assert watcher.poll() == set()
+
+
+def test_same_size_rewrite_is_detected(tmp_path, make_watcher):
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    watcher = make_watcher([tmp_path])
+    path.write_text("new")
+    _touch(path)
+    assert watcher.poll() == {str(path)}
+
+
+def test_filter_and_ignored_directories(tmp_path, make_watcher):
+    (tmp_path / "src").mkdir()
+    (tmp_path / ".git").mkdir()
+    watcher = make_watcher([tmp_path], PathFilter(["*.py"], [".git"]))
+    source = tmp_path / "src" / "main.py"
+    source.write_text("print(1)")
+    (tmp_path / "src" / "notes.txt").write_text("x")
+    (tmp_path / ".git" / "hook.py").write_text("x")
+    assert watcher.poll() == {str(source)}
+
+
+def test_recursive_and_new_subdirectories(tmp_path, make_watcher):
+    watcher = make_watcher([tmp_path])
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    path = nested / "c.txt"
+    path.write_text("c")
+    assert watcher.poll() == {str(path)}
+
+
+def test_non_recursive_ignores_subdirectories(tmp_path, make_watcher):
+    (tmp_path / "sub").mkdir()
+    watcher = make_watcher([tmp_path], recursive=False)
+    (tmp_path / "sub" / "a.txt").write_text("a")
+    top = tmp_path / "b.txt"
+    top.write_text("b")
+    assert watcher.poll() == {str(top)}
+
+
+def test_single_file_root(tmp_path, make_watcher):
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    (tmp_path / "other.json").write_text("{}")
+    watcher = make_watcher([path])
+    (tmp_path / "other.json").write_text("[]")
+    _touch(path)
+    assert watcher.poll() == {str(path)}
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from core.fingerprint import Fingerprint
+from core.manager import WorkflowManager
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+
+
+class BuildFlow(BaseWorkflow):
+    INCREMENTAL = True
+    DEFAULT_PARAMS = {"source": None, "mode": "debug", "fail": None}
+    runs = 0
+
+    def input_fingerprints(self):
+        return {"source": Fingerprint.files(self.get_param("source"))}
+
+    def run(self):
+        BuildFlow.runs += 1
+        if self.get_param("fail") == "raise":
+            raise RuntimeError("build failed")
+        if self.get_param("fail") == "error":
+            return {"status": "error", "message": "build failed"}
+        return {"status": "success", "run": BuildFlow.runs}
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    BuildFlow.runs = 0
+    path = tmp_path / "input.txt"
+    path.write_text("v1", encoding="utf-8")
+    return path
+
+
+def _build(tmp_path, **params):
+    manager = WorkflowManager(state_store=StateStore(str(tmp_path / "state.db")))
+    try:
+        return manager.run_flow(BuildFlow, params)
+    finally:
+        manager.close()
+
+
+def test_unchanged_inputs_skip_run(source, tmp_path):
+    assert _build(tmp_path, source=str(source)) == {"status": "success", "run": 1}
+    # 新的管理器同样从状态库读取上次的记录
+    assert _build(tmp_path, source=str(source)) == {"status": "success", "run": 1}
+    assert BuildFlow.runs == 1
+
+
+def test_changed_input_file_reruns(source, tmp_path):
+    _build(tmp_path, source=str(source))
+    source.write_text("version 2", encoding="utf-8")
+    assert _build(tmp_path, source=str(source)) == {"status": "success", "run": 2}
+    assert _build(tmp_path, source=str(source)) == {"status": "success", "run": 2}
+
+
+def test_changed_param_reruns(source, tmp_path):
+    _build(tmp_path, source=str(source))
+    assert _build(tmp_path, source=str(source), mode="release") == {"status": "success", "run": 2}
+
+
+def test_force_run(source, tmp_path):
+    _build(tmp_path, source=str(source))
+    assert _build(tmp_path, source=str(source), force_run=True) == {"status": "success", "run": 2}
+    # force_run不参与状态键，强制执行的结果同样被记录
+    assert _build(tmp_path, source=str(source)) == {"status": "success", "run": 2}
+
+
+@pytest.mark.parametrize("fail", ["error", "raise"])
+def test_failed_run_is_not_recorded(source, tmp_path, fail):
+    _build(tmp_path, source=str(source), fail=fail)
+    # 输入和参数都没有变化，但上次失败，仍然执行
+    _build(tmp_path, source=str(source), fail=fail)
+    assert BuildFlow.runs == 2
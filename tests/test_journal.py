@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import pytest
+
+from core.journal import RunJournal, position_params
+from core.manager import WorkflowManager
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+
+
+class ChildFlow(BaseWorkflow):
+    calls = 0
+
+    def run(self):
+        ChildFlow.calls += 1
+        return {"status": "success", "calls": ChildFlow.calls}
+
+
+class ParentFlow(BaseWorkflow):
+    fail = True
+
+    def run(self):
+        # 每次执行都创建新的函数对象，repr中的地址各不相同
+        result = self.run_flow(ChildFlow, {"finished_func": lambda: None, "target": "repo"})
+        if ParentFlow.fail:
+            raise RuntimeError("interrupted")
+        return result
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _run(journal, state_store, run_id):
+    manager = WorkflowManager(journal=journal, state_store=state_store, run_id=run_id)
+    try:
+        return manager._run_flow_safely(ParentFlow)
+    finally:
+        manager.close()
+
+
+def test_resume_replays_step_with_callable_params(workdir):
+    journal = RunJournal(str(workdir / "journal.db"))
+    state_store = StateStore(str(workdir / "state.db"))
+    ChildFlow.calls = 0
+
+    ParentFlow.fail = True
+    _, error = _run(journal, state_store, "run-1")
+    assert error is not None
+    assert ChildFlow.calls == 1
+
+    ParentFlow.fail = False
+    result, error = _run(journal, state_store, "run-1")
+    assert error is None
+    # 子流程从检查点回放，没有再次执行
+    assert ChildFlow.calls == 1
+    assert result == {"status": "success", "calls": 1}
+    journal.close()
+    state_store.close()
+
+
+def test_position_params_ignore_object_identity():
+    class Target:
+        def callback(self):
+            pass
+
+    def make_params():
+        return {"finished_func": lambda: None, "method": Target().callback, "obj": Target(), "n": [1, "a"]}
+
+    assert position_params(make_params()) == position_params(make_params())
+
+
+def test_retention_drops_old_runs_and_checkpoints(workdir):
+    journal = RunJournal(str(workdir / "journal.db"))
+    journal.start_run("old", {"flow": "a"})
+    journal.put_checkpoint("old", "/a#1", "A", {"status": "success"})
+    journal.finish_run("old", "success")
+    journal.start_run("new", {"flow": "a"})
+    journal.put_checkpoint("new", "/a#1", "A", {"status": "success"})
+
+    assert journal.apply_retention(retention_days=30, now=time.time() + 31 * 86400) == 2
+    assert journal.get_run("old") is None
+    assert journal.get_checkpoint("old", "/a#1") is None
+
+    journal.start_run("recent", {"flow": "a"})
+    assert journal.apply_retention(retention_days=30) == 0
+    assert journal.get_run("recent") is not None
+    journal.close()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import queue
+import threading
+import time
+
+import pytest
+
+from core.logger import WorkflowLogger, _LEVEL_NO
+
+
+class _RecordingLogger:
+    """代替loguru记录写出的日志，每次写出耗时delay秒"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.records = []
+        self.threads = set()
+        self.exceptions = []
+
+    def bind(self, **extra):
+        return self
+
+    def opt(self, exception=None):
+        self.exceptions.append(exception)
+        return self
+
+    def _record(self, level, msg):
+        time.sleep(self.delay)
+        self.threads.add(threading.current_thread().name)
+        self.records.append((level, msg))
+
+    def debug(self, msg):
+        self._record('debug', msg)
+
+    def info(self, msg):
+        self._record('info', msg)
+
+    def warning(self, msg):
+        self._record('warning', msg)
+
+    def error(self, msg):
+        self._record('error', msg)
+
+
+@pytest.fixture
+def recording():
+    """不经过单例，直接创建带后台写入线程的日志对象"""
+    sink = _RecordingLogger(delay=0.005)
+    log = object.__new__(WorkflowLogger)
+    log._logger = sink
+    log._min_level_no = _LEVEL_NO['info']
+    log._queue = queue.Queue(maxsize=8)
+    log._writer = threading.Thread(target=log._write_loop, name="workflow-logger-test", daemon=True)
+    log._writer.start()
+    yield log, sink
+    log.shutdown()
+
+
+def test_writes_happen_on_writer_thread(recording):
+    log, sink = recording
+    log.info("hello")
+    log.debug("hidden")
+    log.flush()
+    assert sink.records == [('info', "hello")]
+    assert sink.threads == {"workflow-logger-test"}
+
+
+def test_exception_info_is_captured_in_calling_thread(recording):
+    log, sink = recording
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("failed")
+    log.flush()
+    assert sink.records == [('error', "failed")]
+    assert sink.exceptions[0][0] is ValueError
+
+
+def test_flush_waits_for_queued_messages(recording):
+    log, sink = recording
+    # 队列上限小于消息数，写入跟不上时调用方等待而不是丢弃
+    for i in range(30):
+        log.info(f"message {i}")
+    log.flush()
+    assert sink.records == [('info', f"message {i}") for i in range(30)]
+
+
+def test_shutdown_writes_remaining_before_later_messages(recording):
+    log, sink = recording
+    for i in range(5):
+        log.warning(f"queued {i}")
+    log.shutdown()
+    assert not log._writer.is_alive()
+    assert len(sink.records) == 5
+    # 写入线程停止后直接在调用线程中写出，顺序不变
+    log.error("after shutdown")
+    log.flush()
+    log.shutdown()
+    assert sink.records[-1] == ('error', "after shutdown")
+    assert [msg for _, msg in sink.records[:5]] == [f"queued {i}" for i in range(5)]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from core.manager import WorkflowManager
+from core.parallel import DEFAULT_MAX_WORKERS, normalize_flow_specs, resolve_max_workers
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+
+
+class SleepFlow(BaseWorkflow):
+    """记录同时运行的最大数量"""
+    DEFAULT_PARAMS = {"n": 0, "fail": False}
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def run(self):
+        with SleepFlow.lock:
+            SleepFlow.running += 1
+            SleepFlow.peak = max(SleepFlow.peak, SleepFlow.running)
+        try:
+            time.sleep(0.05)
+            if self.get_param("fail"):
+                raise RuntimeError(f"task {self.get_param('n')}")
+            return {"status": "success", "n": self.get_param("n")}
+        finally:
+            with SleepFlow.lock:
+                SleepFlow.running -= 1
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    SleepFlow.running = SleepFlow.peak = 0
+    manager = WorkflowManager(state_store=StateStore(str(tmp_path / "state.db")))
+    yield manager
+    manager.close()
+
+
+def test_normalize_flow_specs():
+    assert normalize_flow_specs([SleepFlow, (SleepFlow, {"n": 1})]) == [(SleepFlow, None), (SleepFlow, {"n": 1})]
+
+
+@pytest.mark.parametrize("max_workers, task_count, expected", [
+    (None, 100, DEFAULT_MAX_WORKERS),
+    (0, 100, DEFAULT_MAX_WORKERS),
+    (4, 2, 2),
+    (4, 0, 1),
+])
+def test_resolve_max_workers(max_workers, task_count, expected):
+    assert resolve_max_workers(max_workers, task_count) == expected
+
+
+def test_outcomes_keep_input_order_and_isolate_failures(manager):
+    outcomes = manager.map_flow(SleepFlow, [{"n": 1}, {"n": 2, "fail": True}, {"n": 3}], max_workers=3)
+    assert [outcome.params["n"] for outcome in outcomes] == [1, 2, 3]
+    assert [outcome.ok for outcome in outcomes] == [True, False, True]
+    assert outcomes[0].result["n"] == 1 and outcomes[2].result["n"] == 3
+    assert str(outcomes[1].error) == "task 2"
+    assert SleepFlow.peak == 3
+
+
+def test_concurrency_is_bounded(manager):
+    outcomes = manager.run_flows_parallel([(SleepFlow, {"n": n}) for n in range(6)], max_workers=2)
+    assert all(outcome.ok for outcome in outcomes)
+    assert SleepFlow.peak == 2
+
+
+def test_empty_flows(manager):
+    assert manager.run_flows_parallel([]) == []
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from core.registry import WorkflowRegistry
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return WorkflowRegistry(cache_path=None)
+
+
+def test_bat_flow_defaults_are_static(registry):
+    entry = registry.get("system.bat_flow")
+    assert entry.class_name == "BatFlow"
+    assert entry.default_params["output_dir"] == "logs/output"
+    assert entry.default_params["wait"] is True
+
+
+def test_git_flows_inherit_bat_flow_defaults(registry):
+    entry = registry.get("git.git_status_flow")
+    assert entry.module == "workflows.git.git_status_flow"
+    assert entry.default_params["output_mode"] == "log"
+    assert entry.default_params["porcelain"] is False
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def workflows_dir(tmp_path):
+    root = tmp_path / "workflows"
+    _write(root / "demo" / "base_demo_flow.py", (
+        "from core.workflow import BaseWorkflow\n"
+        "class BaseDemoFlow(BaseWorkflow):\n"
+        "    DEFAULT_PARAMS = {'a': 1, 'b': 1}\n"
+    ))
+    _write(root / "demo" / "hello_flow.py", (
+        "from workflows.demo.base_demo_flow import BaseDemoFlow\n"
+        "class HelloFlow(BaseDemoFlow):\n"
+        "    '''问候'''\n"
+        "    DEFAULT_PARAMS = {'b': 2}\n"
+    ))
+    return root
+
+
+def test_defaults_are_merged_along_lineage(workflows_dir):
+    registry = WorkflowRegistry(str(workflows_dir), cache_path=None)
+    entry = registry.get("demo.hello-flow")
+    assert entry.class_name == "HelloFlow"
+    assert entry.description == "问候"
+    assert entry.default_params == {"a": 1, "b": 2}
+    assert not entry.is_async
+    # 基类模块本身不是以文件名命名的工作流
+    assert [e.flow_name for e in registry.flows()] == ["demo.base_demo_flow", "demo.hello_flow"]
+
+
+def test_dynamic_defaults(workflows_dir):
+    _write(workflows_dir / "demo" / "dynamic_flow.py", (
+        "import os\n"
+        "from core.workflow import BaseWorkflow\n"
+        "class DynamicFlow(BaseWorkflow):\n"
+        "    DEFAULT_PARAMS = {'path': os.getcwd()}\n"
+    ))
+    registry = WorkflowRegistry(str(workflows_dir), cache_path=None)
+    assert registry.get("demo.dynamic_flow").default_params is None
+
+
+def test_hit_picks_up_edited_module(workflows_dir):
+    registry = WorkflowRegistry(str(workflows_dir), cache_path=None)
+    assert registry.get("demo.hello_flow").default_params == {"a": 1, "b": 2}
+    _write(workflows_dir / "demo" / "hello_flow.py", (
+        "from workflows.demo.base_demo_flow import BaseDemoFlow\n"
+        "class HelloFlow(BaseDemoFlow):\n"
+        "    DEFAULT_PARAMS = {'b': 3, 'c': 'changed'}\n"
+    ))
+    assert registry.get("demo.hello_flow").default_params == {"a": 1, "b": 3, "c": "changed"}
+
+    # 类改名后不再是该文件对应的工作流
+    _write(workflows_dir / "demo" / "hello_flow.py", (
+        "from workflows.demo.base_demo_flow import BaseDemoFlow\n"
+        "class RenamedFlow(BaseDemoFlow):\n"
+        "    pass\n"
+    ))
+    assert registry.get("demo.hello_flow") is None
+
+
+def test_hit_picks_up_edited_base_class(workflows_dir):
+    registry = WorkflowRegistry(str(workflows_dir), cache_path=None)
+    assert registry.get("demo.hello_flow").default_params == {"a": 1, "b": 2}
+    _write(workflows_dir / "demo" / "base_demo_flow.py", (
+        "from core.workflow import BaseWorkflow\n"
+        "class BaseDemoFlow(BaseWorkflow):\n"
+        "    DEFAULT_PARAMS = {'a': 10}\n"
+    ))
+    assert registry.get("demo.hello_flow").default_params == {"a": 10, "b": 2}
+
+
+def test_disk_cache_skips_unchanged_files(workflows_dir, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "registry.json")
+    assert WorkflowRegistry(str(workflows_dir), cache_path).get("demo.hello_flow") is not None
+
+    def fail(*args):
+        raise AssertionError("未变化的文件不应重新解析")
+
+    monkeypatch.setattr("core.registry.parse_module", fail)
+    assert WorkflowRegistry(str(workflows_dir), cache_path).get("demo.hello_flow").default_params == {"a": 1, "b": 2}
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from core.manager import WorkflowManager
+from core.result_cache import ResultCache
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+from workflows.git.git_branch_flow import GitBranchFlow
+from workflows.git.git_fetch_flow import GitFetchFlow
+from workflows.git.git_status_flow import GitStatusFlow
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="需要git")
+
+
+class LookupFlow(BaseWorkflow):
+    CACHE_RESULT = True
+    DEFAULT_PARAMS = {"name": None}
+    runs = 0
+
+    def run(self):
+        LookupFlow.runs += 1
+        return {"status": "success", "name": self.get_param("name"), "items": [LookupFlow.runs]}
+
+
+class ShortLivedFlow(LookupFlow):
+    CACHE_TTL = 0.2
+
+
+def _git(*args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    _git("init", "-q", "-b", "main", cwd=origin)
+    _git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "--allow-empty", "-m", "init", cwd=origin)
+    _git("clone", "-q", str(origin), "clone", cwd=tmp_path)
+    return tmp_path / "clone"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = WorkflowManager(result_cache=ResultCache(), state_store=StateStore(str(tmp_path / "state.db")))
+    yield manager
+    manager.close()
+
+
+def _cached_status_count(manager):
+    return manager.result_cache.invalidate_class(f"{GitStatusFlow.__module__}.{GitStatusFlow.__qualname__}")
+
+
+@requires_git
+def test_read_only_branch_operations_keep_status_cache(repo, manager):
+    manager.run_flow(GitStatusFlow, {"repository_path": str(repo), "branch": True})
+    manager.run_flow(GitBranchFlow, {"repository_path": str(repo), "operation": "list"})
+    manager.run_flow(GitBranchFlow, {"repository_path": str(repo), "operation": "check", "branch_name": "main"})
+    assert _cached_status_count(manager) == 1
+
+
+@requires_git
+def test_branch_switch_invalidates_status_cache(repo, manager):
+    manager.run_flow(GitStatusFlow, {"repository_path": str(repo), "branch": True})
+    manager.run_flow(GitBranchFlow, {"repository_path": str(repo), "operation": "create", "branch_name": "dev"})
+    assert _cached_status_count(manager) == 0
+
+
+@requires_git
+def test_fetch_invalidates_status_cache(repo, manager):
+    manager.run_flow(GitStatusFlow, {"repository_path": str(repo), "branch": True})
+    assert manager.run_flow(GitFetchFlow, {"repository_path": str(repo)})["status"] == "success"
+    assert _cached_status_count(manager) == 0
+
+
+def _new_manager(tmp_path, cache):
+    return WorkflowManager(result_cache=cache, state_store=StateStore(str(tmp_path / "state.db")))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    LookupFlow.runs = 0
+    return tmp_path
+
+
+def test_hit_returns_copy(workdir):
+    manager = _new_manager(workdir, ResultCache())
+    try:
+        first = manager.run_flow(LookupFlow, {"name": "a"})
+        first["items"].append("mutated")
+        assert manager.run_flow(LookupFlow, {"name": "a"}) == {"status": "success", "name": "a", "items": [1]}
+        assert LookupFlow.runs == 1
+    finally:
+        manager.close()
+
+
+def test_memory_layer_stays_within_bound(workdir):
+    disk_dir = str(workdir / "cache")
+    manager = _new_manager(workdir, ResultCache(max_entries=2, disk_dir=disk_dir))
+    try:
+        for name in "abc":
+            manager.run_flow(LookupFlow, {"name": name})
+        assert manager.result_cache.stats()["size"] == 2
+    finally:
+        manager.close()
+
+    # 新进程的内存层为空，命中全部来自磁盘层
+    cache = ResultCache(max_entries=2, disk_dir=disk_dir)
+    manager = _new_manager(workdir, cache)
+    try:
+        for name in "abcab":
+            assert manager.run_flow(LookupFlow, {"name": name})["name"] == name
+        assert LookupFlow.runs == 3
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["evictions"] == 3
+    finally:
+        manager.close()
+
+
+def test_entries_expire_after_ttl(workdir):
+    manager = _new_manager(workdir, ResultCache())
+    try:
+        manager.run_flow(ShortLivedFlow, {"name": "a"})
+        manager.run_flow(ShortLivedFlow, {"name": "a"})
+        assert LookupFlow.runs == 1
+        time.sleep(0.3)
+        assert manager.run_flow(ShortLivedFlow, {"name": "a"})["items"] == [2]
+    finally:
+        manager.close()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+import pytest
+
+from core.manager import WorkflowManager
+from core.run_log import RunLog, RunLogIndex
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+
+
+class ChildFlow(BaseWorkflow):
+    DEFAULT_PARAMS = {"name": None, "fail": False}
+
+    def run(self):
+        self.log(f"child {self.get_param('name')}")
+        if self.get_param("fail"):
+            return {"status": "error", "message": "failed"}
+        return {"status": "success"}
+
+
+class ParentFlow(BaseWorkflow):
+    def run(self):
+        self.log("parent before")
+        self.run_flow(ChildFlow, {"name": "a"})
+        self.log("parent between")
+        self.run_flow(ChildFlow, {"name": "b", "fail": True})
+        self.log("parent after")
+        return {"status": "success"}
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_log = RunLog("run-1", directory=str(tmp_path / "runs"))
+    manager = WorkflowManager(state_store=StateStore(str(tmp_path / "state.db")), run_log=run_log)
+    run_log.start_run("test.parent_flow")
+    try:
+        manager.run_flow(ParentFlow)
+        run_log.finish_run("success")
+    finally:
+        manager.close()
+    return str(tmp_path / "runs")
+
+
+def _messages(index, span):
+    """span自身的工作流日志（不含框架输出的开始/结束日志）"""
+    return [record["msg"] for record in index.read_span(span)
+            if record["event"] == "log" and not record["msg"].startswith("[")]
+
+
+def test_spans_are_indexed_with_parent_and_status(run_dir):
+    index = RunLogIndex(run_dir)
+    try:
+        spans = index.query_spans(run_id="run-1")
+        assert len(spans) == 3
+        parent = index.query_spans(flow="ParentFlow")[0]
+        children = index.query_spans(flow="ChildFlow")
+        assert parent.parent_span is None and parent.depth + 1 == children[0].depth
+        assert {child.parent_span for child in children} == {parent.span_id}
+        assert [span.status for span in index.query_spans(run_id="run-1", status="error")] == ["error"]
+        assert index.query_spans(run_id="other") == []
+        assert index.query_spans(since=time.time() + 60) == []
+    finally:
+        index.close()
+
+
+def test_read_span_skips_child_records(run_dir):
+    index = RunLogIndex(run_dir)
+    try:
+        parent = index.query_spans(flow="ParentFlow")[0]
+        records = list(index.read_span(parent))
+        assert records[0]["event"] == "start" and records[-1]["event"] == "end"
+        assert _messages(index, parent) == ["parent before", "parent between", "parent after"]
+        failed = index.query_spans(status="error")[0]
+        assert _messages(index, failed) == ["child b"]
+    finally:
+        index.close()
+
+
+def test_compressed_and_expired_runs(run_dir):
+    index = RunLogIndex(run_dir)
+    try:
+        failed = index.query_spans(status="error")[0]
+        index.apply_retention(retention_days=30, compress_after_days=1, now=time.time() + 2 * 86400)
+        compressed = index.query_spans(status="error")[0]
+        assert compressed.file == f"{failed.file}.gz"
+        assert not os.path.exists(os.path.join(run_dir, failed.file))
+        # 压缩后按原偏移定位
+        assert _messages(index, compressed) == ["child b"]
+
+        index.apply_retention(retention_days=30, now=time.time() + 31 * 86400)
+        assert index.query_spans(run_id="run-1") == []
+        assert not os.path.exists(os.path.join(run_dir, compressed.file))
+    finally:
+        index.close()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import time
+
+import pytest
+
+from core.scheduler import AtSchedule, IntervalSchedule, TimerScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TimerScheduler()
+    yield scheduler
+    scheduler.shutdown()
+
+
+@pytest.mark.parametrize("now, expected", [
+    (12.0, 15.0),
+    (15.0, 20.0),
+    (31.0, 35.0),
+], ids=["on_time", "at_deadline", "missed_periods"])
+def test_interval_skips_missed_periods(now, expected):
+    # 落后时跳到下一个与原有节拍对齐的截止时间，不补发
+    assert IntervalSchedule(5).next_deadline(10.0, now) == expected
+
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        IntervalSchedule(0)
+
+
+def test_cancel_pending_job(scheduler):
+    calls, done = [], []
+    job = scheduler.schedule(IntervalSchedule(60), lambda: calls.append(True), on_done=lambda: done.append(True))
+    assert scheduler.job_count == 1
+    assert not scheduler.join(0.05)
+    job.cancel()
+    job.cancel()
+    assert job.done.is_set()
+    assert scheduler.join(1)
+    assert scheduler.job_count == 0
+    assert calls == []
+    assert done == [True]
+
+
+def test_cancel_from_callback(scheduler):
+    calls = []
+
+    def callback():
+        calls.append(True)
+        if len(calls) == 3:
+            job.cancel()
+
+    job = scheduler.schedule(IntervalSchedule(0.01, start_delay=0), callback)
+    assert job.done.wait(5)
+    time.sleep(0.05)
+    assert len(calls) == 3
+    assert scheduler.join(1)
+
+
+def test_join_waits_for_all_jobs(scheduler):
+    calls = []
+
+    def one_shot(delay):
+        schedule = AtSchedule(datetime.datetime.now() + datetime.timedelta(seconds=delay))
+
+        def callback():
+            calls.append(delay)
+            schedule.complete()
+
+        scheduler.schedule(schedule, callback)
+
+    one_shot(0.2)
+    one_shot(0.1)
+    assert scheduler.job_count == 2
+    assert scheduler.join(5)
+    assert calls == [0.1, 0.2]
+
+
+def test_shutdown_finishes_pending_jobs():
+    scheduler = TimerScheduler()
+    done = []
+    job = scheduler.schedule(IntervalSchedule(60), lambda: None, on_done=lambda: done.append(True))
+    scheduler.shutdown()
+    assert job.done.is_set()
+    assert done == [True]
+    assert scheduler.join(0)
+    with pytest.raises(RuntimeError):
+        scheduler.schedule(IntervalSchedule(60), lambda: None)
+
+
+def test_at_schedule_retries_until_completed(scheduler):
+    schedule = AtSchedule(datetime.datetime.now(), retry_interval=0.01)
+    calls = []
+
+    def callback():
+        calls.append(True)
+        # 前两次模拟运行数量已达上限，未能触发
+        if len(calls) == 3:
+            schedule.complete()
+
+    job = scheduler.schedule(schedule, callback)
+    assert job.done.wait(5)
+    assert len(calls) == 3
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.manager import WorkflowManager
+from core.single_flight import SingleFlight
+from core.state_store import StateStore
+from core.workflow import BaseWorkflow
+
+
+def _run_with_waiters(flight, func, waiters=4):
+    """先启动首个调用者，等waiters个调用者都合并进来后再放行func"""
+    release = threading.Event()
+    joined = threading.Semaphore(0)
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(flight.run("key", func, release, on_join=joined.release))
+        except Exception as e:
+            outcomes.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    while flight.in_flight == 0:
+        time.sleep(0.001)
+    threads = [threading.Thread(target=call) for _ in range(waiters)]
+    for thread in threads:
+        thread.start()
+    for _ in range(waiters):
+        assert joined.acquire(timeout=5)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_calls_run_once_and_get_copies():
+    flight = SingleFlight()
+    calls = []
+
+    def func(release):
+        calls.append(True)
+        release.wait(5)
+        return {"items": [1, 2]}
+
+    outcomes = _run_with_waiters(flight, func)
+    assert len(calls) == 1
+    assert outcomes == [{"items": [1, 2]}] * 5
+    assert len({id(outcome) for outcome in outcomes}) == 5
+    assert len({id(outcome["items"]) for outcome in outcomes}) == 5
+
+
+def test_leader_exception_reaches_all_waiters():
+    flight = SingleFlight()
+
+    def func(release):
+        release.wait(5)
+        raise ValueError("boom")
+
+    outcomes = _run_with_waiters(flight, func)
+    assert len(outcomes) == 5
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_key_is_removed_after_completion(fail):
+    flight = SingleFlight()
+    calls = []
+
+    def func():
+        calls.append(True)
+        if fail:
+            raise ValueError("boom")
+        return len(calls)
+
+    for expected in (1, 2):
+        if fail:
+            with pytest.raises(ValueError):
+                flight.run("key", func)
+        else:
+            assert flight.run("key", func) == expected
+        assert flight.in_flight == 0
+    assert len(calls) == 2
+
+
+def test_run_async_shares_in_flight_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def main():
+        release = asyncio.Event()
+        joined = []
+
+        async def func():
+            calls.append(True)
+            await release.wait()
+            return ["result"]
+
+        tasks = [asyncio.ensure_future(flight.run_async("key", func, on_join=lambda: joined.append(True)))
+                 for _ in range(3)]
+        while len(joined) < 2:
+            await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert flight.in_flight == 0
+        return results
+
+    results = asyncio.run(main())
+    assert calls == [True]
+    assert results == [["result"]] * 3
+    assert len({id(result) for result in results}) == 3
+
+
+class SlowFetchFlow(BaseWorkflow):
+    SINGLE_FLIGHT = True
+    DEFAULT_PARAMS = {"repo": None}
+    runs = []
+
+    def run(self):
+        SlowFetchFlow.runs.append(self.get_param("repo"))
+        time.sleep(0.3)
+        return {"status": "success", "repo": self.get_param("repo")}
+
+
+def test_manager_merges_identical_parallel_calls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    SlowFetchFlow.runs = []
+    manager = WorkflowManager(state_store=StateStore(str(tmp_path / "state.db")))
+    try:
+        outcomes = manager.run_flows_parallel(
+            [(SlowFetchFlow, {"repo": "a"})] * 4 + [(SlowFetchFlow, {"repo": "b"})], max_workers=5
+        )
+    finally:
+        manager.close()
+    assert [outcome.result["repo"] for outcome in outcomes] == ["a", "a", "a", "a", "b"]
+    assert sorted(SlowFetchFlow.runs) == ["a", "b"]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import sys
+
+from core.subprocess_executor import SubprocessExecutor, _Budget
+
+
+def test_budget_never_exceeds_limit():
+    async def main():
+        budget = _Budget(2)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            await budget.acquire()
+            try:
+                peak = max(peak, budget.active)
+                await asyncio.sleep(0.01)
+            finally:
+                budget.release()
+
+        await asyncio.gather(*(worker() for _ in range(10)))
+        return peak, budget.active, budget.pending
+
+    assert asyncio.run(main()) == (2, 0, 0)
+
+
+def test_raising_limit_wakes_waiters():
+    async def main():
+        budget = _Budget(1)
+        await budget.acquire()
+        waiters = [asyncio.ensure_future(budget.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert budget.pending == 2
+        budget.set_limit(3)
+        await asyncio.gather(*waiters)
+        return budget.active, budget.pending
+
+    assert asyncio.run(main()) == (3, 0)
+
+
+def test_unlimited_budget():
+    async def main():
+        budget = _Budget(0)
+        for _ in range(100):
+            await budget.acquire()
+        return budget.active
+
+    assert asyncio.run(main()) == 100
+
+
+def test_cancelled_waiter_gives_back_its_slot():
+    async def main():
+        budget = _Budget(1)
+        await budget.acquire()
+        cancelled = asyncio.ensure_future(budget.acquire())
+        queued = asyncio.ensure_future(budget.acquire())
+        await asyncio.sleep(0)
+        # 名额已分配给第一个等待者，但它在恢复执行前被取消
+        budget.release()
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        await asyncio.wait_for(queued, 1)
+        return budget.active, budget.pending
+
+    assert asyncio.run(main()) == (1, 0)
+
+
+def test_key_limit_bounds_concurrent_commands():
+    executor = SubprocessExecutor(max_concurrency=8)
+    executor.set_limit("repo", 2)
+    code = "import time; print(time.monotonic()); time.sleep(0.3); print(time.monotonic())"
+    handles = [executor.submit([sys.executable, "-c", code], key="repo") for _ in range(4)]
+    results = SubprocessExecutor.wait_all(handles, timeout=30)
+    intervals = [tuple(map(float, result["output"].split())) for result in results]
+    # 任意时刻最多两条命令在运行
+    for start, _ in intervals:
+        assert sum(1 for s, e in intervals if s <= start < e) <= 2
+    assert executor.stats()["keys"] == {}
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.manager import WorkflowManager
+from core.trigger_dispatch import (
+    BACKPRESSURE_COALESCE,
+    BACKPRESSURE_QUEUE,
+    BACKPRESSURE_REJECT,
+    DISPATCH_IN_PROCESS,
+    DISPATCH_SUBPROCESS,
+    SUBMIT_COALESCED,
+    SUBMIT_EXHAUSTED,
+    SUBMIT_QUEUED,
+    SUBMIT_REJECTED,
+    SUBMIT_STARTED,
+    TriggerDispatcher,
+)
+from core.workflow import BaseWorkflow
+from workflows.trigger.webhook_trigger_flow import WebhookTriggerWorkflow
+
+
+class TargetFlow(BaseWorkflow):
+    DEFAULT_PARAMS = {"wait": True, "interval": 1}
+
+    def run(self):
+        return {"status": "success", "wait": self.get_param("wait"), "interval": self.get_param("interval"),
+                "extra": self.get_param("extra")}
+
+
+class BlockingFlow(BaseWorkflow):
+    """记录触发顺序，gate打开前一直占用运行名额"""
+    DEFAULT_PARAMS = {"n": None}
+    gate = threading.Event()
+    runs = []
+
+    def run(self):
+        BlockingFlow.runs.append(self.get_param("n"))
+        BlockingFlow.gate.wait(10)
+        return {"status": "success"}
+
+
+class HostFlow(BaseWorkflow):
+    """持有分发器的触发器，参数与目标工作流同名"""
+    DEFAULT_PARAMS = {"wait": True, "interval": 0.2}
+    options = {}
+
+    def run(self):
+        dispatcher = TriggerDispatcher(self, self.get_param("trigger_flow_data"), DISPATCH_IN_PROCESS, **HostFlow.options)
+        assert dispatcher.load()
+        try:
+            return dispatcher.fire({"extra": "payload"}).result(10)
+        finally:
+            dispatcher.shutdown()
+
+
+@pytest.fixture
+def flow_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(WorkflowManager, "find_workflow_class",
+                        staticmethod(lambda name: {"test.target_flow": TargetFlow, "test.blocking_flow": BlockingFlow}[name]))
+    path = tmp_path / "target.json"
+    path.write_text(json.dumps({"flow": "test.target_flow", "wait": False, "interval": 99}), encoding="utf-8")
+    return str(path)
+
+
+def test_target_params_are_not_shadowed_by_trigger(flow_data):
+    manager = WorkflowManager()
+    try:
+        result = manager.run_flow(HostFlow, {"trigger_flow_data": flow_data})
+    finally:
+        manager.close()
+    assert result == {"status": "success", "wait": False, "interval": 99, "extra": "payload"}
+
+
+class _Host(BaseWorkflow):
+    def run(self):
+        return None
+
+
+def _subprocess_dispatcher(manager, flow_data):
+    host = _Host(manager, manager.global_config)
+    return TriggerDispatcher(host, flow_data, DISPATCH_SUBPROCESS, max_running=1)
+
+
+@pytest.mark.parametrize("raises", [False, True], ids=["error_result", "exception"])
+def test_failed_subprocess_launch_frees_slot(flow_data, monkeypatch, raises):
+    def failing_run_flow(self, workflow_class, params=None):
+        if raises:
+            raise RuntimeError("launch failed")
+        return {"status": "error", "message": "launch failed"}
+
+    monkeypatch.setattr(BaseWorkflow, "run_flow", failing_run_flow)
+    manager = WorkflowManager()
+    try:
+        dispatcher = _subprocess_dispatcher(manager, flow_data)
+        for _ in range(3):
+            if raises:
+                with pytest.raises(RuntimeError):
+                    dispatcher.fire()
+            else:
+                assert dispatcher.fire() is not None
+            assert dispatcher.counter.running == 0
+        assert not dispatcher.counter.saturated
+    finally:
+        manager.close()
+
+
+@pytest.fixture
+def blocking_flow_data(flow_data, tmp_path):
+    BlockingFlow.gate = threading.Event()
+    BlockingFlow.runs = []
+    path = tmp_path / "blocking.json"
+    path.write_text(json.dumps({"flow": "test.blocking_flow"}), encoding="utf-8")
+    yield str(path)
+    BlockingFlow.gate.set()
+
+
+def _wait_finished(dispatcher, count):
+    deadline = time.monotonic() + 10
+    while dispatcher.counter.finished < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dispatcher.counter.finished == count
+
+
+def _submit_all(blocking_flow_data, submits, expected_runs, **options):
+    manager = WorkflowManager()
+    try:
+        host = _Host(manager, manager.global_config)
+        dispatcher = TriggerDispatcher(host, blocking_flow_data, DISPATCH_IN_PROCESS, max_running=1, **options)
+        assert dispatcher.load()
+        try:
+            results = [dispatcher.submit({"n": n}) for n in range(1, submits + 1)]
+            pending = dispatcher.pending_count
+            BlockingFlow.gate.set()
+            _wait_finished(dispatcher, len(expected_runs))
+            assert BlockingFlow.runs == expected_runs
+            assert dispatcher.pending_count == 0
+        finally:
+            dispatcher.shutdown()
+    finally:
+        manager.close()
+    return results, pending
+
+
+def test_reject_policy(blocking_flow_data):
+    results, pending = _submit_all(blocking_flow_data, 3, [1], backpressure=BACKPRESSURE_REJECT)
+    assert results == [SUBMIT_STARTED, SUBMIT_REJECTED, SUBMIT_REJECTED]
+    assert pending == 0
+
+
+def test_queue_policy_runs_pending_in_order(blocking_flow_data):
+    results, pending = _submit_all(blocking_flow_data, 4, [1, 2, 3], backpressure=BACKPRESSURE_QUEUE, max_pending=2)
+    assert results == [SUBMIT_STARTED, SUBMIT_QUEUED, SUBMIT_QUEUED, SUBMIT_REJECTED]
+    assert pending == 2
+
+
+def test_coalesce_policy_keeps_last_params(blocking_flow_data):
+    results, pending = _submit_all(blocking_flow_data, 3, [1, 3], backpressure=BACKPRESSURE_COALESCE)
+    assert results == [SUBMIT_STARTED, SUBMIT_COALESCED, SUBMIT_COALESCED]
+    assert pending == 1
+
+
+def test_queue_does_not_exceed_max_total(blocking_flow_data):
+    # 剩余的一次触发已被排队中的触发占用
+    results, pending = _submit_all(blocking_flow_data, 3, [1, 2], backpressure=BACKPRESSURE_QUEUE, max_total=2)
+    assert results == [SUBMIT_STARTED, SUBMIT_QUEUED, SUBMIT_EXHAUSTED]
+    assert pending == 1
+
+
+def test_coalesce_replaces_pending_at_max_total(blocking_flow_data):
+    exhausted = []
+    results, pending = _submit_all(blocking_flow_data, 3, [1, 3], backpressure=BACKPRESSURE_COALESCE, max_total=2,
+                                   on_exhausted=lambda: exhausted.append(True))
+    assert results == [SUBMIT_STARTED, SUBMIT_COALESCED, SUBMIT_COALESCED]
+    assert pending == 1
+    assert exhausted == [True]
+
+
+def test_submit_after_exhausted(blocking_flow_data):
+    manager = WorkflowManager()
+    try:
+        host = _Host(manager, manager.global_config)
+        dispatcher = TriggerDispatcher(host, blocking_flow_data, DISPATCH_IN_PROCESS, max_total=1,
+                                       backpressure=BACKPRESSURE_QUEUE)
+        assert dispatcher.load()
+        try:
+            assert dispatcher.submit({"n": 1}) == SUBMIT_STARTED
+            BlockingFlow.gate.set()
+            _wait_finished(dispatcher, 1)
+            assert dispatcher.submit({"n": 2}) == SUBMIT_EXHAUSTED
+        finally:
+            dispatcher.shutdown()
+    finally:
+        manager.close()
+    assert BlockingFlow.runs == [1]
+
+
+class CapturingWebhookFlow(WebhookTriggerWorkflow):
+    instance = None
+
+    def run(self):
+        CapturingWebhookFlow.instance = self
+        return super().run()
+
+
+def _post(port, payload):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}", data=json.dumps(payload).encode("utf-8"),
+                                     method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+@pytest.mark.parametrize("backpressure, expected", [
+    (BACKPRESSURE_REJECT, [202, 429]),
+    (BACKPRESSURE_QUEUE, [202, 202, 503]),
+])
+def test_webhook_response_codes(blocking_flow_data, backpressure, expected):
+    manager = WorkflowManager()
+    try:
+        result = manager.run_flow(CapturingWebhookFlow, {
+            "trigger_flow_data": blocking_flow_data, "webhook_port": 0, "wait": False,
+            "backpressure": backpressure, "max_running_work_count": 1, "max_trigger_count": 2,
+        })
+        assert result["status"] == "async"
+        webhook = CapturingWebhookFlow.instance
+        port = webhook.server.server_address[1]
+        try:
+            assert [_post(port, {"n": n}) for n in range(1, len(expected) + 1)] == expected
+        finally:
+            # 由后台线程停止监听
+            webhook._stopped.set()
+            BlockingFlow.gate.set()
+            assert webhook.dispatcher.counter.wait_idle(10)
+    finally:
+        manager.close()
@@ -4,6 +4,7 @@ import time
 import threading
 from core.workflow import BaseWorkflow
 from core.constants import WorkflowStatus
+from core.context import ExecutionContext
 from workflows.system.bat_flow import BatFlow
 
 class DemoAsyncFlow(BaseWorkflow):
@@ -117,7 +118,7 @@ class DemoAsyncFlow(BaseWorkflow):
             finally:
                 self.completed_tasks += 1
         
-        thread = threading.Thread(target=async_task, daemon=True)
+        thread = threading.Thread(target=ExecutionContext.bind(async_task), daemon=True)
         thread.start()
 
     def _on_async_cmd_finished(self):
@@ -2,6 +2,7 @@
 
 from core.workflow import BaseWorkflow
 from core.constants import WorkflowStatus
+from core.subprocess_executor import SubprocessExecutor
 from workflows.system.bat_flow import BatFlow
 from workflows.system.sys_version_check_flow import SysVersionCheckFlow
 
@@ -66,14 +67,23 @@ class DemoSystemWorkflowFlow(BaseWorkflow):
                 "finished_func": self._on_async_cmd_finished
             })
             
-            # 启动多个异步命令
+            # 启动多个异步命令，收集句柄后统一等待
+            handles = []
             for i in range(2):
                 self.log(f"  启动异步命令 {i + 1}...")
-                self.run_flow(BatFlow, {
+                result = self.run_flow(BatFlow, {
                     "cmd": f"timeout {2 + i}",
                     "wait": False,
-                    "finished_func": lambda: self._on_async_cmd_finished(i + 1)
+                    "finished_func": lambda cmd_id=i + 1: self._on_async_cmd_finished(cmd_id)
                 })
+                # 子流程失败时返回None或不带handle的错误结果
+                if not isinstance(result, dict) or "handle" not in result:
+                    message = result.get("message") if isinstance(result, dict) else result
+                    self.log(f"  异步命令 {i + 1} 启动失败: {message}")
+                    continue
+                handles.append(result["handle"])
+            results = SubprocessExecutor.wait_all(handles)
+            self.log(f"  异步命令全部结束: {[r.get('status') if isinstance(r, dict) else r for r in results]}")
         
         # 4. 复杂命令执行
         self.log("4. 复杂命令执行:")
@@ -2,6 +2,7 @@
 
 from workflows.system.bat_flow import BatFlow
 from core.constants import WorkflowStatus
+from core.command import Command
 import os
 
 class BaseGitFlow(BatFlow):
@@ -41,10 +42,10 @@ class BaseGitFlow(BatFlow):
         return True, None
     
     def _build_git_cmd(self, git_subcommand, *args):
-        """构建Git命令"""
+        """构建Git命令参数列表（不经过shell执行，参数无需加引号）"""
         cmd_parts = ["git", "-C", self.repo_path, git_subcommand]
-        cmd_parts.extend(args)
-        return " ".join(cmd_parts)
+        cmd_parts.extend(str(arg) for arg in args)
+        return cmd_parts
     
     def _execute_git_cmd(self, git_subcommand, *args):
         """执行Git命令"""
@@ -56,33 +57,18 @@ class BaseGitFlow(BatFlow):
         # 构建并执行命令
         git_cmd = self._build_git_cmd(git_subcommand, *args)
         self.log(f"仓库路径: {self.repo_path}")
-        self.log(f"执行命令: {git_cmd}")
+        self.log(f"执行命令: {Command.format(git_cmd)}")
         
         # 执行命令并捕获输出
         result = self._execute_command_with_output(git_cmd)
         return result
     
     def _execute_command_with_output(self, cmd):
-        """执行命令并捕获输出"""
-        import subprocess
-        import platform
-        
+        """执行命令并捕获输出（在共享的子进程执行器中执行，受并发预算限制）"""
         try:
-            # 根据操作系统选择合适的编码
-            encoding = 'gbk' if platform.system() == "Windows" else 'utf-8'
-            
-            process = subprocess.Popen(
-                cmd, 
-                shell=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                encoding=encoding, 
-                errors='replace'
-            )
-            
-            # 捕获输出
-            output, _ = process.communicate()
-            output = output.strip()
+            completed = self._executor().submit(cmd, self.concurrency_key, self.shell).result()
+            output = completed["output"].strip()
+            returncode = completed["returncode"]
             
             # 记录输出到日志
             if output:
@@ -91,19 +77,19 @@ class BaseGitFlow(BatFlow):
                         self.log(line.strip())
             
             # 返回执行结果
-            if process.returncode == 0:
+            if returncode == 0:
                 return {
                     "status": WorkflowStatus.SUCCESS.value, 
                     "message": "Git命令执行成功", 
                     "output": output,
-                    "returncode": process.returncode
+                    "returncode": returncode
                 }
             else:
                 return {
                     "status": WorkflowStatus.ERROR.value, 
-                    "message": f"Git命令执行失败，返回码: {process.returncode}", 
+                    "message": f"Git命令执行失败，返回码: {returncode}", 
                     "output": output,
-                    "returncode": process.returncode
+                    "returncode": returncode
                 }
                 
         except Exception as e:
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from workflows.git.base_git_flow import BaseGitFlow
+from workflows.git.git_status_flow import GitStatusFlow
 from core.constants import WorkflowStatus
 from enum import Enum
 
@@ -31,6 +32,14 @@ class GitBranchFlow(BaseGitFlow):
         "force": False,       # 强制操作
         "quiet": False
     }
+
+    # 创建、删除、切换分支会修改工作区，成功后失效状态检查的缓存结果
+    INVALIDATES_CACHE = (GitStatusFlow,)
+    MUTATING_OPERATIONS = (
+        GitBranchOperation.CREATE.value,
+        GitBranchOperation.DELETE.value,
+        GitBranchOperation.SWITCH.value,
+    )
     
     def init(self):
         super().init()
@@ -43,6 +52,12 @@ class GitBranchFlow(BaseGitFlow):
         self.delete_branch = self.get_param("delete_branch")
         self.force = self.get_param("force")
     
+    def invalidates_cache(self):
+        """只读操作（列出、检查分支）不失效缓存"""
+        if self.operation not in self.MUTATING_OPERATIONS:
+            return ()
+        return super().invalidates_cache()
+    
     def execute_cmd(self):
         """执行Git分支操作"""
         if self.operation == GitBranchOperation.LIST.value:
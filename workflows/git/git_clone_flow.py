@@ -58,7 +58,7 @@ class GitCloneFlow(BaseGitFlow):
             self.log(f"警告：目标目录 {self.target_dir} 已存在")
         
         # 执行Git克隆命令
-        git_cmd = " ".join(["git", "clone"] + args)
+        git_cmd = ["git", "clone"] + args
         result = self._execute_command(git_cmd)
         
         # 如果成功，格式化返回结果
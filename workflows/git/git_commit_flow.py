@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from workflows.git.base_git_flow import BaseGitFlow
+from workflows.git.git_status_flow import GitStatusFlow
 
 class GitCommitFlow(BaseGitFlow):
     """
@@ -23,6 +24,9 @@ class GitCommitFlow(BaseGitFlow):
         "allow_empty": False,
         "no_verify": False
     }
+
+    # 会修改工作区，成功后失效状态检查的缓存结果
+    INVALIDATES_CACHE = (GitStatusFlow,)
     
     def init(self):
         super().init()
@@ -61,7 +65,7 @@ class GitCommitFlow(BaseGitFlow):
         if self.no_verify:
             args.append("--no-verify")
         if self.message and not self.amend:
-            args.extend(["-m", f'"{self.message}"'])
+            args.extend(["-m", self.message])
         
         # 执行Git提交命令
         result = self._execute_git_cmd("commit", *args)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from workflows.git.base_git_flow import BaseGitFlow
+from workflows.git.git_status_flow import GitStatusFlow
 
 class GitFetchFlow(BaseGitFlow):
     """
@@ -15,6 +16,12 @@ class GitFetchFlow(BaseGitFlow):
         "all": False,        # 是否获取所有远程
         "quiet": False
     }
+
+    # 多个触发器同时拉取同一仓库时只执行一次
+    SINGLE_FLIGHT = True
+
+    # 更新远程跟踪分支，状态检查中的领先/落后计数随之变化
+    INVALIDATES_CACHE = (GitStatusFlow,)
     
     def init(self):
         super().init()
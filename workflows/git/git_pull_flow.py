@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from workflows.git.base_git_flow import BaseGitFlow
+from workflows.git.git_status_flow import GitStatusFlow
 
 class GitPullFlow(BaseGitFlow):
     """
@@ -20,6 +21,9 @@ class GitPullFlow(BaseGitFlow):
         "rebase": False,
         "ff_only": False
     }
+
+    # 会修改工作区，成功后失效状态检查的缓存结果
+    INVALIDATES_CACHE = (GitStatusFlow,)
     
     def init(self):
         super().init()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from workflows.git.base_git_flow import BaseGitFlow
+from workflows.git.git_status_flow import GitStatusFlow
 
 class GitResetFlow(BaseGitFlow):
     """
@@ -15,6 +16,9 @@ class GitResetFlow(BaseGitFlow):
         "target": "HEAD",      # HEAD, commit_hash, branch_name
         "quiet": False
     }
+
+    # 会修改工作区，成功后失效状态检查的缓存结果
+    INVALIDATES_CACHE = (GitStatusFlow,)
     
     def init(self):
         super().init()
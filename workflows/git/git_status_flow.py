@@ -20,6 +20,11 @@ class GitStatusFlow(BaseGitFlow):
         "verbose": False,
         "ignore_submodules": False
     }
+
+    # 只读操作，短时间内相同参数的状态检查复用结果
+    CACHE_RESULT = True
+    CACHE_TTL = 10
+    SINGLE_FLIGHT = True
     
     def init(self):
         super().init()
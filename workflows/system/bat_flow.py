@@ -2,23 +2,41 @@
 
 from core.workflow import BaseWorkflow
 from core.constants import WorkflowStatus
+from core import event_loop
+from core.output_capture import CommandOutputFile
+from core.command import Command
+from core.subprocess_executor import SubprocessExecutor
 import subprocess
-import threading
 import platform
 
 class BatFlow(BaseWorkflow):
     """
     执行一条bat/shell命令。
-    支持wait参数，wait=True时等待命令执行完。
+    cmd可以是命令字符串或参数列表，参数列表不经过shell直接执行，参数无需转义。
+    支持shell参数：None自动选择（列表及不含管道、重定向、变量等shell语法的简单字符串命令不经过shell），
+    True始终使用shell，False始终不使用shell。
+    支持wait参数，wait=True时等待命令执行完；wait=False时立即返回，结果中的handle可等待、取消或用
+    SubprocessExecutor.wait_all批量等待。命令都在共享的子进程执行器中运行，受全局并发预算限制，
+    concurrency_key/concurrency_limit参数可为同一类命令（如同一仓库）设置单独的并发上限。
     支持close参数，close=True时窗口自动关闭。
     支持finished_func参数，命令完成后执行回调函数。
     支持enable_logging参数，控制是否写入日志。
+    支持output_mode参数：log逐行写入日志；file输出直接写入 output_dir 下的文件，日志中只记录头尾摘要和文件路径，
+    适用于输出量很大的命令（构建、clone进度等）。
     """
     DEFAULT_PARAMS = {
+        "shell": None,
         "wait": True,
+        "concurrency_key": None,
+        "concurrency_limit": None,
         "close": True,
         "finished_func": None,
         "enable_bat_log": True,
+        "output_mode": "log",
+        # 与 core.output_capture.DEFAULT_OUTPUT_DIR 一致；写成字面量，注册表才能静态读取默认参数
+        "output_dir": "logs/output",
+        # file模式下日志中保留的头部/尾部行数
+        "output_summary_lines": 10,
     }
 
     def init(self):
@@ -26,6 +44,9 @@ class BatFlow(BaseWorkflow):
         self.close = self.get_param('close', True)
         self.finished_func = self.get_param('finished_func', None)
         self.enable_bat_log = self.get_param('enable_bat_log', True)
+        self.output_mode = self.get_param('output_mode', 'log')
+        self.shell = self.get_param('shell', None)
+        self.concurrency_key = self.get_param('concurrency_key', None)
 
     def run(self):
         return self.execute_cmd()
@@ -41,62 +62,88 @@ class BatFlow(BaseWorkflow):
     def _execute_command(self, cmd):
         """执行命令的核心方法，可以被子类继承"""
         
-        self.log(f"$ {cmd}")
-        
+        self.log(f"$ {Command.format(cmd)}")
+
+        executor = self._executor()
         if self.wait:
             # 同步执行
-            result = self._run_and_log(cmd)
+            result = executor.spawn(self._run_and_log, cmd, key=self.concurrency_key).result()
             if self.close:
                 self._call_finished_callback()
             return result
         else:
-            # 异步执行
-            threading.Thread(
-                target=self._async_run, 
-                args=(cmd, self.close), 
-                daemon=True
-            ).start()
-            return {"status": WorkflowStatus.ASYNC.value, "message": "命令正在异步执行"}
+            # 异步执行：返回句柄，可 handle.result() / await handle 等待结果，或 handle.cancel() 取消
+            handle = executor.spawn(
+                self._run_and_log, cmd,
+                key=self.concurrency_key,
+                on_done=self._call_finished_callback if self.close else None,
+            )
+            return {"status": WorkflowStatus.ASYNC.value, "message": "命令正在异步执行", "handle": handle}
+
+    def _executor(self):
+        """共享的子进程执行器，设置了concurrency_limit时同时更新concurrency_key的并发上限"""
+        executor = SubprocessExecutor.instance()
+        limit = self.get_param('concurrency_limit')
+        if self.concurrency_key is not None and limit is not None:
+            executor.set_limit(self.concurrency_key, limit)
+        return executor
 
-    def _async_run(self, cmd, close):
-        """异步执行命令"""
-        self._run_and_log(cmd)
-        if close:
-            self._call_finished_callback()
+    @staticmethod
+    def _output_encoding():
+        # 根据操作系统选择合适的编码
+        return 'gbk' if platform.system() == "Windows" else 'utf-8'
 
-    def _run_and_log(self, cmd):
-        """执行命令并实时将输出转发到日志"""
+    @staticmethod
+    def _command_result(returncode):
+        if returncode == 0:
+            return {"status": WorkflowStatus.SUCCESS.value, "message": "命令执行成功", "returncode": returncode}
+        return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行失败，返回码: {returncode}", "returncode": returncode}
+
+    async def _run_and_log(self, cmd):
+        """执行命令并实时将输出转发到日志（在子进程执行器的事件循环中执行）"""
+        if self.output_mode == 'file' and self.enable_bat_log:
+            return await self._run_to_file(cmd)
+        executor = SubprocessExecutor.instance()
         try:
-            # 根据操作系统选择合适的编码
-            encoding = 'gbk' if platform.system() == "Windows" else 'utf-8'
-            
-            process = subprocess.Popen(
-                cmd, 
-                shell=True, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                encoding=encoding, 
-                errors='replace'
-            )
-            
-            # 实时输出日志
-            if self.enable_bat_log:
-                for line in process.stdout:
-                    if line.strip():
-                        self.log(line.strip())
-            
-            process.wait()
-            
-            # 返回执行结果
-            if process.returncode == 0:
-                return {"status": WorkflowStatus.SUCCESS.value, "message": "命令执行成功", "returncode": process.returncode}
+            if not self.enable_bat_log:
+                # 不读取输出时不能使用管道，否则输出填满管道后命令会阻塞
+                completed = await executor.run(cmd, self.concurrency_key, self.shell, stdout=subprocess.DEVNULL)
             else:
-                return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行失败，返回码: {process.returncode}", "returncode": process.returncode}
-                
+                completed = await executor.run(
+                    cmd, self.concurrency_key, self.shell, line_callback=self.log, keep_output=False
+                )
+        except Exception as e:
+            self.log(f"命令执行出错: {e}")
+            return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行异常: {str(e)}"}
+        return self._command_result(completed["returncode"])
+
+    async def _run_to_file(self, cmd):
+        """执行命令，输出由子进程直接写入文件，结束后在日志中记录头尾摘要"""
+        try:
+            output = CommandOutputFile.create(self.get_param('output_dir'), self.manager.run_id, type(self).__name__)
+            with open(output.path, 'wb') as f:
+                completed = await SubprocessExecutor.instance().run(cmd, self.concurrency_key, self.shell, stdout=f)
+            returncode = completed["returncode"]
+            # 摘要需要统计整个文件的行数，不在事件循环线程中读取
+            summary = await event_loop.run_in_thread(
+                output.summarize, self.get_param('output_summary_lines'), self._output_encoding()
+            )
         except Exception as e:
             self.log(f"命令执行出错: {e}")
             return {"status": WorkflowStatus.ERROR.value, "message": f"命令执行异常: {str(e)}"}
 
+        for line in summary.head:
+            self.log(line)
+        if summary.omitted:
+            self.log(f"... 省略 {summary.omitted} 行 ...")
+        for line in summary.tail:
+            self.log(line)
+        self.log(f"完整输出: {output.path} ({summary.line_count} 行, {summary.byte_count} 字节)")
+
+        result = self._command_result(returncode)
+        result.update(output_file=output.path, output_bytes=summary.byte_count)
+        return result
+
     def _call_finished_callback(self):
         """调用完成回调函数"""
         if self.finished_func:
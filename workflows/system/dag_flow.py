@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+from core.workflow import BaseWorkflow
+from core.constants import WorkflowStatus
+from core.dag import DagDefinition, DagScheduler
+
+class DagFlow(BaseWorkflow):
+    """
+    声明式DAG工作流。
+    nodes参数定义节点（flow/params/depends_on/inputs），依赖满足的节点并发执行，
+    上游结果会传入下游参数，执行结束后输出关键路径。
+    节点格式见 core/dag.py。
+    """
+    DEFAULT_PARAMS = {
+        "nodes": None,
+        "max_workers": 4,
+    }
+
+    def init(self):
+        self.nodes = self.get_param("nodes")
+        self.max_workers = self.get_param("max_workers")
+
+    def run(self):
+        try:
+            definition = DagDefinition.parse(self.nodes)
+        except ValueError as e:
+            self.log(f"错误：DAG定义无效: {e}")
+            return {"status": WorkflowStatus.ERROR.value, "message": str(e)}
+
+        self.log(f"DAG共 {len(definition.nodes)} 个节点，最大并发数: {self.max_workers}")
+        return DagScheduler(self.manager, self.max_workers).run(definition)
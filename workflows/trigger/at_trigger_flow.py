@@ -1,23 +1,48 @@
 # -*- coding: utf-8 -*-
 from .base_trigger_flow import TriggerWorkflow
+from core.scheduler import AtSchedule
 import datetime
 
 class AtTriggerWorkflow(TriggerWorkflow):
     """
     定时触发器，到达指定时间点触发一次。
     需设置trigger_time（datetime对象或ISO字符串）。
+    到达时间时目标workflow运行数量已达上限的，等待名额后再触发（每retry_interval秒检查一次），不会丢弃。
     """
     DEFAULT_PARAMS = {
         "trigger_time": "2025-07-24 10:00:00",
+        "retry_interval": 1,
     }
 
+    def __init__(self, manager, config):
+        super().__init__(manager, config)
+        self.at_schedule = None
+
+    def _trigger_datetime(self):
+        trigger_time = self.get_param("trigger_time")
+        if isinstance(trigger_time, str):
+            return datetime.datetime.fromisoformat(trigger_time)
+        return trigger_time
+
+    def schedule(self):
+        if not self.get_param("trigger_time"):
+            self.log("trigger_time 参数未设置，无法启动触发器")
+            return None
+        self.at_schedule = AtSchedule(self._trigger_datetime(), self.get_param("retry_interval"))
+        return self.at_schedule
+
+    def on_schedule(self):
+        self.will_trigger = True
+
+    def fire(self, extra_params: dict | None = None):
+        future = super().fire(extra_params)
+        if future is not None:
+            self.at_schedule.complete()
+        return future
+
     def update_trigger(self):
         trigger_time = self.get_param("trigger_time")
         if not trigger_time:
             self.log("trigger_time 参数未设置，无法启动触发器")
             return False
-        if isinstance(trigger_time, str):
-            trigger_dt = datetime.datetime.fromisoformat(trigger_time)
-        else:
-            trigger_dt = trigger_time
-        self.will_trigger = datetime.datetime.now() >= trigger_dt
\ No newline at end of file
+        self.will_trigger = datetime.datetime.now() >= self._trigger_datetime()
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
-import time
 from core.workflow import BaseWorkflow
-from workflows.system.bat_flow import BatFlow
+from core.constants import WorkflowStatus
+from core.context import ExecutionContext
+from core.scheduler import PollSchedule, Schedule, TimerScheduler
+from core.trigger_dispatch import DISPATCH_IN_PROCESS, TriggerDispatcher
 
 class TriggerWorkflow(BaseWorkflow):
     """
-    触发器型工作流：run时while监听，满足条件时自动触发目标workflow。
-    子类需实现should_trigger()和get_target_params()。
+    触发器型工作流：注册到进程内共享的 TimerScheduler，截止时间到达时检查条件并触发目标workflow。
+    子类通过schedule()指定调度方式，默认按sleep_interval轮询update_trigger()，
+    满足条件时设置 self.will_trigger = True。
+    dispatch_mode为in_process时在本进程中执行目标workflow，为subprocess时每次触发启动新进程。
+    wait为False时run()注册后立即返回，触发器在调度线程中继续运行（可用 TimerScheduler.instance().join() 等待）。
     """
     TARGET_WORKFLOW = None  # 需指定目标workflow类
 
@@ -15,58 +20,126 @@ class TriggerWorkflow(BaseWorkflow):
         "sleep_interval": 1,
         "max_trigger_count": -1,
         "max_running_work_count": -1,
+        # in_process: 加载一次目标工作流，在有界线程池中执行；subprocess: 每次触发启动 uv run main.py
+        "dispatch_mode": DISPATCH_IN_PROCESS,
+        # subprocess模式下为True时通过 main.py --daemon 交给常驻守护进程执行，省去每次触发的冷启动
+        "use_daemon": False,
+        "wait": True,
     }
 
     def __init__(self, manager, config):
         super().__init__(manager, config)
-        self.total_trigger_count = 0
-        self.running_work_count = 0
         self.will_trigger = False
+        self.dispatcher = None
+        self.job = None
+        self._waiting = False
+
+    @property
+    def total_trigger_count(self) -> int:
+        return self.dispatcher.counter.finished if self.dispatcher else 0
+
+    @property
+    def running_work_count(self) -> int:
+        return self.dispatcher.counter.running if self.dispatcher else 0
 
     def update_trigger(self) -> bool:
         """
-        更新触发器状态
+        更新触发器状态（PollSchedule调度时每个间隔调用一次）
         """
         raise NotImplementedError
 
-    def run(self):
+    def schedule(self) -> Schedule | None:
+        """返回调度方式，参数无效时返回None。默认按sleep_interval轮询update_trigger()。"""
+        sleep_interval = self.get_param("sleep_interval")
+        if sleep_interval <= 0:
+            self.log("sleep_interval 参数必须大于0")
+            return None
+        return PollSchedule(sleep_interval)
+
+    def on_schedule(self):
+        """截止时间到达时调用（调度线程中），默认更新条件后决定是否触发"""
+        self.update_trigger()
+
+    def on_stopped(self):
+        """触发器停止后调用（等待模式下在run()中，否则在调度线程中），用于释放子类持有的资源"""
+        pass
+
+    def create_dispatcher(self, **options) -> TriggerDispatcher | None:
+        """根据参数创建并加载分发器，参数无效时返回None。options为TriggerDispatcher的其他参数。"""
         trigger_flow_data = self.get_param("trigger_flow_data")
         if not trigger_flow_data:
             self.log("trigger_flow_data 参数未设置，无法启动触发器")
+            return None
+        try:
+            dispatcher = TriggerDispatcher(
+                self,
+                trigger_flow_data,
+                mode=self.get_param("dispatch_mode"),
+                max_running=self.get_param("max_running_work_count"),
+                max_total=self.get_param("max_trigger_count"),
+                use_daemon=self.get_param("use_daemon"),
+                **options,
+            )
+        except ValueError as e:
+            self.log(str(e))
+            return None
+        return dispatcher if dispatcher.load() else None
+
+    def fire(self, extra_params: dict | None = None):
+        """触发一次目标workflow，运行数量或触发次数达到上限时返回None"""
+        return self.dispatcher.fire(extra_params)
+
+    def _tick(self):
+        self.on_schedule()
+        if not self.will_trigger:
             return
-        sleep_interval = self.get_param("sleep_interval")
-        if sleep_interval <= 0:
-            self.log("sleep_interval 参数必须大于0")
+        counter = self.dispatcher.counter
+        if counter.saturated:
+            if not self._waiting:
+                self.log(f"目标workflow运行数量达到最大值{counter.max_running}，等待目标workflow运行完毕...")
+                self._waiting = True
             return
-        max_trigger_count = self.get_param("max_trigger_count")
-        max_running_work_count = self.get_param("max_running_work_count")
-        self.log(f"触发器启动，监听中... 检查间隔: {sleep_interval}s 最大触发次数: {max_trigger_count}")
-        while True:
-            if self.check_max_trigger_count(max_trigger_count):
-                self.log(f"触发器达到最大触发次数{max_trigger_count}，停止监听")
-                break
-            time.sleep(sleep_interval) # 检查间隔
-            self.update_trigger()
-            if not self.will_trigger:
-                continue
-            if self.check_max_running_work_count(max_running_work_count):
-                self.log(f"目标workflow运行数量达到最大值{max_trigger_count}，等待目标workflow运行完毕...")
-                continue
-            self.log("检测到触发条件，启动目标workflow...")
-            self.run_flow(BatFlow, params={
-                "wait": False,
-                "cmd": f"uv run main.py --flow_data {trigger_flow_data}",
-                "finished_func": self.on_trigger_workflow_finished,
-            })
-            self.running_work_count += 1
+        self._waiting = False
+        self.log("检测到触发条件，启动目标workflow...")
+        if self.fire() is not None:
             self.will_trigger = False
+        if counter.exhausted:
+            self.log(f"触发器达到最大触发次数{counter.max_total}，停止监听")
+            self.job.cancel()
+
+
+    def run(self):
+        schedule = self.schedule()
+        if schedule is None:
+            return
+        self.dispatcher = self.create_dispatcher()
+        if self.dispatcher is None:
+            return
+        max_trigger_count = self.get_param("max_trigger_count")
+        self.log(f"触发器启动，监听中... 调度: {type(schedule).__name__} 最大触发次数: {max_trigger_count} 分发模式: {self.dispatcher.mode}")
+        wait = self.get_param("wait")
+        self.job = TimerScheduler.instance().schedule(
+            schedule,
+            ExecutionContext.bind(self._tick),
+            name=type(self).__name__,
+            # 不等待时由调度线程在任务结束后关闭分发器（不阻塞，正在运行的目标workflow继续执行）
+            on_done=None if wait else self._on_job_done,
+        )
+        if not wait:
+            return {"status": WorkflowStatus.ASYNC.value, "message": "触发器在调度线程中运行"}
+        try:
+            self.job.done.wait()
+        finally:
+            self.job.cancel()
+            self.dispatcher.shutdown(wait=True)
+            self.on_stopped()
 
-    def on_trigger_workflow_finished(self):
-        self.running_work_count -= 1
-        self.total_trigger_count += 1
+    def _on_job_done(self):
+        self.dispatcher.shutdown(wait=False)
+        self.on_stopped()
 
     def check_max_trigger_count(self, max_trigger_count):
-        return max_trigger_count != -1 and self.total_trigger_count >= max_trigger_count
+        return max_trigger_count != -1 and self.dispatcher.counter.started >= max_trigger_count
 
     def check_max_running_work_count(self, max_running_work_count):
         return max_running_work_count != -1 and self.running_work_count >= max_running_work_count
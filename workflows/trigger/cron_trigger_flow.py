@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from .base_trigger_flow import TriggerWorkflow
+from core.cron import CronExpression
+from core.scheduler import CronSchedule
+from core.utils import Utils
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+# 错过触发时间（进程繁忙、休眠、运行数量达到上限）后的处理方式
+MISFIRE_SKIP = 'skip'  # 丢弃超过misfire_grace_time的触发
+MISFIRE_FIRE_ONCE = 'fire_once'  # 错过的触发合并为一次
+MISFIRE_FIRE_ALL = 'fire_all'  # 逐次补发，最多max_catch_up次
+MISFIRE_POLICIES = (MISFIRE_SKIP, MISFIRE_FIRE_ONCE, MISFIRE_FIRE_ALL)
+
+class CronTriggerWorkflow(TriggerWorkflow):
+    """
+    cron触发器，按5字段cron表达式（分 时 日 月 周）触发，支持时区。
+    下一次触发时间直接由表达式推算，调度线程休眠到该时间（单次最长max_sleep秒，用于对齐墙上时间的跳变）。
+    本次触发的计划时间（ISO格式）作为scheduled_time_param参数传给目标workflow。
+    """
+    DEFAULT_PARAMS = {
+        "cron": "* * * * *",
+        # IANA时区名，如 "Asia/Shanghai"，None表示本地时间
+        "timezone": None,
+        "misfire_policy": MISFIRE_FIRE_ONCE,
+        # 晚于计划时间不超过该秒数的触发视为准时（skip策略使用）
+        "misfire_grace_time": 60,
+        "max_catch_up": 10,
+        "max_sleep": 60,
+        "scheduled_time_param": "scheduled_time",
+    }
+
+    def __init__(self, manager, config):
+        super().__init__(manager, config)
+        self.cron_schedule = None
+        self._pending_times = []
+
+    def _timezone(self):
+        timezone = self.get_param("timezone")
+        if not timezone:
+            return None
+        if ZoneInfo is None:
+            raise ValueError("当前Python版本不支持zoneinfo，无法使用timezone参数")
+        try:
+            return ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"未知的时区: {timezone}")
+
+    def schedule(self):
+        policy = self.get_param("misfire_policy")
+        if policy not in MISFIRE_POLICIES:
+            self.log(f"未知的misfire_policy: {policy}，可选: {', '.join(MISFIRE_POLICIES)}")
+            return None
+        try:
+            self.cron_schedule = CronSchedule(CronExpression(self.get_param("cron")), self._timezone(), self.get_param("max_sleep"))
+            next_time = self.cron_schedule.expression.next_after(self.cron_schedule.now())
+        except ValueError as e:
+            self.log(str(e))
+            return None
+        self.log(f"cron: {self.get_param('cron')} 下一次触发: {next_time.isoformat()}")
+        return self.cron_schedule
+
+    def on_schedule(self):
+        self.update_trigger()
+
+    def update_trigger(self):
+        policy = self.get_param("misfire_policy")
+        max_catch_up = self.get_param("max_catch_up")
+        due = self.cron_schedule.take_due(max_catch_up if policy == MISFIRE_FIRE_ALL else 1)
+        if due:
+            now = self.cron_schedule.now().timestamp()
+            grace = self.get_param("misfire_grace_time")
+            late = [t for t in due if now - t.timestamp() > grace]
+            if late:
+                self.log(f"错过触发时间 {late[0].isoformat()}，按{policy}处理")
+            if policy == MISFIRE_FIRE_ALL:
+                self._pending_times = (self._pending_times + due)[-max_catch_up:]
+            elif policy == MISFIRE_FIRE_ONCE:
+                self._pending_times = due[-1:]
+            elif len(late) < len(due):
+                self._pending_times = due[-1:]
+        self.will_trigger = bool(self._pending_times)
+
+    def fire(self, extra_params: dict | None = None):
+        fired = None
+        while self._pending_times:
+            scheduled = self._pending_times[0]
+            future = super().fire(Utils.merge_dicts({self.get_param("scheduled_time_param"): scheduled.isoformat()}, extra_params))
+            if future is None:
+                break
+            self._pending_times.pop(0)
+            fired = future
+            self.log(f"cron触发: {self.get_param('cron')} 计划时间: {scheduled.isoformat()}")
+        if self.dispatcher.counter.exhausted:
+            self._pending_times.clear()
+        return fired
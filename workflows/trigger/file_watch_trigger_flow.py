@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from .base_trigger_flow import TriggerWorkflow
+from core.file_watcher import WATCH_BACKEND_AUTO, WATCH_BACKEND_POLL, PathFilter, create_watcher
+from core.scheduler import PollSchedule
+from core.utils import Utils
+import time
+
+class FileWatchTriggerWorkflow(TriggerWorkflow):
+    """
+    文件监听触发器，watch_paths下匹配patterns的文件新增、修改或删除时触发。
+    Linux上使用inotify（内核推送变化，不扫描目录树），不可用时退化为每poll_interval秒一次的stat轮询。
+    debounce秒内持续发生的变化合并为一次触发，变化的文件路径列表作为changed_paths_param参数传给目标workflow。
+    """
+    DEFAULT_PARAMS = {
+        "watch_paths": [],
+        "patterns": ["*"],
+        "ignore_patterns": [".git", "__pycache__"],
+        "recursive": True,
+        "debounce": 0.5,
+        # auto: 优先inotify；inotify / poll: 指定监听方式
+        "watch_backend": WATCH_BACKEND_AUTO,
+        # inotify读取事件的间隔（读取不扫描目录，开销很小）
+        "sleep_interval": 0.2,
+        # 轮询方式扫描目录树的间隔
+        "poll_interval": 5,
+        "changed_paths_param": "changed_paths",
+    }
+
+    def __init__(self, manager, config):
+        super().__init__(manager, config)
+        self.watcher = None
+        self._changed_paths = set()
+        self._last_change = 0.0
+
+    def create_watcher(self):
+        """根据参数创建文件监听，参数无效时返回None"""
+        watch_paths = self.get_param("watch_paths")
+        if isinstance(watch_paths, str):
+            watch_paths = [watch_paths]
+        if not watch_paths:
+            self.log("watch_paths 参数未设置，无法启动触发器")
+            return None
+        path_filter = PathFilter(self.get_param("patterns"), self.get_param("ignore_patterns"))
+        try:
+            watcher = create_watcher(watch_paths, path_filter, self.get_param("recursive"), self.get_param("watch_backend"))
+        except (ValueError, OSError) as e:
+            self.log(f"创建文件监听失败: {e}")
+            return None
+        self.log(f"监听文件变化: {', '.join(watcher.paths)} 方式: {watcher.backend}")
+        return watcher
+
+    def schedule(self):
+        if self.watcher.backend == WATCH_BACKEND_POLL:
+            interval = self.get_param("poll_interval")
+            if interval <= 0:
+                self.log("poll_interval 参数必须大于0")
+                return None
+            return PollSchedule(interval)
+        return super().schedule()
+
+    def on_schedule(self):
+        self.update_trigger()
+
+    def update_trigger(self):
+        changed = self.watcher.poll()
+        now = time.monotonic()
+        if changed:
+            self._changed_paths.update(changed)
+            self._last_change = now
+        self.will_trigger = bool(self._changed_paths) and now - self._last_change >= self.get_param("debounce")
+
+    def fire(self, extra_params: dict | None = None):
+        paths = sorted(self._changed_paths)
+        future = super().fire(Utils.merge_dicts({self.get_param("changed_paths_param"): paths}, extra_params))
+        if future is not None:
+            self._changed_paths.clear()
+            preview = ', '.join(paths[:3]) + (' ...' if len(paths) > 3 else '')
+            self.log(f"{len(paths)}个文件发生变化: {preview}")
+        return future
+
+    def run(self):
+        self.watcher = self.create_watcher()
+        if self.watcher is None:
+            return
+        result = super().run()
+        if self.job is None:
+            # 未能启动
+            self.on_stopped()
+        return result
+
+    def on_stopped(self):
+        if self.watcher is not None:
+            self.watcher.close()
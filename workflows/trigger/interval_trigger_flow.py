@@ -1,21 +1,26 @@
 # -*- coding: utf-8 -*-
 from .base_trigger_flow import TriggerWorkflow
-import time
+from core.scheduler import IntervalSchedule
 
 class IntervalTriggerWorkflow(TriggerWorkflow):
     """
     间隔触发器，每隔interval秒触发一次。
+    由调度器按单调时钟精确计时，周期不随目标workflow的执行耗时漂移。
     """
     DEFAULT_PARAMS = {
         "interval": 10,
     }
 
-    def run(self):
-        self.current_time = time.time()
-        TriggerWorkflow.run(self)
+    def schedule(self):
+        interval = self.get_param("interval")
+        if interval <= 0:
+            self.log("interval 参数必须大于0")
+            return None
+        return IntervalSchedule(interval)
+
+    def on_schedule(self):
+        self.will_trigger = True
+        self.log(f"触发器触发，间隔: {self.get_param('interval')}s")
 
     def update_trigger(self):
-        self.will_trigger = time.time() - self.current_time >= self.get_param("interval")
-        if self.will_trigger:
-            self.current_time = time.time()
-            self.log(f"触发器触发，间隔: {self.get_param('interval')}s")
\ No newline at end of file
+        self.will_trigger = True
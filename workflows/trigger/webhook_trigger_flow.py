@@ -1,24 +1,145 @@
 # -*- coding: utf-8 -*-
 from .base_trigger_flow import TriggerWorkflow
+from core.constants import WorkflowStatus
+from core.context import ExecutionContext
+from core.trigger_dispatch import (
+    BACKPRESSURE_QUEUE,
+    SUBMIT_COALESCED,
+    SUBMIT_EXHAUSTED,
+    SUBMIT_QUEUED,
+    SUBMIT_REJECTED,
+    SUBMIT_STARTED,
+)
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+# submit结果对应的HTTP状态码
+_SUBMIT_HTTP_STATUS = {
+    SUBMIT_STARTED: 202,
+    SUBMIT_QUEUED: 202,
+    SUBMIT_COALESCED: 202,
+    SUBMIT_REJECTED: 429,
+    SUBMIT_EXHAUSTED: 503,
+}
+
+class _WebhookServer(ThreadingHTTPServer):
+    # 默认监听队列只有5，突发请求时连接会被重置
+    request_queue_size = 128
+    daemon_threads = True
+
 
 class WebhookTriggerWorkflow(TriggerWorkflow):
     """
     Webhook触发器，收到HTTP POST请求时触发。
-    需设置webhook_port。
+    多线程HTTP服务器并发处理请求，JSON请求体合并到目标workflow的参数中（或作为payload_param参数传入），
+    目标workflow提交后立即返回202，不等待执行完成。
+    运行数量达到max_running_work_count时按backpressure处理：reject(429)、queue(排队)、coalesce(合并为一次)。
     """
-    webhook_port = 8000
-    def run(self):
-        from http.server import BaseHTTPRequestHandler, HTTPServer
+    DEFAULT_PARAMS = {
+        "webhook_host": "127.0.0.1",
+        "webhook_port": 8000,
+        "backpressure": BACKPRESSURE_QUEUE,
+        "max_pending": 100,
+        # 为None时请求体（JSON对象）合并到目标参数，否则整个请求体作为该参数传入
+        "payload_param": None,
+    }
+
+    def __init__(self, manager, config):
+        super().__init__(manager, config)
+        self.server = None
+        self._stopped = threading.Event()
+
+    def create_dispatcher(self, **options):
+        return super().create_dispatcher(
+            backpressure=self.get_param("backpressure"),
+            max_pending=self.get_param("max_pending"),
+            on_exhausted=self._stopped.set,
+            **options,
+        )
+
+    def payload_to_params(self, payload) -> dict:
+        """把请求体转换为目标workflow参数"""
+        payload_param = self.get_param("payload_param")
+        if payload_param:
+            return {payload_param: payload}
+        if isinstance(payload, dict):
+            return payload
+        return {"payload": payload}
+
+    def handle_payload(self, payload) -> str:
+        """处理一次请求，返回submit结果"""
+        result = self.dispatcher.submit(self.payload_to_params(payload))
+        if result in (SUBMIT_QUEUED, SUBMIT_COALESCED, SUBMIT_REJECTED):
+            self.log(f"目标workflow运行数量达到最大值{self.dispatcher.counter.max_running}，请求已{result}，排队: {self.dispatcher.pending_count}")
+        return result
+
+    def _create_server(self):
+        handle_payload = ExecutionContext.bind(self.handle_payload)
+
         class Handler(BaseHTTPRequestHandler):
             def do_POST(inner_self):
-                self.will_trigger = True
-        server = HTTPServer(('0.0.0.0', self.webhook_port), Handler)
-        self.log(f"Webhook触发器监听端口: {self.webhook_port}")
-        TriggerWorkflow.run(self)
+                length = int(inner_self.headers.get('Content-Length') or 0)
+                body = inner_self.rfile.read(length) if length > 0 else b''
+                try:
+                    payload = json.loads(body) if body.strip() else {}
+                except ValueError:
+                    inner_self._respond(400, {"status": WorkflowStatus.ERROR.value, "message": "请求体不是有效的JSON"})
+                    return
+                result = handle_payload(payload)
+                inner_self._respond(_SUBMIT_HTTP_STATUS[result], {"status": result})
+
+            def _respond(inner_self, code, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                inner_self.send_response(code)
+                inner_self.send_header('Content-Type', 'application/json; charset=utf-8')
+                inner_self.send_header('Content-Length', str(len(data)))
+                inner_self.end_headers()
+                inner_self.wfile.write(data)
+
+            def log_message(inner_self, format, *args):
+                # 访问日志过多，不写入工作流日志
+                pass
+
+        return _WebhookServer((self.get_param("webhook_host"), self.get_param("webhook_port")), Handler)
+
+    def run(self):
+        self.dispatcher = self.create_dispatcher()
+        if self.dispatcher is None:
+            return
         try:
-            server.serve_forever()
+            self.server = self._create_server()
+        except OSError as e:
+            self.log(f"Webhook触发器启动失败: {e}")
+            self.dispatcher.shutdown(wait=False)
+            return {"status": WorkflowStatus.ERROR.value, "message": str(e)}
+        host, port = self.server.server_address[:2]
+        self.log(f"Webhook触发器监听: http://{host}:{port} 背压策略: {self.dispatcher.backpressure}")
+        threading.Thread(target=self.server.serve_forever, name="workflow-webhook", daemon=True).start()
+        if not self.get_param("wait"):
+            threading.Thread(target=self._stop_when_exhausted, daemon=True).start()
+            return {"status": WorkflowStatus.ASYNC.value, "message": f"Webhook触发器监听端口: {port}"}
+        try:
+            self._stopped.wait()
+            self.log(f"触发器达到最大触发次数{self.dispatcher.counter.max_total}，停止监听")
         except KeyboardInterrupt:
-            self.log("Webhook触发器已停止") 
-    
+            self.log("Webhook触发器已停止")
+        finally:
+            self.stop()
+            self.dispatcher.shutdown(wait=True)
+
+    def _stop_when_exhausted(self):
+        self._stopped.wait()
+        self.stop()
+        self.dispatcher.shutdown(wait=False)
+
+    def stop(self):
+        """停止HTTP服务器"""
+        self._stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
     def update_trigger(self):
-        pass
\ No newline at end of file
+        pass